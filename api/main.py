@@ -1,12 +1,14 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException
+import os
+from typing import List
+from fastapi import FastAPI, Body, File, UploadFile, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 import cv2
 import numpy as np
+import threading
 
-from detection.yolo_detector import NumberPlateDetector
-from ocr.ocr import OCRStabilizer
-from blockchain.blockchain_manager import BlockchainManager
 from database.vehicle_log import VehicleLogger
+from detection.visit_state import ENTRY, EXIT, VisitStateMachine
 
 app = FastAPI(
     title="Vehicle Detection API",
@@ -23,11 +25,144 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize components
-detector = NumberPlateDetector('best.pt')
-ocr = OCRStabilizer()
+# Components are created on first use (or by the startup warm-up) so the
+# API starts serving health checks before the models finish loading
+_components = {}
+_component_errors = {}
+_component_locks = {}
+_component_locks_lock = threading.Lock()
+
 vehicle_logger = VehicleLogger()
 
+# Uploads of the same plate within the cooldown are one pass, not an entry and an exit
+visit_states = VisitStateMachine(dwell_seconds=0.0, resight_window=30.0, cooldown_seconds=60.0)
+
+
+def _get_component(name, factory):
+    """
+    Build a component once and cache it; failures are retried on next use
+    """
+    if name in _components:
+        return _components[name]
+
+    # One lock per component, so a slow model load never blocks the others
+    with _component_locks_lock:
+        lock = _component_locks.setdefault(name, threading.Lock())
+
+    with lock:
+        if name not in _components:
+            try:
+                _components[name] = factory()
+                _component_errors.pop(name, None)
+            except Exception as e:
+                _component_errors[name] = str(e)
+                raise
+        return _components[name]
+
+
+def get_detector():
+    """Plate detector, shared with the model server when it runs"""
+    from detection.model_server import connect_or_load
+    return _get_component('detector', lambda: connect_or_load(yolo_model_path='best.pt'))
+
+
+def get_ocr():
+    """OCR stabilizer, using the model server's EasyOCR reader when available"""
+    def factory():
+        from detection.model_server import ModelClient
+        from ocr.ocr import OCRStabilizer
+        detector = get_detector()
+        if isinstance(detector, ModelClient):
+            return OCRStabilizer(reader=detector.reader())
+        return OCRStabilizer()
+    return _get_component('ocr', factory)
+
+
+def get_blockchain_manager():
+    """Process-wide blockchain manager, connected on first use"""
+    from blockchain.blockchain_manager import BlockchainManager, anchor_options
+    return _get_component(
+        'blockchain',
+        lambda: BlockchainManager.shared(**anchor_options(vehicle_logger.db_manager.db_path))
+    )
+
+
+def get_write_queue():
+    """Background chain write queue, journaled so writes survive node outages"""
+    from blockchain.outbox import ChainOutbox
+    from blockchain.write_queue import BlockchainWriteQueue
+    return _get_component(
+        'write_queue',
+        lambda: BlockchainWriteQueue(
+            get_blockchain_manager,
+            vehicle_logger.db_manager,
+            outbox=ChainOutbox(vehicle_logger.db_manager.db_path)
+        )
+    )
+
+
+def get_async_store():
+    """Async vehicle_entries store, only when a shared database URL is configured"""
+    from database.storage import DATABASE_URL_ENV, AsyncVehicleStore
+    url = os.environ.get(DATABASE_URL_ENV)
+    if not url:
+        return None
+    return _get_component('async_store', lambda: AsyncVehicleStore(url))
+
+
+def get_reconciler():
+    """Background reconciler confirming vehicle_entries against the chain"""
+    from blockchain.reconciler import TransactionReconciler
+    return _get_component(
+        'reconciler',
+        lambda: TransactionReconciler(
+            get_blockchain_manager,
+            vehicle_logger.db_manager,
+            get_write_queue()
+        ).start()
+    )
+
+
+def warm_up():
+    """Load models and connect to the chain ahead of the first request"""
+    for getter in (get_write_queue, get_reconciler, get_detector, get_ocr, get_blockchain_manager):
+        try:
+            getter()
+        except Exception as e:
+            print(f"Warm-up failed for {getter.__name__}: {e}")
+
+
+@app.on_event("startup")
+def start_warm_up():
+    """Warm up in the background so startup is not blocked on model loading"""
+    threading.Thread(target=warm_up, daemon=True).start()
+
+
+@app.get("/health/live")
+def liveness():
+    """
+    Liveness probe, answers as soon as the process serves requests
+    """
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+def readiness():
+    """
+    Readiness probe, reports which components are loaded
+    """
+    components = {
+        name: {
+            "loaded": name in _components,
+            "error": _component_errors.get(name)
+        }
+        for name in ('detector', 'ocr', 'blockchain')
+    }
+    ready = components['detector']['loaded'] and components['ocr']['loaded']
+    if not ready:
+        raise HTTPException(status_code=503, detail={"ready": False, "components": components})
+    return {"ready": True, "components": components}
+
 @app.post("/detect/")
 async def detect_vehicle(file: UploadFile = File(...)):
     """
@@ -40,7 +175,7 @@ async def detect_vehicle(file: UploadFile = File(...)):
         frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
         
         # Detect plates
-        plates = detector.detect_plates(frame)
+        plates = get_detector().detect_plates(frame)
         
         detected_plates = []
         for x, y, w, h in plates:
@@ -48,19 +183,49 @@ async def detect_vehicle(file: UploadFile = File(...)):
             plate_img = frame[int(y):int(y+h), int(x):int(x+w)]
             
             # OCR plate number
-            plate_number = ocr.get_stable_plate_number(plate_img)
+            plate_number = get_ocr().get_stable_plate_number(plate_img)
             
             if plate_number:
-                # Log to database
-                vehicle_logger.log_vehicle_entry(plate_number)
+                event = visit_states.observe(plate_number, vehicle_logger.is_inside(plate_number))
+                if event is None:
+                    continue
                 
-                # Optional: Blockchain logging
-                blockchain_manager = BlockchainManager()
-                blockchain_tx = blockchain_manager.log_vehicle_entry(plate_number)
+                action = None
+                if event == ENTRY:
+                    # Log to database
+                    entry_id = vehicle_logger.log_vehicle_entry(plate_number)
+                    if entry_id:
+                        action = 'entry'
+                        
+                        # Optional: Blockchain logging, confirmed in the background
+                        blockchain_tx = get_write_queue().submit_entry(
+                            plate_number,
+                            entry_id=entry_id
+                        )
+                    elif vehicle_logger.is_inside(plate_number):
+                        # Another gate logged this arrival first, nothing to report
+                        visit_states.confirm(plate_number)
+                        continue
+                else:
+                    # Vehicles already inside are leaving
+                    session = vehicle_logger.log_vehicle_exit(plate_number)
+                    if session is not None:
+                        action = 'exit'
+                        blockchain_tx = get_write_queue().submit_exit(
+                            plate_number,
+                            entry_id=session['entry_id']
+                        )
+                
+                if action is None:
+                    # Nothing was written, let the next sighting retry
+                    visit_states.reject(plate_number)
+                    continue
+                visit_states.confirm(plate_number)
                 
                 detected_plates.append({
                     'plate_number': plate_number,
-                    'blockchain_tx': blockchain_tx
+                    'action': action,
+                    'blockchain_tx': blockchain_tx.as_dict()
                 })
         
         return {
@@ -71,17 +236,73 @@ async def detect_vehicle(file: UploadFile = File(...)):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/detect/batch/")
+async def detect_vehicles_batch(files: List[UploadFile] = File(...)):
+    """
+    Detect vehicle plates from several uploaded images in one YOLO pass
+    """
+    try:
+        # Decode all images first so YOLO sees them as one batch
+        frames = []
+        for file in files:
+            contents = await file.read()
+            nparr = np.frombuffer(contents, np.uint8)
+            frames.append(cv2.imdecode(nparr, cv2.IMREAD_COLOR))
+
+        detector = get_detector()
+        plates_per_frame = detector.detect_plates_batch(frames)
+
+        # Recognize every crop from every frame in one OCR batch
+        plate_imgs = [
+            frame[y1:y2, x1:x2]
+            for frame, plates in zip(frames, plates_per_frame)
+            for x1, y1, x2, y2 in plates
+        ]
+        plate_infos = iter(detector.process_plates_batch(plate_imgs))
+
+        results = []
+        for file, plates in zip(files, plates_per_frame):
+            detected_plates = []
+            for _ in plates:
+                plate_info = next(plate_infos)
+                if plate_info and plate_info['text']:
+                    detected_plates.append(plate_info)
+
+            results.append({
+                "filename": file.filename,
+                "detected_plates": detected_plates,
+                "total_plates": len(detected_plates)
+            })
+
+        return {"results": results}
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.get("/recent_entries/")
-def get_recent_entries(limit: int = 10):
+async def get_recent_entries(limit: int = 10):
     """
     Retrieve recent vehicle entries
     """
     try:
-        recent_entries = vehicle_logger.get_recent_entries(limit)
+        store = get_async_store()
+        if store is not None:
+            recent_entries = await store.get_recent_entries(limit)
+        else:
+            recent_entries = await run_in_threadpool(vehicle_logger.get_recent_entries, limit)
         return {"entries": recent_entries}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/occupancy/")
+def get_occupancy():
+    """
+    Vehicles currently inside, per lot
+    """
+    occupancy = vehicle_logger.get_occupancy()
+    occupancy['gate'] = visit_states.stats()
+    return occupancy
+
 # Blockchain-specific endpoints
 @app.get("/blockchain/verify/{plate_number}")
 def verify_vehicle_entry(plate_number: str):
@@ -89,8 +310,8 @@ def verify_vehicle_entry(plate_number: str):
     Verify a vehicle's blockchain entry
     """
     try:
-        blockchain_manager = BlockchainManager()
-        is_active = blockchain_manager.contract.functions.isVehicleActive(plate_number).call()
+        blockchain_manager = get_blockchain_manager()
+        is_active = blockchain_manager.is_vehicle_active(plate_number)
         
         return {
             "plate_number": plate_number,
@@ -100,6 +321,58 @@ def verify_vehicle_entry(plate_number: str):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/blockchain/verify")
+def verify_vehicle_entries(plate_numbers: List[str] = Body(..., embed=True)):
+    """
+    Verify many vehicles' blockchain entries with one call per chunk
+    """
+    try:
+        blockchain_manager = get_blockchain_manager()
+        statuses = blockchain_manager.are_vehicles_active(plate_numbers)
+        
+        return {
+            "results": [
+                {"plate_number": plate_number, "is_active": is_active}
+                for plate_number, is_active in statuses.items()
+            ],
+            "verified": True
+        }
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/blockchain/metrics")
+def get_blockchain_metrics():
+    """
+    Backlog and lag of pending chain writes and unsettled entries
+    """
+    return {
+        "write_queue": get_write_queue().metrics(),
+        "reconciler": get_reconciler().metrics()
+    }
+
+@app.get("/blockchain/proof/{event_id}")
+def get_inclusion_proof(event_id: int):
+    """
+    Merkle inclusion proof for a locally stored event, checked on-chain
+    """
+    try:
+        blockchain_manager = get_blockchain_manager()
+    except Exception as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    if not blockchain_manager.anchor:
+        raise HTTPException(status_code=400, detail="Anchoring mode is not enabled")
+
+    proof = blockchain_manager.anchor.get_proof(event_id)
+    if proof is None:
+        raise HTTPException(status_code=404, detail="Event not found or not yet anchored")
+
+    try:
+        proof['verified'] = blockchain_manager.anchor.verify_proof(proof)
+        return proof
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,75 @@
+import argparse
+import glob
+import os
+import time
+import cv2
+import numpy as np
+
+from detection.backends import BACKENDS, backend_available, load_yolo_model
+
+IMAGE_PATTERNS = ('*.jpg', '*.jpeg', '*.png', '*.JPG')
+
+
+def load_images(image_dir, limit=None):
+    """Load benchmark images from a directory"""
+    paths = []
+    for pattern in IMAGE_PATTERNS:
+        paths.extend(glob.glob(os.path.join(image_dir, pattern)))
+    paths = sorted(set(paths))[:limit]
+
+    images = []
+    for path in paths:
+        image = cv2.imread(path)
+        if image is not None:
+            images.append(image)
+    return images
+
+
+def benchmark_backend(weights, backend, images, warmup=3):
+    """Measure per-image detection latency for one backend"""
+    model = load_yolo_model(weights, backend)
+
+    for image in images[:warmup]:
+        model(image, verbose=False)
+
+    latencies = []
+    for image in images:
+        start = time.perf_counter()
+        model(image, verbose=False)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    return {
+        'backend': backend,
+        'images': len(latencies),
+        'mean_ms': float(np.mean(latencies)),
+        'p50_ms': float(np.percentile(latencies, 50)),
+        'p95_ms': float(np.percentile(latencies, 95))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare plate detector latency per inference backend")
+    parser.add_argument('--weights', default='best.pt')
+    parser.add_argument('--images', default=os.path.join('dataset', 'valid', 'images'))
+    parser.add_argument('--limit', type=int, default=None)
+    args = parser.parse_args()
+
+    images = load_images(args.images, args.limit)
+    if not images:
+        print(f"❌ No images found in {args.images}")
+        return
+
+    print(f"📊 Benchmarking {len(images)} images from {args.images}")
+    print(f"{'backend':<10} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    for backend in BACKENDS:
+        if backend == 'auto':
+            continue
+        if not backend_available(backend):
+            print(f"{backend:<10} {'not installed':>32}")
+            continue
+        result = benchmark_backend(args.weights, backend, images)
+        print(f"{backend:<10} {result['mean_ms']:>10.1f} {result['p50_ms']:>10.1f} {result['p95_ms']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,16 @@
 from .blockchain_manager import BlockchainManager
+from .anchoring import MerkleAnchor
+from .event_indexer import EventIndexer
+from .outbox import ChainOutbox
+from .reconciler import TransactionReconciler
+from .write_queue import BlockchainWriteQueue, PendingTransaction
 
-__all__ = ['BlockchainManager']
+__all__ = [
+    'BlockchainManager',
+    'MerkleAnchor',
+    'EventIndexer',
+    'ChainOutbox',
+    'TransactionReconciler',
+    'BlockchainWriteQueue',
+    'PendingTransaction',
+]
@@ -0,0 +1,315 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+
+def _keccak(data):
+    from eth_utils import keccak
+    return keccak(data)
+
+
+def hash_pair(a, b):
+    """
+    Sorted-pair hash, matching VehicleRegistry.verifyInclusion
+    """
+    return _keccak(a + b) if a < b else _keccak(b + a)
+
+
+def event_leaf(event):
+    """
+    Leaf hash of an event from its canonical JSON form
+    """
+    payload = json.dumps({
+        'id': event['id'],
+        'plate_number': event['plate_number'],
+        'action': event['action'],
+        'confidence': event['confidence'],
+        'event_time': event['event_time']
+    }, sort_keys=True, separators=(',', ':'))
+    return _keccak(payload.encode('utf-8'))
+
+
+def merkle_root(leaves):
+    """
+    Root of a Merkle tree; an odd node is promoted to the next level
+    """
+    if not leaves:
+        raise ValueError("Cannot build a Merkle tree without leaves")
+
+    level = list(leaves)
+    while len(level) > 1:
+        next_level = []
+        for i in range(0, len(level), 2):
+            if i + 1 < len(level):
+                next_level.append(hash_pair(level[i], level[i + 1]))
+            else:
+                next_level.append(level[i])
+        level = next_level
+    return level[0]
+
+
+def merkle_proof(leaves, index):
+    """
+    Sibling hashes from leaf to root for the leaf at index
+    """
+    proof = []
+    level = list(leaves)
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(level[sibling])
+
+        next_level = []
+        for i in range(0, len(level), 2):
+            if i + 1 < len(level):
+                next_level.append(hash_pair(level[i], level[i + 1]))
+            else:
+                next_level.append(level[i])
+        level = next_level
+        index //= 2
+    return proof
+
+
+def root_from_proof(leaf, proof):
+    """
+    Recompute the root from a leaf and its inclusion proof
+    """
+    computed = leaf
+    for sibling in proof:
+        computed = hash_pair(computed, sibling)
+    return computed
+
+
+class MerkleAnchor:
+    def __init__(self, blockchain_manager, db_path='vehicle_logs.db',
+                 batch_events=1000, batch_seconds=60):
+        """
+        Store vehicle events locally and anchor only Merkle roots on-chain
+
+        Every batch_events events or batch_seconds seconds, pending events
+        are sealed into a Merkle tree whose root goes on-chain through
+        VehicleRegistry.anchorMerkleRoot.
+        """
+        self.blockchain_manager = blockchain_manager
+        self.db_path = db_path
+        self.batch_events = batch_events
+        self.batch_seconds = batch_seconds
+
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+
+        self.setup_database()
+
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+
+    def setup_database(self):
+        """Create anchoring tables if they don't exist"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS anchor_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            plate_number TEXT NOT NULL,
+            action TEXT NOT NULL,
+            confidence REAL,
+            event_time TEXT NOT NULL,
+            leaf TEXT,
+            batch_id INTEGER,
+            leaf_index INTEGER
+        )
+        ''')
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS anchor_batches (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            root TEXT NOT NULL,
+            event_count INTEGER NOT NULL,
+            transaction_hash TEXT,
+            block_number INTEGER,
+            status TEXT DEFAULT 'pending',
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def record_event(self, plate_number, action, confidence=None):
+        """
+        Append an event to the local store
+
+        :return: {'event_id', 'status'} for the recorded event
+        """
+        event_time = datetime.now().isoformat()
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+            INSERT INTO anchor_events (plate_number, action, confidence, event_time)
+            VALUES (?, ?, ?, ?)
+            ''', (plate_number, action, confidence, event_time))
+            event_id = cursor.lastrowid
+
+            leaf = event_leaf({
+                'id': event_id,
+                'plate_number': plate_number,
+                'action': action,
+                'confidence': confidence,
+                'event_time': event_time
+            })
+            cursor.execute('UPDATE anchor_events SET leaf = ? WHERE id = ?', (leaf.hex(), event_id))
+            conn.commit()
+
+            pending = conn.execute(
+                'SELECT COUNT(*) FROM anchor_events WHERE batch_id IS NULL'
+            ).fetchone()[0]
+        finally:
+            conn.close()
+
+        if pending >= self.batch_events:
+            self._wake.set()
+
+        return {'event_id': event_id, 'status': 'recorded'}
+
+    def anchor_pending(self):
+        """
+        Seal pending events into a batch and anchor its root; retries failed batches
+
+        :return: Number of batches anchored
+        """
+        with self._lock:
+            self._seal_pending()
+            return self._anchor_unconfirmed()
+
+    def _seal_pending(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute('''
+            SELECT id, leaf FROM anchor_events
+            WHERE batch_id IS NULL
+            ORDER BY id
+            ''').fetchall()
+            if not rows:
+                return
+
+            leaves = [bytes.fromhex(leaf) for _, leaf in rows]
+            root = merkle_root(leaves)
+
+            cursor = conn.cursor()
+            cursor.execute('''
+            INSERT INTO anchor_batches (root, event_count) VALUES (?, ?)
+            ''', (root.hex(), len(rows)))
+            batch_id = cursor.lastrowid
+
+            cursor.executemany('''
+            UPDATE anchor_events SET batch_id = ?, leaf_index = ? WHERE id = ?
+            ''', [(batch_id, index, event_id) for index, (event_id, _) in enumerate(rows)])
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _anchor_unconfirmed(self):
+        conn = sqlite3.connect(self.db_path)
+        try:
+            batches = conn.execute('''
+            SELECT id, root, event_count FROM anchor_batches
+            WHERE status != 'anchored'
+            ORDER BY id
+            ''').fetchall()
+
+            anchored = 0
+            for batch_id, root, event_count in batches:
+                result = self.blockchain_manager.anchor_merkle_root(bytes.fromhex(root), event_count)
+                if result:
+                    conn.execute('''
+                    UPDATE anchor_batches
+                    SET status = 'anchored',
+                        transaction_hash = COALESCE(?, transaction_hash),
+                        block_number = COALESCE(?, block_number)
+                    WHERE id = ?
+                    ''', (result['transaction_hash'], result['block_number'], batch_id))
+                    anchored += 1
+                else:
+                    conn.execute(
+                        "UPDATE anchor_batches SET status = 'failed' WHERE id = ?",
+                        (batch_id,)
+                    )
+                conn.commit()
+            return anchored
+        finally:
+            conn.close()
+
+    def get_proof(self, event_id):
+        """
+        Inclusion proof for an event, or None if it is not sealed yet
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            event = conn.execute(
+                'SELECT * FROM anchor_events WHERE id = ?', (event_id,)
+            ).fetchone()
+            if event is None or event['batch_id'] is None:
+                return None
+
+            batch = conn.execute(
+                'SELECT * FROM anchor_batches WHERE id = ?', (event['batch_id'],)
+            ).fetchone()
+            leaves = [
+                bytes.fromhex(row[0]) for row in conn.execute('''
+                SELECT leaf FROM anchor_events WHERE batch_id = ? ORDER BY leaf_index
+                ''', (event['batch_id'],))
+            ]
+        finally:
+            conn.close()
+
+        proof = merkle_proof(leaves, event['leaf_index'])
+        return {
+            'event': {
+                'id': event['id'],
+                'plate_number': event['plate_number'],
+                'action': event['action'],
+                'confidence': event['confidence'],
+                'event_time': event['event_time']
+            },
+            'leaf': '0x' + event['leaf'],
+            'proof': ['0x' + sibling.hex() for sibling in proof],
+            'root': '0x' + batch['root'],
+            'batch_status': batch['status'],
+            'transaction_hash': batch['transaction_hash'],
+            'block_number': batch['block_number']
+        }
+
+    def verify_proof(self, proof):
+        """
+        Check a proof locally and against the on-chain anchored root
+        """
+        leaf = event_leaf(proof['event'])
+        if '0x' + leaf.hex() != proof['leaf']:
+            return False
+
+        root = root_from_proof(leaf, [bytes.fromhex(s[2:]) for s in proof['proof']])
+        if '0x' + root.hex() != proof['root']:
+            return False
+
+        return self.blockchain_manager.is_root_anchored(root)
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+
+    def _flush_loop(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.batch_seconds)
+            self._wake.clear()
+            if self._stopped.is_set():
+                return
+            try:
+                self.anchor_pending()
+            except Exception as e:
+                print(f"Error anchoring Merkle root: {e}")
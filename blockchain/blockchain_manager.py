@@ -1,22 +1,68 @@
 import hashlib
 from datetime import datetime
-import json
 import os
-from web3 import Web3
-from eth_account import Account
 import subprocess
+import threading
+
+from .connection import DEFAULT_PROVIDER_URI, connect, load_deployment_info
+from .gas_cache import GasCache
+from .nonce_manager import NonceManager
+from .status_cache import PlateStatusCache
+
+# Page size used when reading a v2 plate's full entry history
+ENTRY_PAGE_SIZE = 100
+
+# Merkle anchoring switches shared by the API and the UI
+ANCHOR_MODE_ENV = 'VEHICLE_ANCHOR_MODE'
+ANCHOR_BATCH_EVENTS_ENV = 'VEHICLE_ANCHOR_BATCH_EVENTS'
+ANCHOR_BATCH_SECONDS_ENV = 'VEHICLE_ANCHOR_BATCH_SECONDS'
+
+
+def anchor_options(anchor_db_path=None, environ=None):
+    """
+    BlockchainManager anchoring kwargs from $VEHICLE_ANCHOR_MODE and friends
+    """
+    environ = os.environ if environ is None else environ
+    options = {
+        'anchor_mode': environ.get(ANCHOR_MODE_ENV, '').lower() in ('1', 'true', 'yes', 'on')
+    }
+    if anchor_db_path:
+        options['anchor_db_path'] = anchor_db_path
+    if environ.get(ANCHOR_BATCH_EVENTS_ENV):
+        options['anchor_batch_events'] = int(environ[ANCHOR_BATCH_EVENTS_ENV])
+    if environ.get(ANCHOR_BATCH_SECONDS_ENV):
+        options['anchor_batch_seconds'] = float(environ[ANCHOR_BATCH_SECONDS_ENV])
+    return options
+
+
+def plate_key(plate_number):
+    """
+    bytes32 storage key of a plate on VehicleRegistryV2
+    """
+    from eth_utils import keccak
+    return keccak(text=plate_number)
+
 
 class BlockchainManager:
-    def __init__(self, contract_address=None, contract_abi=None):
+    _shared = None
+    _shared_lock = threading.Lock()
+    
+    def __init__(self, contract_address=None, contract_abi=None, anchor_mode=False,
+                 anchor_db_path='vehicle_logs.db', anchor_batch_events=1000,
+                 anchor_batch_seconds=60, provider_uri=DEFAULT_PROVIDER_URI):
         """
         Initialize blockchain manager with contract details
-        """
-        # Connect to local Hardhat node
-        self.w3 = Web3(Web3.HTTPProvider('http://127.0.0.1:8545'))
         
-        # Verify connection
-        if not self.w3.is_connected():
-            raise ConnectionError("Unable to connect to Hardhat Ethereum node")
+        :param anchor_mode: Store events locally and only anchor Merkle roots on-chain
+        :param anchor_batch_events: Events per anchored batch
+        :param anchor_batch_seconds: Longest wait before pending events are anchored
+        :param provider_uri: http(s):// or ws(s):// endpoint, or an IPC socket path
+        """
+        # Connect to the node over a pooled keep-alive provider
+        from web3 import Web3
+        self.provider_uri = provider_uri
+        self._connect_lock = threading.Lock()
+        self.w3 = connect(Web3(), provider_uri)
         
         # Load contract details
         if contract_address and contract_abi:
@@ -32,40 +78,346 @@ class BlockchainManager:
                 'deployment-info.json'
             )
             if os.path.exists(deployment_path):
-                with open(deployment_path, 'r') as f:
-                    deployment_info = json.load(f)
-                    self.contract = self.w3.eth.contract(
-                        address=deployment_info['address'], 
-                        abi=deployment_info['abi']
-                    )
+                deployment_info = load_deployment_info(deployment_path)
+                self.contract = self.w3.eth.contract(
+                    address=deployment_info['address'], 
+                    abi=deployment_info['abi']
+                )
             else:
                 self.contract = None
         
         # Set default account (first Hardhat account)
         self.w3.eth.default_account = self.w3.eth.accounts[0]
+        
+        # Event-log index, built on first query
+        self._indexer = None
+        
+        # Local nonces and cached gas limits save two RPCs per transaction
+        self.nonce_manager = NonceManager(self.w3, self.w3.eth.default_account)
+        self.gas_cache = GasCache()
+        
+        # isVehicleActive results, dropped on new entry/exit events
+        self.status_cache = PlateStatusCache()
+        self._status_block = None
+        self._status_lock = threading.Lock()
+        
+        # Merkle-root anchoring mode
+        self.anchor = None
+        if anchor_mode:
+            from .anchoring import MerkleAnchor
+            self.anchor = MerkleAnchor(
+                self,
+                anchor_db_path,
+                batch_events=anchor_batch_events,
+                batch_seconds=anchor_batch_seconds
+            )
+    
+    @classmethod
+    def shared(cls, **kwargs):
+        """
+        Process-wide manager reused across requests and threads
+        
+        The provider, contract object and account lookup are set up once;
+        kwargs only apply to the first call.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls(**kwargs)
+            return cls._shared
+    
+    def reconnect(self):
+        """
+        Replace the provider after a dropped connection, backing off between attempts
+        
+        The Web3 instance is kept, so the contract object stays bound to it.
+        """
+        with self._connect_lock:
+            if not self.w3.is_connected():
+                connect(self.w3, self.provider_uri)
+    
+    @property
+    def contract_version(self):
+        """
+        1 for string-keyed VehicleRegistry, 2 for hash-keyed VehicleRegistryV2
+        """
+        if not self.contract:
+            return None
+        for item in self.contract.abi:
+            if item.get('type') == 'function' and item.get('name') == 'logVehicleEntry':
+                return 2 if item['inputs'][0]['type'] == 'bytes32' else 1
+        return 1
+    
+    def _plate_args(self, plate_number):
+        """
+        Contract arguments identifying a plate for the deployed version
+        """
+        if self.contract_version == 2:
+            return (plate_key(plate_number), plate_number)
+        return (plate_number,)
+    
+    def _plate_query(self, plate_numbers):
+        """
+        View-call arguments for plates: keys on v2, strings on v1
+        """
+        if self.contract_version == 2:
+            return [plate_key(plate_number) for plate_number in plate_numbers]
+        return list(plate_numbers)
+    
+    def _send_transaction(self, function):
+        """
+        Send a contract transaction with a cached gas limit and local nonce
+        
+        On failure the nonce is handed back, the counter is resynced from
+        the node and the send is retried once with a fresh gas estimate.
+        
+        :return: Transaction hash
+        """
+        for attempt in range(2):
+            gas = self.gas_cache.gas_for(function)
+            nonce = self.nonce_manager.allocate()
+            try:
+                tx_hash = function.transact({'gas': gas, 'nonce': nonce})
+            except Exception as e:
+                # Before anything that can fail, so a dead node leaves no nonce gap
+                self.nonce_manager.release(nonce)
+                self.gas_cache.invalidate(function)
+                if attempt == 1:
+                    raise
+                if isinstance(e, (ConnectionError, OSError)):
+                    self.reconnect()
+                self.nonce_manager.resync()
+                continue
+            self.gas_cache.track(tx_hash, function)
+            return tx_hash
+    
+    def send_vehicle_entry(self, plate_number, confidence=0.9):
+        """
+        Submit a vehicle entry transaction without waiting for it to be mined
+        
+        :return: Transaction hash
+        """
+        if not self.contract:
+            raise ValueError("Contract not initialized")
+        
+        function = self.contract.functions.logVehicleEntry(
+            *self._plate_args(plate_number), 
+            int(confidence * 100)
+        )
+        
+        return self._send_transaction(function)
+    
+    def send_vehicle_exit(self, plate_number):
+        """
+        Submit a vehicle exit transaction without waiting for it to be mined
+        
+        :return: Transaction hash
+        """
+        if not self.contract:
+            raise ValueError("Contract not initialized")
+        
+        function = self.contract.functions.logVehicleExit(*self._plate_args(plate_number))
+        
+        return self._send_transaction(function)
+    
+    def supports_batch(self):
+        """
+        Whether the deployed contract has the batch logging functions
+        """
+        if not self.contract:
+            return False
+        names = {item.get('name') for item in self.contract.abi if item.get('type') == 'function'}
+        return {'logVehicleEntriesBatch', 'logVehicleExitsBatch'} <= names
+    
+    def send_vehicle_entries_batch(self, plate_numbers, confidences):
+        """
+        Submit several vehicle entries in one transaction
+        
+        :return: Transaction hash
+        """
+        if not self.contract:
+            raise ValueError("Contract not initialized")
+        
+        plate_args = [list(plate_numbers)]
+        if self.contract_version == 2:
+            plate_args.insert(0, self._plate_query(plate_numbers))
+        
+        function = self.contract.functions.logVehicleEntriesBatch(
+            *plate_args,
+            [int(confidence * 100) for confidence in confidences]
+        )
+        
+        return self._send_transaction(function)
+    
+    def send_vehicle_exits_batch(self, plate_numbers):
+        """
+        Submit several vehicle exits in one transaction
+        
+        :return: Transaction hash
+        """
+        if not self.contract:
+            raise ValueError("Contract not initialized")
+        
+        plate_args = [list(plate_numbers)]
+        if self.contract_version == 2:
+            plate_args.insert(0, self._plate_query(plate_numbers))
+        
+        function = self.contract.functions.logVehicleExitsBatch(*plate_args)
+        
+        return self._send_transaction(function)
+    
+    def parse_batch_results(self, tx_receipt, action, plate_numbers):
+        """
+        Per-plate outcome of a batch transaction
+        
+        Each plate in a batch emits exactly one logged or rejected event,
+        in order, so events are matched to plates by log index.
+        
+        :param action: 'entry' or 'exit'
+        :return: List of {'plate_number', 'logged', 'reason'} in batch order
+        """
+        from web3.logs import DISCARD
+        
+        if action == 'entry':
+            event_names = ('VehicleEntered', 'VehicleEntryRejected')
+        else:
+            event_names = ('VehicleExited', 'VehicleExitRejected')
+        
+        events = []
+        for name in event_names:
+            event = getattr(self.contract.events, name)()
+            events.extend(event.process_receipt(tx_receipt, errors=DISCARD))
+        events.sort(key=lambda e: e['logIndex'])
+        
+        results = []
+        for plate_number, event in zip(plate_numbers, events):
+            rejected = event['event'] == event_names[1]
+            results.append({
+                'plate_number': plate_number,
+                'logged': not rejected,
+                'reason': event['args']['reason'] if rejected else None
+            })
+        return results
+    
+    def log_vehicle_entries_batch(self, plate_numbers, confidences):
+        """
+        Log several vehicle entries and wait for per-plate results
+        """
+        try:
+            tx_hash = self.send_vehicle_entries_batch(plate_numbers, confidences)
+            tx_receipt = self.wait_for_receipt(tx_hash)
+            
+            return {
+                'transaction_hash': tx_receipt.transactionHash.hex(),
+                'block_number': tx_receipt.blockNumber,
+                'results': self.parse_batch_results(tx_receipt, 'entry', plate_numbers)
+            }
+        except Exception as e:
+            print(f"Error logging vehicle entries batch: {e}")
+            return None
+    
+    def log_vehicle_exits_batch(self, plate_numbers):
+        """
+        Log several vehicle exits and wait for per-plate results
+        """
+        try:
+            tx_hash = self.send_vehicle_exits_batch(plate_numbers)
+            tx_receipt = self.wait_for_receipt(tx_hash)
+            
+            return {
+                'transaction_hash': tx_receipt.transactionHash.hex(),
+                'block_number': tx_receipt.blockNumber,
+                'results': self.parse_batch_results(tx_receipt, 'exit', plate_numbers)
+            }
+        except Exception as e:
+            print(f"Error logging vehicle exits batch: {e}")
+            return None
+    
+    def get_receipt(self, tx_hash):
+        """
+        Receipt for a mined transaction, or None while it is pending
+        """
+        from web3.exceptions import TransactionNotFound
+        try:
+            receipt = self.w3.eth.get_transaction_receipt(tx_hash)
+        except TransactionNotFound:
+            return None
+        self.gas_cache.settle(tx_hash, receipt.status)
+        return receipt
+    
+    def wait_for_receipt(self, tx_hash):
+        """
+        Block until a transaction is mined and return its receipt
+        """
+        receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+        self.gas_cache.settle(tx_hash, receipt.status)
+        return receipt
+    
+    def is_transaction_known(self, tx_hash):
+        """
+        Whether the node still has a transaction, mined or in its mempool
+        """
+        from web3.exceptions import TransactionNotFound
+        try:
+            self.w3.eth.get_transaction(tx_hash)
+            return True
+        except TransactionNotFound:
+            return False
+    
+    def anchor_merkle_root(self, root, event_count):
+        """
+        Commit a Merkle root of locally stored events
+        
+        A root that is already on-chain (sent before the batch was marked
+        locally) counts as anchored rather than failed.
+        """
+        if not self.contract:
+            raise ValueError("Contract not initialized")
+        
+        already_anchored = {'transaction_hash': None, 'block_number': None, 'already_anchored': True}
+        try:
+            if self.is_root_anchored(root):
+                return already_anchored
+            
+            function = self.contract.functions.anchorMerkleRoot(root, event_count)
+            tx_hash = self._send_transaction(function)
+            
+            # Wait for transaction receipt
+            tx_receipt = self.wait_for_receipt(tx_hash)
+            
+            return {
+                'transaction_hash': tx_receipt.transactionHash.hex(),
+                'block_number': tx_receipt.blockNumber
+            }
+        except Exception as e:
+            if 'Root already anchored' in str(e):
+                return already_anchored
+            print(f"Error anchoring Merkle root: {e}")
+            return None
+    
+    def is_root_anchored(self, root):
+        """
+        Check if a Merkle root has been anchored on-chain
+        """
+        if not self.contract:
+            raise ValueError("Contract not initialized")
+        
+        return self.contract.functions.isRootAnchored(root).call()
     
     def log_vehicle_entry(self, plate_number, confidence=0.9):
         """
         Log vehicle entry to blockchain
         """
+        if self.anchor:
+            return self.anchor.record_event(plate_number, 'entry', confidence)
+        
         if not self.contract:
             raise ValueError("Contract not initialized")
         
         try:
-            # Estimate gas
-            gas_estimate = self.contract.functions.logVehicleEntry(
-                plate_number, 
-                int(confidence * 100)
-            ).estimate_gas()
-            
-            # Send transaction
-            tx_hash = self.contract.functions.logVehicleEntry(
-                plate_number, 
-                int(confidence * 100)
-            ).transact({'gas': gas_estimate})
+            tx_hash = self.send_vehicle_entry(plate_number, confidence)
             
             # Wait for transaction receipt
-            tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            tx_receipt = self.wait_for_receipt(tx_hash)
             
             return {
                 'transaction_hash': tx_receipt.transactionHash.hex(),
@@ -79,22 +431,17 @@ class BlockchainManager:
         """
         Log vehicle exit to blockchain
         """
+        if self.anchor:
+            return self.anchor.record_event(plate_number, 'exit')
+        
         if not self.contract:
             raise ValueError("Contract not initialized")
         
         try:
-            # Estimate gas
-            gas_estimate = self.contract.functions.logVehicleExit(
-                plate_number
-            ).estimate_gas()
-            
-            # Send transaction
-            tx_hash = self.contract.functions.logVehicleExit(
-                plate_number
-            ).transact({'gas': gas_estimate})
+            tx_hash = self.send_vehicle_exit(plate_number)
             
             # Wait for transaction receipt
-            tx_receipt = self.w3.eth.wait_for_transaction_receipt(tx_hash)
+            tx_receipt = self.wait_for_receipt(tx_hash)
             
             return {
                 'transaction_hash': tx_receipt.transactionHash.hex(),
@@ -104,20 +451,156 @@ class BlockchainManager:
             print(f"Error logging vehicle exit: {e}")
             return None
     
-    def get_vehicle_entries(self, plate_number):
+    def get_vehicle_entries(self, plate_number, offset=0, limit=None):
         """
         Retrieve vehicle entries from blockchain
+        
+        v2 contracts are read page by page; v1 returns the whole history
+        in one call and is sliced locally.
+        
+        :return: List of entry dicts, oldest first
         """
         if not self.contract:
             raise ValueError("Contract not initialized")
         
         try:
-            entries = self.contract.functions.getVehicleEntries(plate_number).call()
-            return entries
+            if self.contract_version == 1:
+                entries = self.contract.functions.getVehicleEntries(plate_number).call()
+                end = None if limit is None else offset + limit
+                return [
+                    {
+                        'owner': owner,
+                        'plate_number': plate,
+                        'entry_timestamp': entry_timestamp,
+                        'exit_timestamp': exit_timestamp,
+                        'is_active': is_active,
+                        'confidence': confidence
+                    }
+                    for owner, plate, entry_timestamp, exit_timestamp, is_active, confidence
+                    in entries[offset:end]
+                ]
+            
+            key = plate_key(plate_number)
+            if limit is None:
+                limit = self.contract.functions.getVehicleEntryCount(key).call() - offset
+            
+            entries = []
+            while len(entries) < limit:
+                page = self.contract.functions.getVehicleEntries(
+                    key,
+                    offset + len(entries),
+                    min(ENTRY_PAGE_SIZE, limit - len(entries))
+                ).call()
+                if not page:
+                    break
+                entries.extend(page)
+            
+            return [
+                {
+                    'owner': owner,
+                    'plate_number': plate_number,
+                    'entry_timestamp': entry_timestamp,
+                    'exit_timestamp': exit_timestamp,
+                    'is_active': is_active,
+                    'confidence': confidence
+                }
+                for owner, entry_timestamp, confidence, is_active, exit_timestamp in entries
+            ]
         except Exception as e:
             print(f"Error retrieving vehicle entries: {e}")
             return []
     
+    def is_vehicle_active(self, plate_number):
+        """
+        Whether a vehicle is currently inside, reconnecting once if the node dropped
+        """
+        if not self.contract:
+            raise ValueError("Contract not initialized")
+        
+        plate = self._plate_query([plate_number])[0]
+        try:
+            return self.contract.functions.isVehicleActive(plate).call()
+        except (ConnectionError, OSError):
+            self.reconnect()
+            return self.contract.functions.isVehicleActive(plate).call()
+    
+    def supports_bulk_status(self):
+        """
+        Whether the deployed contract has the areVehiclesActive view
+        """
+        if not self.contract:
+            return False
+        names = {item.get('name') for item in self.contract.abi if item.get('type') == 'function'}
+        return 'areVehiclesActive' in names
+    
+    def _invalidate_changed_statuses(self):
+        """
+        Drop cached statuses of plates entering or exiting since the last check
+        """
+        from .event_indexer import INDEXED_EVENTS
+        
+        head = self.w3.eth.block_number
+        with self._status_lock:
+            from_block = self._status_block
+            self._status_block = head
+        if from_block is None or head <= from_block:
+            return
+        
+        topics = {
+            '0x' + self.w3.keccak(text=signature).hex().replace('0x', ''): name
+            for name, signature in INDEXED_EVENTS.items()
+        }
+        logs = self.w3.eth.get_logs({
+            'address': self.contract.address,
+            'fromBlock': from_block + 1,
+            'toBlock': head,
+            'topics': [list(topics)]
+        })
+        
+        changed = set()
+        for log in logs:
+            name = topics['0x' + log['topics'][0].hex().replace('0x', '')]
+            event = getattr(self.contract.events, name)().process_log(log)
+            changed.add(event['args']['plateNumber'])
+        self.status_cache.invalidate(changed)
+    
+    def are_vehicles_active(self, plate_numbers, chunk_size=500):
+        """
+        Active status of many plates with one eth_call per chunk
+        
+        Fresh results come from the status cache; the rest are read through
+        areVehiclesActive, or one isVehicleActive call per plate on
+        contracts deployed without it.
+        
+        :return: {plate_number: is_active}
+        """
+        if not self.contract:
+            raise ValueError("Contract not initialized")
+        
+        plate_numbers = list(dict.fromkeys(plate_numbers))
+        self._invalidate_changed_statuses()
+        
+        statuses = self.status_cache.get_many(plate_numbers)
+        missing = [plate for plate in plate_numbers if plate not in statuses]
+        bulk = self.supports_bulk_status()
+        
+        for i in range(0, len(missing), chunk_size):
+            chunk = missing[i:i + chunk_size]
+            if bulk:
+                results = self.contract.functions.areVehiclesActive(
+                    self._plate_query(chunk)
+                ).call()
+            else:
+                results = [
+                    self.contract.functions.isVehicleActive(plate).call()
+                    for plate in self._plate_query(chunk)
+                ]
+            fetched = dict(zip(chunk, results))
+            self.status_cache.put_many(fetched)
+            statuses.update(fetched)
+        
+        return {plate: statuses[plate] for plate in plate_numbers}
+    
     def verify_vehicle_entry(self, plate_number):
         """
         Check if a vehicle has been logged
@@ -125,6 +608,18 @@ class BlockchainManager:
         entries = self.get_vehicle_entries(plate_number)
         return len(entries) > 0
     
+    @property
+    def indexer(self):
+        """
+        Local index of VehicleEntered / VehicleExited logs, created on first use
+        """
+        if self._indexer is None:
+            if not self.contract:
+                raise ValueError("Contract not initialized")
+            from .event_indexer import EventIndexer
+            self._indexer = EventIndexer(self.w3, self.contract)
+        return self._indexer
+    
     def get_entries_by_date_range(self, start_date=None, end_date=None):
         """
         Retrieve entries within a specific date range
@@ -133,36 +628,31 @@ class BlockchainManager:
         :param end_date: Optional end date (datetime or ISO format string)
         :return: Filtered entries
         """
-        # Convert string dates to datetime if needed
-        if isinstance(start_date, str):
-            start_date = datetime.fromisoformat(start_date)
-        if isinstance(end_date, str):
-            end_date = datetime.fromisoformat(end_date)
-        
-        filtered_entries = []
-        entries = self.get_vehicle_entries(None)
-        for entry in entries:
-            if (start_date is None or entry['entry_timestamp'] >= start_date) and \
-               (end_date is None or entry['entry_timestamp'] <= end_date):
-                filtered_entries.append(entry)
-        
-        return filtered_entries
+        try:
+            self.indexer.sync()
+            return self.indexer.get_events(start_date=start_date, end_date=end_date)
+        except Exception as e:
+            print(f"Error retrieving entries by date range: {e}")
+            return []
     
-    def export_entries(self, filename=None):
+    def export_entries(self, filename=None, plate_number=None, start_date=None, end_date=None):
         """
-        Export all entries to a JSON file
+        Stream entries to a JSONL, CSV or Parquet file (by extension)
         
         :param filename: Optional custom filename
         :return: Path to exported file
         """
         if not filename:
-            filename = f"vehicle_entries_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            filename = f"vehicle_entries_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
         
         try:
-            entries = self.get_vehicle_entries(None)
-            with open(filename, 'w') as f:
-                json.dump(entries, f, indent=4)
-            return filename
+            self.indexer.sync()
+            return self.indexer.export(
+                filename,
+                plate_number=plate_number,
+                start_date=start_date,
+                end_date=end_date
+            )
         except Exception as e:
             print(f"Error exporting entries: {e}")
             return None
@@ -171,11 +661,13 @@ class BlockchainManager:
         """
         Retrieve entry details by transaction hash
         """
-        entries = self.get_vehicle_entries(None)
-        for entry in entries:
-            if entry['transaction_hash'] == transaction_hash:
-                return entry
-        return None
+        try:
+            self.indexer.sync()
+            events = self.indexer.get_by_transaction_hash(transaction_hash)
+            return events[0] if events else None
+        except Exception as e:
+            print(f"Error retrieving entry by hash: {e}")
+            return None
 
     @classmethod
     def from_deployment(cls, contract_address, contract_abi):
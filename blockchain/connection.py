@@ -0,0 +1,77 @@
+import json
+import os
+import threading
+import time
+
+# Local Hardhat node
+DEFAULT_PROVIDER_URI = 'http://127.0.0.1:8545'
+
+_deployment_cache = {}
+_deployment_lock = threading.Lock()
+
+
+def make_provider(provider_uri=DEFAULT_PROVIDER_URI, pool_size=20, timeout=10):
+    """
+    Web3 provider for an http(s), ws(s) or IPC endpoint
+
+    HTTP providers share one keep-alive session with a connection pool
+    sized for concurrent API requests.
+    """
+    from web3 import Web3
+
+    if provider_uri.startswith(('ws://', 'wss://')):
+        # web3 v7 renamed the synchronous websocket provider
+        provider_class = getattr(Web3, 'LegacyWebSocketProvider', None) or Web3.WebsocketProvider
+        return provider_class(provider_uri, websocket_timeout=timeout)
+
+    if provider_uri.startswith(('http://', 'https://')):
+        import requests
+        session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        return Web3.HTTPProvider(
+            provider_uri,
+            request_kwargs={'timeout': timeout},
+            session=session
+        )
+
+    # Anything else is treated as an IPC socket path
+    return Web3.IPCProvider(provider_uri, timeout=timeout)
+
+
+def connect(w3, provider_uri, retries=5, backoff=0.5, max_backoff=8.0):
+    """
+    Point w3 at a fresh provider, retrying with exponential backoff
+
+    :raises ConnectionError: If the node is still unreachable after retries
+    """
+    delay = backoff
+    for attempt in range(retries):
+        w3.provider = make_provider(provider_uri)
+        if w3.is_connected():
+            return w3
+        if attempt < retries - 1:
+            time.sleep(delay)
+            delay = min(delay * 2, max_backoff)
+
+    raise ConnectionError(f"Unable to connect to Ethereum node at {provider_uri}")
+
+
+def load_deployment_info(deployment_path):
+    """
+    Parsed deployment-info.json, cached until the file changes
+    """
+    mtime = os.path.getmtime(deployment_path)
+    with _deployment_lock:
+        cached = _deployment_cache.get(deployment_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with open(deployment_path, 'r') as f:
+            deployment_info = json.load(f)
+        _deployment_cache[deployment_path] = (mtime, deployment_info)
+        return deployment_info
@@ -25,12 +25,36 @@ contract VehicleRegistry {
         uint256 exitTimestamp
     );
 
+    // Emitted for plates skipped inside a batch instead of reverting it
+    event VehicleEntryRejected(
+        address indexed owner,
+        string plateNumber,
+        string reason
+    );
+
+    event VehicleExitRejected(
+        address indexed owner,
+        string plateNumber,
+        string reason
+    );
+
+    // Emitted when a Merkle root of locally stored events is anchored
+    event MerkleRootAnchored(
+        bytes32 indexed root,
+        uint256 eventCount,
+        uint256 timestamp
+    );
+
     // Mapping to store vehicle entries
     mapping(string => VehicleEntry[]) public vehicleEntries;
     
     // Mapping to track current active entries
     mapping(string => bool) public activeVehicles;
 
+    // Anchored Merkle roots and when they were committed
+    mapping(bytes32 => uint256) public anchoredRoots;
+    bytes32[] public rootHistory;
+
     // Owner of the contract
     address public owner;
 
@@ -53,6 +77,61 @@ contract VehicleRegistry {
         // Prevent re-entry of active vehicles
         require(!activeVehicles[_plateNumber], "Vehicle already in parking");
 
+        return _logEntry(_plateNumber, _confidence);
+    }
+
+    // Function to log several vehicle entries in one transaction
+    function logVehicleEntriesBatch(
+        string[] memory _plateNumbers,
+        uint256[] memory _confidences
+    ) public returns (bool[] memory) {
+        require(_plateNumbers.length == _confidences.length, "Length mismatch");
+
+        bool[] memory logged = new bool[](_plateNumbers.length);
+        for (uint256 i = 0; i < _plateNumbers.length; i++) {
+            // Skip active vehicles instead of reverting the whole batch
+            if (activeVehicles[_plateNumbers[i]]) {
+                emit VehicleEntryRejected(msg.sender, _plateNumbers[i], "Vehicle already in parking");
+                continue;
+            }
+            _logEntry(_plateNumbers[i], _confidences[i]);
+            logged[i] = true;
+        }
+
+        return logged;
+    }
+
+    // Function to log vehicle exit
+    function logVehicleExit(string memory _plateNumber) public {
+        require(activeVehicles[_plateNumber], "Vehicle not in parking");
+
+        _logExit(_plateNumber);
+    }
+
+    // Function to log several vehicle exits in one transaction
+    function logVehicleExitsBatch(string[] memory _plateNumbers)
+        public
+        returns (bool[] memory)
+    {
+        bool[] memory logged = new bool[](_plateNumbers.length);
+        for (uint256 i = 0; i < _plateNumbers.length; i++) {
+            // Skip inactive vehicles instead of reverting the whole batch
+            if (!activeVehicles[_plateNumbers[i]]) {
+                emit VehicleExitRejected(msg.sender, _plateNumbers[i], "Vehicle not in parking");
+                continue;
+            }
+            _logExit(_plateNumbers[i]);
+            logged[i] = true;
+        }
+
+        return logged;
+    }
+
+    // Record an entry for a vehicle known not to be active
+    function _logEntry(
+        string memory _plateNumber,
+        uint256 _confidence
+    ) internal returns (uint256) {
         VehicleEntry memory newEntry = VehicleEntry({
             owner: msg.sender,
             plateNumber: _plateNumber,
@@ -75,10 +154,8 @@ contract VehicleRegistry {
         return vehicleEntries[_plateNumber].length - 1;
     }
 
-    // Function to log vehicle exit
-    function logVehicleExit(string memory _plateNumber) public {
-        require(activeVehicles[_plateNumber], "Vehicle not in parking");
-
+    // Close the last entry of a vehicle known to be active
+    function _logExit(string memory _plateNumber) internal {
         // Find the last active entry for this plate number
         uint256 lastEntryIndex = vehicleEntries[_plateNumber].length - 1;
         VehicleEntry storage entry = vehicleEntries[_plateNumber][lastEntryIndex];
@@ -94,6 +171,37 @@ contract VehicleRegistry {
         emit VehicleExited(msg.sender, _plateNumber, block.timestamp);
     }
 
+    // Commit the Merkle root of a batch of locally stored events
+    function anchorMerkleRoot(bytes32 _root, uint256 _eventCount) public onlyOwner {
+        require(anchoredRoots[_root] == 0, "Root already anchored");
+
+        anchoredRoots[_root] = block.timestamp;
+        rootHistory.push(_root);
+
+        emit MerkleRootAnchored(_root, _eventCount, block.timestamp);
+    }
+
+    // Function to check if a Merkle root has been anchored
+    function isRootAnchored(bytes32 _root) public view returns (bool) {
+        return anchoredRoots[_root] != 0;
+    }
+
+    // Verify an inclusion proof against an anchored root (sorted-pair hashing)
+    function verifyInclusion(
+        bytes32 _root,
+        bytes32 _leaf,
+        bytes32[] memory _proof
+    ) public view returns (bool) {
+        bytes32 computed = _leaf;
+        for (uint256 i = 0; i < _proof.length; i++) {
+            bytes32 sibling = _proof[i];
+            computed = computed < sibling
+                ? keccak256(abi.encodePacked(computed, sibling))
+                : keccak256(abi.encodePacked(sibling, computed));
+        }
+        return computed == _root && anchoredRoots[_root] != 0;
+    }
+
     // Function to get vehicle entry history
     function getVehicleEntries(string memory _plateNumber) 
         public 
@@ -111,4 +219,17 @@ contract VehicleRegistry {
     {
         return activeVehicles[_plateNumber];
     }
-} 
\ No newline at end of file
+
+    // Function to check several vehicles in one call
+    function areVehiclesActive(string[] memory _plateNumbers)
+        public
+        view
+        returns (bool[] memory)
+    {
+        bool[] memory active = new bool[](_plateNumbers.length);
+        for (uint256 i = 0; i < _plateNumbers.length; i++) {
+            active[i] = activeVehicles[_plateNumbers[i]];
+        }
+        return active;
+    }
+}
\ No newline at end of file
@@ -0,0 +1,247 @@
+// SPDX-License-Identifier: MIT
+pragma solidity ^0.8.24;
+
+// Gas-optimized registry: plates are keyed by keccak256(plateNumber),
+// computed client-side, and the plate string only appears in events
+contract VehicleRegistryV2 {
+    // Packed into two storage slots
+    struct VehicleEntry {
+        address owner;
+        uint64 entryTimestamp;
+        uint8 confidence;
+        bool isActive;
+        uint64 exitTimestamp;
+    }
+
+    // Same signatures as v1 so log indexing works for both versions
+    event VehicleEntered(
+        address indexed owner,
+        string plateNumber,
+        uint256 entryTimestamp
+    );
+
+    event VehicleExited(
+        address indexed owner,
+        string plateNumber,
+        uint256 exitTimestamp
+    );
+
+    // Emitted for plates skipped inside a batch instead of reverting it
+    event VehicleEntryRejected(
+        address indexed owner,
+        string plateNumber,
+        string reason
+    );
+
+    event VehicleExitRejected(
+        address indexed owner,
+        string plateNumber,
+        string reason
+    );
+
+    // Emitted when a Merkle root of locally stored events is anchored
+    event MerkleRootAnchored(
+        bytes32 indexed root,
+        uint256 eventCount,
+        uint256 timestamp
+    );
+
+    // Entry history per plate key; a plate is active when its last entry is
+    mapping(bytes32 => VehicleEntry[]) private vehicleEntries;
+
+    // Anchored Merkle roots and when they were committed
+    mapping(bytes32 => uint256) public anchoredRoots;
+    bytes32[] public rootHistory;
+
+    // Owner of the contract
+    address public owner;
+
+    // Constructor
+    constructor() {
+        owner = msg.sender;
+    }
+
+    // Modifier to restrict access to owner
+    modifier onlyOwner() {
+        require(msg.sender == owner, "Not authorized");
+        _;
+    }
+
+    // Function to log vehicle entry
+    function logVehicleEntry(
+        bytes32 _plateKey,
+        string calldata _plateNumber,
+        uint8 _confidence
+    ) public returns (uint256) {
+        // Prevent re-entry of active vehicles
+        require(!_isActive(_plateKey), "Vehicle already in parking");
+
+        return _logEntry(_plateKey, _plateNumber, _confidence);
+    }
+
+    // Function to log several vehicle entries in one transaction
+    function logVehicleEntriesBatch(
+        bytes32[] calldata _plateKeys,
+        string[] calldata _plateNumbers,
+        uint8[] calldata _confidences
+    ) public returns (bool[] memory) {
+        require(
+            _plateKeys.length == _plateNumbers.length &&
+                _plateKeys.length == _confidences.length,
+            "Length mismatch"
+        );
+
+        bool[] memory logged = new bool[](_plateKeys.length);
+        for (uint256 i = 0; i < _plateKeys.length; i++) {
+            // Skip active vehicles instead of reverting the whole batch
+            if (_isActive(_plateKeys[i])) {
+                emit VehicleEntryRejected(msg.sender, _plateNumbers[i], "Vehicle already in parking");
+                continue;
+            }
+            _logEntry(_plateKeys[i], _plateNumbers[i], _confidences[i]);
+            logged[i] = true;
+        }
+
+        return logged;
+    }
+
+    // Function to log vehicle exit
+    function logVehicleExit(bytes32 _plateKey, string calldata _plateNumber) public {
+        require(_isActive(_plateKey), "Vehicle not in parking");
+
+        _logExit(_plateKey, _plateNumber);
+    }
+
+    // Function to log several vehicle exits in one transaction
+    function logVehicleExitsBatch(
+        bytes32[] calldata _plateKeys,
+        string[] calldata _plateNumbers
+    ) public returns (bool[] memory) {
+        require(_plateKeys.length == _plateNumbers.length, "Length mismatch");
+
+        bool[] memory logged = new bool[](_plateKeys.length);
+        for (uint256 i = 0; i < _plateKeys.length; i++) {
+            // Skip inactive vehicles instead of reverting the whole batch
+            if (!_isActive(_plateKeys[i])) {
+                emit VehicleExitRejected(msg.sender, _plateNumbers[i], "Vehicle not in parking");
+                continue;
+            }
+            _logExit(_plateKeys[i], _plateNumbers[i]);
+            logged[i] = true;
+        }
+
+        return logged;
+    }
+
+    function _isActive(bytes32 _plateKey) internal view returns (bool) {
+        VehicleEntry[] storage entries = vehicleEntries[_plateKey];
+        return entries.length > 0 && entries[entries.length - 1].isActive;
+    }
+
+    // Record an entry for a vehicle known not to be active
+    function _logEntry(
+        bytes32 _plateKey,
+        string calldata _plateNumber,
+        uint8 _confidence
+    ) internal returns (uint256) {
+        vehicleEntries[_plateKey].push(VehicleEntry({
+            owner: msg.sender,
+            entryTimestamp: uint64(block.timestamp),
+            confidence: _confidence,
+            isActive: true,
+            exitTimestamp: 0
+        }));
+
+        emit VehicleEntered(msg.sender, _plateNumber, block.timestamp);
+
+        return vehicleEntries[_plateKey].length - 1;
+    }
+
+    // Close the last entry of a vehicle known to be active
+    function _logExit(bytes32 _plateKey, string calldata _plateNumber) internal {
+        VehicleEntry[] storage entries = vehicleEntries[_plateKey];
+        VehicleEntry storage entry = entries[entries.length - 1];
+
+        entry.exitTimestamp = uint64(block.timestamp);
+        entry.isActive = false;
+
+        emit VehicleExited(msg.sender, _plateNumber, block.timestamp);
+    }
+
+    // Commit the Merkle root of a batch of locally stored events
+    function anchorMerkleRoot(bytes32 _root, uint256 _eventCount) public onlyOwner {
+        require(anchoredRoots[_root] == 0, "Root already anchored");
+
+        anchoredRoots[_root] = block.timestamp;
+        rootHistory.push(_root);
+
+        emit MerkleRootAnchored(_root, _eventCount, block.timestamp);
+    }
+
+    // Function to check if a Merkle root has been anchored
+    function isRootAnchored(bytes32 _root) public view returns (bool) {
+        return anchoredRoots[_root] != 0;
+    }
+
+    // Verify an inclusion proof against an anchored root (sorted-pair hashing)
+    function verifyInclusion(
+        bytes32 _root,
+        bytes32 _leaf,
+        bytes32[] memory _proof
+    ) public view returns (bool) {
+        bytes32 computed = _leaf;
+        for (uint256 i = 0; i < _proof.length; i++) {
+            bytes32 sibling = _proof[i];
+            computed = computed < sibling
+                ? keccak256(abi.encodePacked(computed, sibling))
+                : keccak256(abi.encodePacked(sibling, computed));
+        }
+        return computed == _root && anchoredRoots[_root] != 0;
+    }
+
+    // Number of entries recorded for a plate
+    function getVehicleEntryCount(bytes32 _plateKey) public view returns (uint256) {
+        return vehicleEntries[_plateKey].length;
+    }
+
+    // Function to get a page of vehicle entry history
+    function getVehicleEntries(bytes32 _plateKey, uint256 _offset, uint256 _limit)
+        public
+        view
+        returns (VehicleEntry[] memory)
+    {
+        VehicleEntry[] storage entries = vehicleEntries[_plateKey];
+        if (_offset >= entries.length) {
+            return new VehicleEntry[](0);
+        }
+
+        uint256 end = _offset + _limit;
+        if (end > entries.length) {
+            end = entries.length;
+        }
+
+        VehicleEntry[] memory page = new VehicleEntry[](end - _offset);
+        for (uint256 i = _offset; i < end; i++) {
+            page[i - _offset] = entries[i];
+        }
+        return page;
+    }
+
+    // Function to check if a vehicle is currently in parking
+    function isVehicleActive(bytes32 _plateKey) public view returns (bool) {
+        return _isActive(_plateKey);
+    }
+
+    // Function to check several vehicles in one call
+    function areVehiclesActive(bytes32[] calldata _plateKeys)
+        public
+        view
+        returns (bool[] memory)
+    {
+        bool[] memory active = new bool[](_plateKeys.length);
+        for (uint256 i = 0; i < _plateKeys.length; i++) {
+            active[i] = _isActive(_plateKeys[i]);
+        }
+        return active;
+    }
+}
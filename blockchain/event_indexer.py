@@ -0,0 +1,244 @@
+import sqlite3
+import threading
+from datetime import datetime
+
+# Event signatures indexed from VehicleRegistry
+INDEXED_EVENTS = {
+    'VehicleEntered': 'VehicleEntered(address,string,uint256)',
+    'VehicleExited': 'VehicleExited(address,string,uint256)',
+}
+
+
+def _to_unix(value):
+    """Datetime, ISO string or unix seconds to unix seconds"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return int(value.timestamp())
+    return int(value)
+
+
+class EventIndexer:
+    def __init__(self, w3, contract, db_path='vehicle_logs.db', page_size=2000,
+                 reorg_depth=12, start_block=0):
+        """
+        Incremental local index of VehicleEntered / VehicleExited logs
+
+        Logs are pulled with eth_getLogs in block-range pages from a
+        persisted cursor. Block hashes of indexed checkpoints are kept so a
+        reorg rolls the index back to the last block still on the chain,
+        at most reorg_depth blocks behind the cursor.
+        """
+        self.w3 = w3
+        self.contract = contract
+        self.db_path = db_path
+        self.page_size = page_size
+        self.reorg_depth = reorg_depth
+        self.start_block = start_block
+
+        self._lock = threading.Lock()
+        self._topics = {
+            '0x' + self.w3.keccak(text=signature).hex().replace('0x', ''): name
+            for name, signature in INDEXED_EVENTS.items()
+        }
+
+        self.setup_database()
+
+    def setup_database(self):
+        """Create index tables if they don't exist"""
+        conn = sqlite3.connect(self.db_path)
+        cursor = conn.cursor()
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS chain_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            event TEXT NOT NULL,
+            plate_number TEXT NOT NULL,
+            owner TEXT,
+            event_timestamp INTEGER NOT NULL,
+            block_number INTEGER NOT NULL,
+            block_hash TEXT NOT NULL,
+            transaction_hash TEXT NOT NULL,
+            log_index INTEGER NOT NULL,
+            UNIQUE (transaction_hash, log_index)
+        )
+        ''')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_chain_events_plate ON chain_events (plate_number, event_timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_chain_events_time ON chain_events (event_timestamp)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_chain_events_tx ON chain_events (transaction_hash)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_chain_events_block ON chain_events (block_number)')
+
+        cursor.execute('''
+        CREATE TABLE IF NOT EXISTS indexer_checkpoints (
+            block_number INTEGER PRIMARY KEY,
+            block_hash TEXT NOT NULL
+        )
+        ''')
+
+        conn.commit()
+        conn.close()
+
+    def _cursor(self, conn):
+        row = conn.execute('SELECT MAX(block_number) FROM indexer_checkpoints').fetchone()
+        return row[0] if row[0] is not None else self.start_block - 1
+
+    def _block_hash(self, block_number):
+        return self.w3.eth.get_block(block_number)['hash'].hex()
+
+    def _rollback_reorg(self, conn):
+        """
+        Drop indexed data above the last checkpoint still on the chain
+        """
+        head = self.w3.eth.block_number
+        checkpoints = conn.execute('''
+        SELECT block_number, block_hash FROM indexer_checkpoints
+        ORDER BY block_number DESC
+        ''').fetchall()
+        if not checkpoints:
+            return
+
+        cursor = checkpoints[0][0]
+        safe_block = max(self.start_block - 1, cursor - self.reorg_depth)
+        for block_number, block_hash in checkpoints:
+            if block_number < safe_block:
+                break
+            if block_number <= head and self._block_hash(block_number) == block_hash:
+                safe_block = block_number
+                break
+
+        if safe_block < cursor:
+            conn.execute('DELETE FROM chain_events WHERE block_number > ?', (safe_block,))
+            conn.execute('DELETE FROM indexer_checkpoints WHERE block_number > ?', (safe_block,))
+            conn.commit()
+
+    def _decode(self, log):
+        name = self._topics.get('0x' + log['topics'][0].hex().replace('0x', ''))
+        if name is None:
+            return None
+        event = getattr(self.contract.events, name)().process_log(log)
+        args = event['args']
+        return (
+            name,
+            args['plateNumber'],
+            args['owner'],
+            args['entryTimestamp'] if name == 'VehicleEntered' else args['exitTimestamp'],
+            log['blockNumber'],
+            log['blockHash'].hex(),
+            log['transactionHash'].hex(),
+            log['logIndex']
+        )
+
+    def sync(self):
+        """
+        Index new logs up to the chain head
+
+        :return: Number of events indexed
+        """
+        with self._lock:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                self._rollback_reorg(conn)
+
+                head = self.w3.eth.block_number
+                from_block = self._cursor(conn) + 1
+                indexed = 0
+
+                while from_block <= head:
+                    to_block = min(from_block + self.page_size - 1, head)
+                    logs = self.w3.eth.get_logs({
+                        'address': self.contract.address,
+                        'fromBlock': from_block,
+                        'toBlock': to_block,
+                        'topics': [list(self._topics)]
+                    })
+
+                    rows = [row for row in (self._decode(log) for log in logs) if row]
+                    conn.executemany('''
+                    INSERT OR IGNORE INTO chain_events
+                        (event, plate_number, owner, event_timestamp, block_number,
+                         block_hash, transaction_hash, log_index)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', rows)
+                    conn.execute('''
+                    INSERT OR REPLACE INTO indexer_checkpoints (block_number, block_hash)
+                    VALUES (?, ?)
+                    ''', (to_block, self._block_hash(to_block)))
+
+                    # Only recent checkpoints are needed for reorg detection
+                    conn.execute('''
+                    DELETE FROM indexer_checkpoints
+                    WHERE block_number < ? AND block_number != ?
+                    ''', (to_block - self.reorg_depth * 4, to_block))
+                    conn.commit()
+
+                    indexed += len(rows)
+                    from_block = to_block + 1
+
+                return indexed
+            finally:
+                conn.close()
+
+    def _query(self, where='', params=()):
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            cursor = conn.execute(f'''
+            SELECT event, plate_number, owner, event_timestamp, block_number,
+                   transaction_hash, log_index
+            FROM chain_events
+            {where}
+            ORDER BY block_number, log_index
+            ''', params)
+            return [
+                dict(row, timestamp=datetime.fromtimestamp(row['event_timestamp']).isoformat())
+                for row in cursor.fetchall()
+            ]
+        finally:
+            conn.close()
+
+    def get_events(self, plate_number=None, start_date=None, end_date=None, event=None):
+        """
+        Indexed events filtered by plate, time range and event name
+        """
+        clauses = []
+        params = []
+        if plate_number is not None:
+            clauses.append('plate_number = ?')
+            params.append(plate_number)
+        if start_date is not None:
+            clauses.append('event_timestamp >= ?')
+            params.append(_to_unix(start_date))
+        if end_date is not None:
+            clauses.append('event_timestamp <= ?')
+            params.append(_to_unix(end_date))
+        if event is not None:
+            clauses.append('event = ?')
+            params.append(event)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return self._query(where, params)
+
+    def get_by_transaction_hash(self, transaction_hash):
+        """
+        Indexed events emitted by a transaction
+        """
+        if not transaction_hash.startswith('0x'):
+            transaction_hash = '0x' + transaction_hash
+        return self._query('WHERE transaction_hash IN (?, ?)', (transaction_hash, transaction_hash[2:]))
+
+    def export(self, filename, plate_number=None, start_date=None, end_date=None,
+               fmt=None, chunk_size=10000):
+        """
+        Stream indexed events to a JSONL, CSV or Parquet file in chunks
+        """
+        from database.export import export_rows
+        export_rows(
+            self.db_path, filename, fmt, source='events',
+            plate_number=plate_number,
+            start_date=start_date,
+            end_date=end_date,
+            chunk_size=chunk_size
+        )
+        return filename
@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+def args_size_bucket(args):
+    """
+    Power-of-two bucket of the encoded size of contract call arguments
+    """
+    def size(value):
+        if isinstance(value, (list, tuple)):
+            return 32 + sum(size(v) for v in value)
+        if isinstance(value, (str, bytes)):
+            return 32 + len(value)
+        return 32
+
+    return sum(size(a) for a in args).bit_length()
+
+
+def cache_key(function):
+    """
+    Cache key of a bound contract call
+
+    Batch calls are keyed on their exact element counts, since gas grows
+    with every plate; the size bucket only separates long strings.
+    """
+    counts = tuple(len(a) for a in function.args if isinstance(a, (list, tuple)))
+    return (function.fn_name, counts, args_size_bucket(function.args))
+
+
+def _tx_id(tx_hash):
+    tx_hex = tx_hash if isinstance(tx_hash, str) else tx_hash.hex()
+    tx_hex = tx_hex.lower()
+    return tx_hex[2:] if tx_hex.startswith('0x') else tx_hex
+
+
+class GasCache:
+    def __init__(self, ttl=300, margin=1.25, max_tracked=10000):
+        """
+        Gas limits keyed by contract function and argument shape
+
+        Saves the estimate_gas round trip before each transaction. Entries
+        are re-estimated after ttl seconds, and dropped as soon as a
+        transaction sent with them reverts.
+
+        :param margin: Multiplier applied on top of the largest estimate seen
+        :param max_tracked: Sent transactions remembered until their receipt arrives
+        """
+        self.ttl = ttl
+        self.margin = margin
+        self.max_tracked = max_tracked
+        self._cache = {}
+        self._sent = OrderedDict()
+        self._lock = threading.Lock()
+
+    def gas_for(self, function):
+        """
+        Gas limit for a bound contract function call
+        """
+        key = cache_key(function)
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and now - cached[1] < self.ttl:
+                return cached[0]
+
+        estimate = int(function.estimate_gas() * self.margin)
+
+        with self._lock:
+            # Keep the largest estimate seen for this key
+            cached = self._cache.get(key)
+            if cached and now - cached[1] < self.ttl:
+                estimate = max(estimate, cached[0])
+            self._cache[key] = (estimate, now)
+        return estimate
+
+    def track(self, tx_hash, function):
+        """
+        Remember which cache entry a sent transaction used
+        """
+        with self._lock:
+            self._sent[_tx_id(tx_hash)] = cache_key(function)
+            while len(self._sent) > self.max_tracked:
+                self._sent.popitem(last=False)
+
+    def settle(self, tx_hash, status):
+        """
+        Forget a mined transaction, evicting its cache entry if it reverted
+        """
+        with self._lock:
+            key = self._sent.pop(_tx_id(tx_hash), None)
+            if key is not None and status != 1:
+                self._cache.pop(key, None)
+
+    def invalidate(self, function=None):
+        """
+        Drop one function's entry, or everything
+        """
+        with self._lock:
+            if function is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(cache_key(function), None)
@@ -0,0 +1,54 @@
+import threading
+
+
+class NonceManager:
+    def __init__(self, w3, account):
+        """
+        Allocate transaction nonces locally so several can be in flight
+
+        The counter starts from the node's pending transaction count and
+        is resynced from the node after any submission error. While the
+        node cannot be reached the counter is left unset, so the next
+        allocate() fetches it again instead of guessing.
+        """
+        self.w3 = w3
+        self.account = account
+        self._lock = threading.Lock()
+        self._next_nonce = None
+
+    def _fetch(self):
+        return self.w3.eth.get_transaction_count(self.account, 'pending')
+
+    def allocate(self):
+        """
+        Reserve the next nonce
+        """
+        with self._lock:
+            if self._next_nonce is None:
+                self._next_nonce = self._fetch()
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            return nonce
+
+    def release(self, nonce):
+        """
+        Hand back a nonce whose transaction was not sent
+
+        The counter is rewound if it was the latest nonce handed out;
+        otherwise later nonces are in flight and the counter is
+        refetched from the node on the next allocate().
+        """
+        with self._lock:
+            if self._next_nonce == nonce + 1:
+                self._next_nonce = nonce
+            else:
+                self._next_nonce = None
+
+    def resync(self):
+        """
+        Reset the local counter from the node's pending count
+        """
+        with self._lock:
+            self._next_nonce = None
+            self._next_nonce = self._fetch()
+            return self._next_nonce
@@ -0,0 +1,205 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+
+def _owner_alive(owner):
+    """
+    False only for an owner on this host whose process has exited
+    """
+    try:
+        host, pid, _ = owner.split(':', 2)
+        pid = int(pid)
+    except ValueError:
+        return True
+    if host != socket.gethostname():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class ChainOutbox:
+    def __init__(self, db_path='vehicle_logs.db', lease_seconds=30.0):
+        """
+        Append-only journal of intended chain writes
+
+        Every write is recorded before it is sent, so events queued while
+        the node is unreachable (or before a restart) are replayed in
+        order once it comes back. Rows move queued -> sent -> done.
+
+        Each unfinished row is leased to one outbox (owner) at a time, so
+        several processes sharing the database never send the same write
+        twice. Rows of an owner that stopped renewing its lease, or whose
+        process on this host has exited, are claimed by the next claim().
+
+        :param lease_seconds: How long a claim holds without renew()
+        """
+        self.db_path = db_path
+        self.lease_seconds = lease_seconds
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self.setup_database()
+
+    def setup_database(self):
+        """Create the outbox table if it doesn't exist"""
+        with self._lock:
+            self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS chain_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                action TEXT NOT NULL,
+                plate_number TEXT NOT NULL,
+                confidence REAL,
+                entry_id INTEGER,
+                state TEXT NOT NULL DEFAULT 'queued',
+                transaction_hash TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                last_error TEXT,
+                enqueued_at REAL NOT NULL,
+                sent_at REAL,
+                done_at REAL,
+                owner TEXT,
+                lease_until REAL
+            )
+            ''')
+
+            # Journals created before rows were leased
+            columns = {row[1] for row in self._conn.execute('PRAGMA table_info(chain_outbox)')}
+            for column, column_type in (('owner', 'TEXT'), ('lease_until', 'REAL')):
+                if column not in columns:
+                    self._conn.execute(f'ALTER TABLE chain_outbox ADD COLUMN {column} {column_type}')
+
+            self._conn.execute('CREATE INDEX IF NOT EXISTS idx_chain_outbox_state ON chain_outbox (state, id)')
+            self._conn.commit()
+
+    def append(self, action, plate_number, confidence=None, entry_id=None):
+        """
+        Journal a write, leased to this outbox
+
+        :return: Outbox row id
+        """
+        now = time.time()
+        with self._lock:
+            cursor = self._conn.execute('''
+            INSERT INTO chain_outbox
+                (action, plate_number, confidence, entry_id, enqueued_at, owner, lease_until)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (action, plate_number, confidence, entry_id, now,
+                  self.owner, now + self.lease_seconds))
+            self._conn.commit()
+            return cursor.lastrowid
+
+    def claim(self):
+        """
+        Take over unfinished rows nobody holds a live lease on
+
+        :return: Newly claimed queued and sent rows in journal order
+        """
+        now = time.time()
+        with self._lock:
+            # IMMEDIATE takes the write lock, so no other process claims in between
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                cursor = self._conn.execute('''
+                SELECT id, action, plate_number, confidence, entry_id, state,
+                       transaction_hash, owner, lease_until
+                FROM chain_outbox
+                WHERE state IN ('queued', 'sent') AND (owner IS NULL OR owner != ?)
+                ORDER BY id
+                ''', (self.owner,))
+                columns = [column[0] for column in cursor.description]
+                rows = [
+                    row for row in (dict(zip(columns, values)) for values in cursor.fetchall())
+                    if row['owner'] is None
+                    or (row['lease_until'] or 0) < now
+                    or not _owner_alive(row['owner'])
+                ]
+                self._conn.executemany(
+                    'UPDATE chain_outbox SET owner = ?, lease_until = ? WHERE id = ?',
+                    [(self.owner, now + self.lease_seconds, row['id']) for row in rows]
+                )
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+
+        for row in rows:
+            del row['owner'], row['lease_until']
+        return rows
+
+    def renew(self):
+        """Extend the lease on every unfinished row this outbox holds"""
+        with self._lock:
+            self._conn.execute('''
+            UPDATE chain_outbox SET lease_until = ?
+            WHERE owner = ? AND state IN ('queued', 'sent')
+            ''', (time.time() + self.lease_seconds, self.owner))
+            self._conn.commit()
+
+    def mark_sent(self, outbox_ids, transaction_hash):
+        with self._lock:
+            self._conn.executemany('''
+            UPDATE chain_outbox
+            SET state = 'sent', transaction_hash = ?, sent_at = ?, attempts = attempts + 1
+            WHERE id = ?
+            ''', [(transaction_hash, time.time(), outbox_id) for outbox_id in outbox_ids])
+            self._conn.commit()
+
+    def mark_retry(self, outbox_ids, error):
+        """Put rows back in the queue after a connectivity failure"""
+        with self._lock:
+            self._conn.executemany('''
+            UPDATE chain_outbox
+            SET state = 'queued', attempts = attempts + 1, last_error = ?
+            WHERE id = ?
+            ''', [(error, outbox_id) for outbox_id in outbox_ids])
+            self._conn.commit()
+
+    def mark_done(self, outbox_ids, error=None):
+        with self._lock:
+            self._conn.executemany('''
+            UPDATE chain_outbox
+            SET state = 'done', done_at = ?, last_error = ?
+            WHERE id = ?
+            ''', [(time.time(), error, outbox_id) for outbox_id in outbox_ids])
+            self._conn.commit()
+
+    def metrics(self):
+        """
+        Backlog and lag of the journal
+
+        lag_seconds is the age of the oldest write not yet sent.
+        """
+        now = time.time()
+        with self._lock:
+            queued, sent, oldest = self._conn.execute('''
+            SELECT
+                SUM(state = 'queued'),
+                SUM(state = 'sent'),
+                MIN(CASE WHEN state = 'queued' THEN enqueued_at END)
+            FROM chain_outbox
+            ''').fetchone()
+            last_sent = self._conn.execute(
+                'SELECT MAX(sent_at) FROM chain_outbox'
+            ).fetchone()[0]
+
+        return {
+            'queued': queued or 0,
+            'sent': sent or 0,
+            'lag_seconds': now - oldest if oldest else 0.0,
+            'seconds_since_last_send': now - last_sent if last_sent else None
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
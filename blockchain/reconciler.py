@@ -0,0 +1,154 @@
+import threading
+import time
+
+
+class TransactionReconciler:
+    def __init__(self, blockchain_manager, db_manager, write_queue=None,
+                 confirmations=1, poll_interval=5.0, drop_after=300, batch_size=500):
+        """
+        Background reconciliation of vehicle_entries against the chain
+
+        Entry and exit writes with a transaction that is not settled yet
+        are polled in bulk, one receipt lookup per distinct transaction. A
+        mined transaction is confirmed once it is confirmations blocks deep;
+        one the node no longer knows after drop_after seconds is marked
+        dropped and, with a write_queue, resubmitted as the same action.
+
+        :param blockchain_manager: BlockchainManager (or a callable returning one)
+        :param db_manager: DatabaseManager owning vehicle_entries
+        :param write_queue: Optional BlockchainWriteQueue used to resubmit dropped writes
+        :param confirmations: Blocks (including its own) before a transaction is final
+        """
+        self._blockchain_manager = blockchain_manager
+        self.db_manager = db_manager
+        self.write_queue = write_queue
+        self.confirmations = max(1, int(confirmations))
+        self.poll_interval = poll_interval
+        self.drop_after = drop_after
+        self.batch_size = batch_size
+
+        self._totals = {'confirmed': 0, 'failed': 0, 'dropped': 0, 'resubmitted': 0}
+        self._last_run = None
+        self._last_duration = None
+        self._last_error = None
+        self._stopped = threading.Event()
+        self._thread = None
+
+    @property
+    def blockchain_manager(self):
+        if callable(self._blockchain_manager):
+            self._blockchain_manager = self._blockchain_manager()
+        return self._blockchain_manager
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stopped.wait(self.poll_interval):
+            try:
+                self.reconcile_once()
+                self._last_error = None
+            except Exception as e:
+                self._last_error = str(e)
+                print(f"Error reconciling transactions: {e}")
+
+    def _settle_transaction(self, manager, tx_hash, rows, head):
+        """
+        Status updates for the rows sharing one transaction
+        """
+        receipt = manager.get_receipt(tx_hash)
+        if receipt is not None:
+            if receipt.status != 1:
+                status = 'failed'
+            elif head - receipt.blockNumber + 1 >= self.confirmations:
+                status = 'confirmed'
+            else:
+                status = 'mined'
+            return [(row, status, receipt.blockNumber) for row in rows]
+
+        # A mined transaction whose receipt vanished was reorged out
+        if any(row['status'] == 'mined' for row in rows):
+            return [(row, 'submitted', None) for row in rows]
+
+        oldest = max(row['age_seconds'] or 0 for row in rows)
+        if oldest < self.drop_after or manager.is_transaction_known(tx_hash):
+            return []
+        return [(row, 'dropped', None) for row in rows]
+
+    def reconcile_once(self):
+        """
+        One pass over unsettled rows
+
+        :return: Number of rows whose status changed
+        """
+        start = time.monotonic()
+        rows = self.db_manager.get_unsettled_entries(limit=self.batch_size)
+        if not rows:
+            self._last_run = time.time()
+            self._last_duration = time.monotonic() - start
+            return 0
+
+        manager = self.blockchain_manager
+        head = manager.w3.eth.block_number
+
+        by_tx = {}
+        for row in rows:
+            by_tx.setdefault(row['blockchain_tx'], []).append(row)
+
+        updates = {'entry': [], 'exit': []}
+        dropped = []
+        for tx_hash, tx_rows in by_tx.items():
+            for row, status, block_number in self._settle_transaction(manager, tx_hash, tx_rows, head):
+                if status == row['status']:
+                    continue
+                updates[row['action']].append((row['id'], status, None, block_number))
+                if status in self._totals:
+                    self._totals[status] += 1
+                if status == 'dropped':
+                    dropped.append(row)
+
+        for action, action_updates in updates.items():
+            if action_updates:
+                self.db_manager.update_blockchain_statuses(action_updates, action)
+
+        if self.write_queue is not None:
+            for row in dropped:
+                if row['action'] == 'exit':
+                    self.write_queue.submit_exit(row['plate_number'], row['id'])
+                else:
+                    self.write_queue.submit_entry(row['plate_number'], row['confidence'], row['id'])
+                self._totals['resubmitted'] += 1
+
+        self._last_run = time.time()
+        self._last_duration = time.monotonic() - start
+        return sum(len(action_updates) for action_updates in updates.values())
+
+    def metrics(self):
+        """
+        Backlog per status, reconciliation lag and running totals
+
+        lag_seconds is the age of the oldest entry or exit not yet confirmed.
+        """
+        counts = self.db_manager.get_status_counts()
+        unsettled = [
+            counts[status] for status in ('pending', 'submitted', 'mined', 'timeout', 'dropped')
+            if status in counts
+        ]
+        return {
+            'backlog': {status: value['count'] for status, value in counts.items()},
+            'unsettled': sum(value['count'] for value in unsettled),
+            'lag_seconds': max((value['oldest_age_seconds'] or 0 for value in unsettled), default=0.0),
+            'totals': dict(self._totals),
+            'confirmations': self.confirmations,
+            'last_run': self._last_run,
+            'last_run_duration_seconds': self._last_duration,
+            'last_error': self._last_error
+        }
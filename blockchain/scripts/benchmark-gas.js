@@ -0,0 +1,76 @@
+const hre = require("hardhat");
+
+// Plates written per contract; later writes hit warm storage slots
+const PLATE_COUNT = 20;
+const BATCH_SIZE = 10;
+
+function plates(prefix) {
+  return Array.from({ length: PLATE_COUNT }, (_, i) => `${prefix}${String(i).padStart(4, "0")}`);
+}
+
+function plateKey(plateNumber) {
+  return hre.ethers.keccak256(hre.ethers.toUtf8Bytes(plateNumber));
+}
+
+async function gasUsed(txPromise) {
+  const receipt = await (await txPromise).wait();
+  return Number(receipt.gasUsed);
+}
+
+function average(values) {
+  return Math.round(values.reduce((a, b) => a + b, 0) / values.length);
+}
+
+async function measure(contractName, version) {
+  const Factory = await hre.ethers.getContractFactory(contractName);
+  const registry = await Factory.deploy();
+  await registry.waitForDeployment();
+
+  const key = version === 2 ? (plate) => [plateKey(plate), plate] : (plate) => [plate];
+
+  // Single writes, including a second visit per plate
+  const entries = [];
+  const exits = [];
+  for (const plate of plates("KA01AB")) {
+    for (let visit = 0; visit < 2; visit++) {
+      entries.push(await gasUsed(registry.logVehicleEntry(...key(plate), 95)));
+      exits.push(await gasUsed(registry.logVehicleExit(...key(plate))));
+    }
+  }
+
+  // Batched writes, reported per plate
+  const batchPlates = plates("MH12CD").slice(0, BATCH_SIZE);
+  const batchKeys = version === 2 ? [batchPlates.map(plateKey), batchPlates] : [batchPlates];
+  const confidences = batchPlates.map(() => 95);
+  const batchEntry = await gasUsed(registry.logVehicleEntriesBatch(...batchKeys, confidences));
+  const batchExit = await gasUsed(registry.logVehicleExitsBatch(...batchKeys));
+
+  return {
+    contract: contractName,
+    entry: average(entries),
+    exit: average(exits),
+    batchEntryPerPlate: Math.round(batchEntry / BATCH_SIZE),
+    batchExitPerPlate: Math.round(batchExit / BATCH_SIZE)
+  };
+}
+
+async function main() {
+  const results = [
+    await measure("VehicleRegistry", 1),
+    await measure("VehicleRegistryV2", 2)
+  ];
+  console.table(results);
+
+  const [v1, v2] = results;
+  for (const field of ["entry", "exit", "batchEntryPerPlate", "batchExitPerPlate"]) {
+    const saving = (100 * (v1[field] - v2[field])) / v1[field];
+    console.log(`${field}: v2 saves ${saving.toFixed(1)}% gas`);
+  }
+}
+
+main()
+  .then(() => process.exit(0))
+  .catch((error) => {
+    console.error(error);
+    process.exit(1);
+  });
@@ -8,8 +8,12 @@ async function main() {
   
   console.log("Deploying contracts with the account:", deployer.address);
   
+  // REGISTRY_VERSION=2 deploys the gas-optimized VehicleRegistryV2
+  const version = process.env.REGISTRY_VERSION === "2" ? 2 : 1;
+  const contractName = version === 2 ? "VehicleRegistryV2" : "VehicleRegistry";
+  
   // Get the contract factory
-  const VehicleRegistry = await hre.ethers.getContractFactory("VehicleRegistry");
+  const VehicleRegistry = await hre.ethers.getContractFactory(contractName);
   
   // Deploy the contract
   const vehicleRegistry = await VehicleRegistry.deploy();
@@ -18,12 +22,13 @@ async function main() {
   await vehicleRegistry.waitForDeployment();
   
   const contractAddress = await vehicleRegistry.getAddress();
-  console.log("VehicleRegistry deployed to:", contractAddress);
+  console.log(`${contractName} deployed to:`, contractAddress);
   
   // Save contract address and ABI to a file
   const deploymentPath = path.join(__dirname, '..', '..', 'deployment-info.json');
   const contractInfo = {
     address: contractAddress,
+    version: version,
     abi: JSON.parse(JSON.stringify(vehicleRegistry.interface.fragments))
   };
   
@@ -0,0 +1,49 @@
+import threading
+import time
+
+
+class PlateStatusCache:
+    def __init__(self, ttl=5.0):
+        """
+        Short-lived cache of isVehicleActive results
+
+        Entries expire after ttl seconds and are dropped early when an
+        entry or exit for the plate is seen.
+        """
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, plate_numbers):
+        """
+        Cached statuses for the plates that are still fresh
+
+        :return: {plate_number: is_active}
+        """
+        now = time.monotonic()
+        with self._lock:
+            found = {}
+            for plate_number in plate_numbers:
+                cached = self._entries.get(plate_number)
+                if cached is None:
+                    continue
+                if cached[1] <= now:
+                    del self._entries[plate_number]
+                    continue
+                found[plate_number] = cached[0]
+            return found
+
+    def put_many(self, statuses):
+        expires = time.monotonic() + self.ttl
+        with self._lock:
+            for plate_number, is_active in statuses.items():
+                self._entries[plate_number] = (is_active, expires)
+
+    def invalidate(self, plate_numbers):
+        with self._lock:
+            for plate_number in plate_numbers:
+                self._entries.pop(plate_number, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,426 @@
+import collections
+import queue
+import threading
+import time
+
+
+class PendingTransaction:
+    def __init__(self, action, plate_number, entry_id=None, outbox_id=None):
+        """
+        Handle returned immediately for a queued chain write
+        """
+        self.action = action
+        self.plate_number = plate_number
+        self.entry_id = entry_id
+        self.outbox_id = outbox_id
+        self.status = 'queued'
+        self.transaction_hash = None
+        self.block_number = None
+        self.error = None
+        self._done = threading.Event()
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Block until the transaction is confirmed or failed
+        """
+        self._done.wait(timeout)
+        return self.as_dict()
+
+    def as_dict(self):
+        return {
+            'action': self.action,
+            'plate_number': self.plate_number,
+            'status': self.status,
+            'transaction_hash': self.transaction_hash,
+            'block_number': self.block_number,
+            'error': self.error
+        }
+
+
+class BlockchainWriteQueue:
+    def __init__(self, blockchain_manager, db_manager=None, poll_interval=1.0,
+                 receipt_timeout=120, batch_size=20, batch_window=1.0,
+                 outbox=None, retry_backoff=1.0, max_retry_backoff=30.0,
+                 confirmations=1):
+        """
+        Background submission of chain writes, decoupled from the camera loop
+
+        One worker submits transactions in order, grouping plates into
+        batch transactions when the contract supports it; a second polls receipts
+        and records blockchain_tx, block_number and status on the
+        vehicle_entries row when each transaction settles (the exit_*
+        columns for exits).
+
+        While the node is unreachable, writes stay queued and are retried
+        in order with exponential backoff. With an outbox they are also
+        journaled, so writes queued before a restart are replayed. Replay
+        only takes rows the outbox could claim, so several queues sharing
+        one journal never send the same write twice.
+
+        :param blockchain_manager: BlockchainManager (or a callable returning one)
+        :param db_manager: Optional DatabaseManager updated as transactions settle
+        :param batch_size: Most plates sent in one batch transaction
+        :param batch_window: Seconds to accumulate plates before flushing a batch
+        :param outbox: Optional ChainOutbox journaling every write
+        :param confirmations: Above 1, mined writes are recorded as 'mined' and
+            left to a TransactionReconciler to confirm at that depth
+        """
+        self._blockchain_manager = blockchain_manager
+        self.db_manager = db_manager
+        self.poll_interval = poll_interval
+        self.receipt_timeout = receipt_timeout
+        self.batch_size = max(1, int(batch_size))
+        self.batch_window = batch_window
+        self.outbox = outbox
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
+        self.mined_status = 'confirmed' if confirmations <= 1 else 'mined'
+
+        self._jobs = queue.Queue()
+        self._retry = collections.deque()
+        self._retry_delay = retry_backoff
+        self._in_flight = []
+        self._in_flight_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._next_claim = 0.0
+
+        if self.outbox is not None:
+            self._replay(self.outbox.claim())
+            self._next_claim = time.monotonic() + self.outbox.lease_seconds / 3
+
+        self._submitter = threading.Thread(target=self._submit_loop, daemon=True)
+        self._tracker = threading.Thread(target=self._track_loop, daemon=True)
+        self._submitter.start()
+        self._tracker.start()
+
+    @property
+    def blockchain_manager(self):
+        if callable(self._blockchain_manager):
+            self._blockchain_manager = self._blockchain_manager()
+        return self._blockchain_manager
+
+    def submit_entry(self, plate_number, confidence=0.9, entry_id=None):
+        """
+        Queue a vehicle entry write and return its handle immediately
+        """
+        handle = PendingTransaction('entry', plate_number, entry_id)
+        if self.outbox is not None:
+            handle.outbox_id = self.outbox.append('entry', plate_number, confidence, entry_id)
+        self._jobs.put((handle, (plate_number, confidence)))
+        return handle
+
+    def submit_exit(self, plate_number, entry_id=None):
+        """
+        Queue a vehicle exit write and return its handle immediately
+        """
+        handle = PendingTransaction('exit', plate_number, entry_id)
+        if self.outbox is not None:
+            handle.outbox_id = self.outbox.append('exit', plate_number, entry_id=entry_id)
+        self._jobs.put((handle, (plate_number,)))
+        return handle
+
+    def _replay(self, rows):
+        """
+        Requeue claimed journal rows left unfinished by a previous run or another process
+
+        Sent rows resume receipt tracking instead of being sent again.
+        """
+        sent = collections.OrderedDict()
+        for row in rows:
+            handle = PendingTransaction(row['action'], row['plate_number'],
+                                        row['entry_id'], row['id'])
+            if row['state'] == 'sent' and row['transaction_hash']:
+                handle.status = 'submitted'
+                handle.transaction_hash = row['transaction_hash']
+                sent.setdefault(row['transaction_hash'], []).append(handle)
+            elif row['action'] == 'entry':
+                self._jobs.put((handle, (row['plate_number'], row['confidence'])))
+            else:
+                self._jobs.put((handle, (row['plate_number'],)))
+
+        now = time.monotonic()
+        with self._in_flight_lock:
+            for tx_hash, handles in sent.items():
+                self._in_flight.append((handles, tx_hash, len(handles) > 1, now))
+
+    def _keep_leases(self):
+        """
+        Renew this queue's outbox leases and adopt rows whose owner went away
+        """
+        if self.outbox is None or time.monotonic() < self._next_claim:
+            return
+        self._next_claim = time.monotonic() + self.outbox.lease_seconds / 3
+        try:
+            self.outbox.renew()
+            self._replay(self.outbox.claim())
+        except Exception as e:
+            print(f"Error renewing outbox leases: {e}")
+
+    def pending_count(self):
+        with self._in_flight_lock:
+            in_flight = sum(len(handles) for handles, _, _, _ in self._in_flight)
+        return self._jobs.qsize() + len(self._retry) + in_flight
+
+    def metrics(self):
+        """
+        Backlog of the queue, plus journal lag when an outbox is used
+        """
+        metrics = {
+            'pending': self.pending_count(),
+            'retrying': len(self._retry),
+            'retry_delay_seconds': self._retry_delay if self._retry else 0.0
+        }
+        if self.outbox is not None:
+            metrics['outbox'] = self.outbox.metrics()
+        return metrics
+
+    def stop(self, timeout=5):
+        """
+        Stop the workers; queued jobs that were not sent stay queued
+        """
+        self._stopped.set()
+        self._jobs.put(None)
+        self._submitter.join(timeout)
+        self._tracker.join(timeout)
+
+    def _complete(self, handle, status, block_number=None, error=None):
+        """
+        Settle a handle, persisting its state before waiters wake up
+        """
+        handle.status = status
+        handle.block_number = block_number
+        handle.error = error
+        self._update_db(handle)
+        if self.outbox is not None and handle.outbox_id is not None:
+            try:
+                self.outbox.mark_done([handle.outbox_id], error)
+            except Exception as e:
+                print(f"Error updating outbox: {e}")
+        handle._done.set()
+
+    def _update_db(self, handle):
+        if self.db_manager is None or handle.entry_id is None:
+            return
+        try:
+            self.db_manager.update_blockchain_status(
+                handle.entry_id,
+                handle.status,
+                handle.transaction_hash,
+                handle.block_number,
+                action=handle.action
+            )
+        except Exception as e:
+            print(f"Error updating blockchain status: {e}")
+
+    def _next_job(self, timeout=None):
+        """
+        Next job to send: writes waiting for a retry go first
+        """
+        if self._retry:
+            return self._retry.popleft()
+        if timeout is None:
+            return self._jobs.get()
+        return self._jobs.get(timeout=timeout)
+
+    def _submit_loop(self):
+        while not self._stopped.is_set():
+            job = self._next_job()
+            if job is None:
+                return
+            jobs = [job]
+
+            # Accumulate until the batch is full or the window closes
+            deadline = time.monotonic() + self.batch_window
+            while len(jobs) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    job = self._next_job(timeout=remaining)
+                except queue.Empty:
+                    break
+                if job is None:
+                    self._stopped.set()
+                    break
+                jobs.append(job)
+
+            # Consecutive runs of the same action keep entry/exit order
+            runs = [[jobs[0]]]
+            for job in jobs[1:]:
+                if job[0].action == runs[-1][0][0].action:
+                    runs[-1].append(job)
+                else:
+                    runs.append([job])
+
+            for i, run in enumerate(runs):
+                error = self._send(run)
+                if error is not None:
+                    # Node unreachable: keep this run and everything after it in order
+                    unsent = [job for later in runs[i:] for job in later]
+                    self._defer(unsent, error)
+                    break
+            else:
+                self._retry_delay = self.retry_backoff
+
+    def _defer(self, jobs, error):
+        """
+        Hold jobs for a retry after a connectivity failure, backing off
+        """
+        print(f"Chain unreachable, retrying {len(jobs)} writes in {self._retry_delay:.1f}s: {error}")
+        if self.outbox is not None:
+            self.outbox.mark_retry(
+                [handle.outbox_id for handle, _ in jobs if handle.outbox_id is not None],
+                str(error)
+            )
+        self._retry.extendleft(reversed(jobs))
+        self._stopped.wait(self._retry_delay)
+        self._retry_delay = min(self._retry_delay * 2, self.max_retry_backoff)
+
+    def _send(self, jobs):
+        """
+        Submit one run of same-action jobs, batched when the contract allows
+
+        :return: The connectivity error if the run should be retried, else None
+        """
+        handles = [handle for handle, _ in jobs]
+        action = handles[0].action
+
+        try:
+            manager = self.blockchain_manager
+            batched = len(jobs) > 1 and manager.supports_batch()
+        except Exception as e:
+            # Includes BlockchainManager failing to connect on creation
+            return e
+
+        # Anchoring mode: events go to the local store, roots on-chain later
+        if getattr(manager, 'anchor', None):
+            for handle, args in jobs:
+                try:
+                    if action == 'entry':
+                        manager.anchor.record_event(args[0], 'entry', args[1])
+                    else:
+                        manager.anchor.record_event(args[0], 'exit')
+                    self._complete(handle, 'recorded')
+                except Exception as e:
+                    print(f"Error recording vehicle {action}: {e}")
+                    self._complete(handle, 'failed', error=str(e))
+            return None
+
+        if not batched:
+            for i, (handle, args) in enumerate(jobs):
+                try:
+                    if action == 'entry':
+                        tx_hash = manager.send_vehicle_entry(*args)
+                    else:
+                        tx_hash = manager.send_vehicle_exit(*args)
+                except (ConnectionError, OSError) as e:
+                    # Retry from this job on; earlier ones were sent
+                    del jobs[:i]
+                    return e
+                except Exception as e:
+                    print(f"Error submitting vehicle {action}: {e}")
+                    self._complete(handle, 'failed', error=str(e))
+                    continue
+                self._mark_submitted([handle], tx_hash, batched=False)
+            return None
+
+        plate_numbers = [args[0] for _, args in jobs]
+        try:
+            if action == 'entry':
+                tx_hash = manager.send_vehicle_entries_batch(
+                    plate_numbers,
+                    [args[1] for _, args in jobs]
+                )
+            else:
+                tx_hash = manager.send_vehicle_exits_batch(plate_numbers)
+        except (ConnectionError, OSError) as e:
+            return e
+        except Exception as e:
+            print(f"Error submitting vehicle {action} batch: {e}")
+            for handle in handles:
+                self._complete(handle, 'failed', error=str(e))
+            return None
+
+        self._mark_submitted(handles, tx_hash, batched=True)
+        return None
+
+    def _mark_submitted(self, handles, tx_hash, batched):
+        tx_hex = tx_hash.hex() if hasattr(tx_hash, 'hex') else str(tx_hash)
+        for handle in handles:
+            handle.transaction_hash = tx_hex
+            handle.status = 'submitted'
+            self._update_db(handle)
+        if self.outbox is not None:
+            self.outbox.mark_sent(
+                [handle.outbox_id for handle in handles if handle.outbox_id is not None],
+                tx_hex
+            )
+
+        with self._in_flight_lock:
+            self._in_flight.append((handles, tx_hash, batched, time.monotonic()))
+
+    def _settle(self, handles, receipt, batched):
+        """
+        Complete handles from a receipt, per plate for batch transactions
+        """
+        if receipt.status != 1:
+            for handle in handles:
+                self._complete(handle, 'failed', block_number=receipt.blockNumber,
+                               error="Transaction reverted")
+            return
+
+        if not batched:
+            self._complete(handles[0], self.mined_status, block_number=receipt.blockNumber)
+            return
+
+        results = self.blockchain_manager.parse_batch_results(
+            receipt,
+            handles[0].action,
+            [handle.plate_number for handle in handles]
+        )
+        for handle, result in zip(handles, results):
+            if result['logged']:
+                self._complete(handle, self.mined_status, block_number=receipt.blockNumber)
+            else:
+                self._complete(handle, 'failed', block_number=receipt.blockNumber,
+                               error=result['reason'])
+
+    def _track_loop(self):
+        while not self._stopped.wait(self.poll_interval):
+            self._keep_leases()
+            with self._in_flight_lock:
+                in_flight = list(self._in_flight)
+
+            settled = []
+            for job in in_flight:
+                handles, tx_hash, batched, submitted_at = job
+                try:
+                    receipt = self.blockchain_manager.get_receipt(tx_hash)
+                except Exception as e:
+                    print(f"Error fetching receipt: {e}")
+                    continue
+
+                if receipt is not None:
+                    try:
+                        self._settle(handles, receipt, batched)
+                    except Exception as e:
+                        # Retrying cannot help, so fail whatever the receipt left open
+                        print(f"Error settling transaction {tx_hash}: {e}")
+                        for handle in handles:
+                            if not handle.done():
+                                self._complete(handle, 'failed', block_number=receipt.blockNumber,
+                                               error=f"Settlement failed: {e}")
+                elif time.monotonic() - submitted_at <= self.receipt_timeout:
+                    continue
+                else:
+                    for handle in handles:
+                        self._complete(handle, 'timeout', error="No receipt before timeout")
+
+                settled.append(job)
+
+            if settled:
+                with self._in_flight_lock:
+                    self._in_flight = [job for job in self._in_flight if job not in settled]
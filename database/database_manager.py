@@ -1,13 +1,39 @@
 import sqlite3
 import os
+import queue
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
 from datetime import datetime
 import logging
 
+# Outcome of a queued write; rows holds RETURNING results
+WriteResult = namedtuple('WriteResult', 'lastrowid rowcount rows')
+
 class DatabaseManager:
-    def __init__(self, db_path='vehicle_logs.db'):
+    def __init__(self, db_path='vehicle_logs.db', commit_interval=0.005, max_batch=500):
+        """
+        SQLite access layer for vehicle_entries
+
+        The database runs in WAL mode. Reads use one pooled connection per
+        thread; writes go through a single writer thread that commits
+        everything queued within commit_interval seconds (up to max_batch
+        statements) in one transaction, so bursts share one fsync.
+        """
         self.db_path = db_path
+        self.commit_interval = commit_interval
+        self.max_batch = max_batch
+
+        self._local = threading.local()
+        self._writes = queue.Queue()
+        self._stopped = threading.Event()
+
         self.setup_database()
-        
+
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
         # Setup logging
         logging.basicConfig(
             level=logging.INFO,
@@ -15,11 +41,26 @@ class DatabaseManager:
         )
         self.logger = logging.getLogger(__name__)
 
+    def _connect(self, **kwargs):
+        conn = sqlite3.connect(self.db_path, timeout=30, cached_statements=256, **kwargs)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def _connection(self):
+        """Read connection for the calling thread, opened on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
     def setup_database(self):
         """Create database and tables if they don't exist"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
-        
+
         # Create vehicle_entries table
         cursor.execute('''
         CREATE TABLE IF NOT EXISTS vehicle_entries (
@@ -29,9 +70,266 @@ class DatabaseManager:
             confidence REAL,
             blockchain_tx TEXT,
             block_number INTEGER,
-            status TEXT DEFAULT 'pending'
+            status TEXT DEFAULT 'pending',
+            exit_time TIMESTAMP,
+            lot TEXT,
+            exit_tx TEXT,
+            exit_block_number INTEGER,
+            exit_status TEXT
         )
         ''')
-        
+
+        # Databases created before exits, lots and exit transactions were recorded
+        columns = {row[1] for row in cursor.execute('PRAGMA table_info(vehicle_entries)')}
+        if 'exit_time' not in columns:
+            cursor.execute('ALTER TABLE vehicle_entries ADD COLUMN exit_time TIMESTAMP')
+            # Exits were never recorded, so no legacy row is known to be inside
+            cursor.execute('UPDATE vehicle_entries SET exit_time = entry_time')
+        else:
+            # One open entry per plate: older duplicates become zero-length visits
+            cursor.execute('''
+            UPDATE vehicle_entries SET exit_time = entry_time
+            WHERE exit_time IS NULL AND id NOT IN (
+                SELECT MAX(id) FROM vehicle_entries WHERE exit_time IS NULL GROUP BY plate_number
+            )
+            ''')
+        if 'lot' not in columns:
+            cursor.execute('ALTER TABLE vehicle_entries ADD COLUMN lot TEXT')
+        for column, column_type in (('exit_tx', 'TEXT'), ('exit_block_number', 'INTEGER'),
+                                    ('exit_status', 'TEXT')):
+            if column not in columns:
+                cursor.execute(f'ALTER TABLE vehicle_entries ADD COLUMN {column} {column_type}')
+        cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS uq_vehicle_entries_open ON vehicle_entries (plate_number) WHERE exit_time IS NULL')
+
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_vehicle_entries_plate ON vehicle_entries (plate_number)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_vehicle_entries_time ON vehicle_entries (entry_time)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_vehicle_entries_status ON vehicle_entries (status)')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_vehicle_entries_active ON vehicle_entries (id) WHERE exit_time IS NULL')
+
         conn.commit()
-        conn.close() 
\ No newline at end of file
+        conn.close()
+
+    def _write(self, sql, params=(), many=False):
+        """
+        Queue a write for the next group commit
+
+        :return: Future resolving to a WriteResult once committed
+        """
+        if self._stopped.is_set():
+            raise RuntimeError("DatabaseManager is closed")
+        future = Future()
+        self._writes.put((sql, params, many, future))
+        return future
+
+    def _write_loop(self):
+        conn = self._connect(isolation_level=None)
+        while True:
+            item = self._writes.get()
+            if item is None:
+                break
+            batch = [item]
+
+            # Group everything arriving within the commit interval
+            deadline = time.monotonic() + self.commit_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._writes.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    break
+                batch.append(item)
+
+            self._commit_batch(conn, batch)
+            if item is None:
+                break
+        conn.close()
+
+    def _commit_batch(self, conn, batch):
+        """Run a batch in one transaction; a failing statement only fails its own future"""
+        results = []
+        try:
+            conn.execute('BEGIN')
+            for sql, params, many, future in batch:
+                conn.execute('SAVEPOINT write')
+                try:
+                    cursor = conn.executemany(sql, params) if many else conn.execute(sql, params)
+                    rows = cursor.fetchall() if cursor.description else None
+                    conn.execute('RELEASE write')
+                    results.append((future, WriteResult(cursor.lastrowid, cursor.rowcount, rows)))
+                except Exception as e:
+                    conn.execute('ROLLBACK TO write')
+                    conn.execute('RELEASE write')
+                    future.set_exception(e)
+            conn.execute('COMMIT')
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            for future, _ in results:
+                future.set_exception(e)
+            return
+
+        for future, result in results:
+            future.set_result(result)
+
+    def close(self, timeout=5):
+        """Flush queued writes and stop the writer"""
+        self._stopped.set()
+        self._writes.put(None)
+        self._writer.join(timeout)
+
+    def log_entry(self, plate_number, confidence=None, blockchain_tx=None,
+                  block_number=None, status='pending'):
+        """Insert a vehicle entry and return its row id"""
+        return self._write('''
+        INSERT INTO vehicle_entries
+            (plate_number, confidence, blockchain_tx, block_number, status)
+        VALUES (?, ?, ?, ?, ?)
+        ''', (plate_number, confidence, blockchain_tx, block_number, status)).result().lastrowid
+
+    def open_entry(self, plate_number, confidence=None, lot=None):
+        """
+        Insert an entry unless the plate already has one without an exit
+
+        The check and the insert are one statement, backed by a unique
+        index on open entries, so every process and node sharing the
+        database agrees on who is inside.
+
+        :return: The new row id, or None if the plate is already inside
+        """
+        try:
+            result = self._write('''
+            INSERT INTO vehicle_entries (plate_number, confidence, lot)
+            SELECT ?, ?, ?
+            WHERE NOT EXISTS (
+                SELECT 1 FROM vehicle_entries WHERE plate_number = ? AND exit_time IS NULL
+            )
+            ''', (plate_number, confidence, lot, plate_number)).result()
+        except sqlite3.IntegrityError:
+            return None
+        return result.lastrowid if result.rowcount == 1 else None
+
+    def close_entry(self, plate_number):
+        """
+        Close a plate's open entry with the current time
+
+        :return: The closed entry (id, plate_number, entry_time, confidence, lot),
+            or None if the plate was not inside
+        """
+        result = self._write('''
+        UPDATE vehicle_entries SET exit_time = CURRENT_TIMESTAMP
+        WHERE plate_number = ? AND exit_time IS NULL
+        RETURNING id, plate_number, entry_time, confidence, lot
+        ''', (plate_number,)).result()
+        if not result.rows:
+            return None
+        return dict(zip(('id', 'plate_number', 'entry_time', 'confidence', 'lot'), result.rows[0]))
+
+    def log_exit(self, entry_id):
+        """
+        Close an entry with the current time
+
+        :return: False if the entry was already closed
+        """
+        return self._write('''
+        UPDATE vehicle_entries SET exit_time = CURRENT_TIMESTAMP
+        WHERE id = ? AND exit_time IS NULL
+        ''', (entry_id,)).result().rowcount == 1
+
+    def get_active_entry(self, plate_number):
+        """A plate's entry without an exit, or None"""
+        row = self._connection().execute('''
+        SELECT id, plate_number, entry_time, confidence, lot
+        FROM vehicle_entries
+        WHERE plate_number = ? AND exit_time IS NULL
+        ''', (plate_number,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def get_active_entries(self):
+        """Entries without an exit, oldest first"""
+        cursor = self._connection().execute('''
+        SELECT id, plate_number, entry_time, confidence, lot
+        FROM vehicle_entries
+        WHERE exit_time IS NULL
+        ORDER BY id
+        ''')
+        return [dict(row) for row in cursor.fetchall()]
+
+    def update_blockchain_status(self, entry_id, status, blockchain_tx=None, block_number=None,
+                                 action='entry'):
+        """Record the chain transaction state for an entry, or for its exit"""
+        self.update_blockchain_statuses([(entry_id, status, blockchain_tx, block_number)], action)
+
+    def get_recent_entries(self, limit=5):
+        """Most recent vehicle entries, newest first"""
+        cursor = self._connection().execute('''
+        SELECT id, plate_number, entry_time, confidence,
+               blockchain_tx, block_number, status
+        FROM vehicle_entries
+        ORDER BY id DESC
+        LIMIT ?
+        ''', (limit,))
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_unsettled_entries(self, statuses=('submitted', 'mined', 'timeout'), limit=500):
+        """
+        Entry and exit writes whose chain transaction is not settled yet, oldest first
+
+        Exit rows carry the exit transaction in blockchain_tx, block_number
+        and status, with action 'exit'.
+        """
+        placeholders = ', '.join('?' for _ in statuses)
+        cursor = self._connection().execute(f'''
+        SELECT * FROM (
+            SELECT id, plate_number, confidence, blockchain_tx, block_number, status,
+                   'entry' AS action,
+                   (julianday('now') - julianday(entry_time)) * 86400 AS age_seconds
+            FROM vehicle_entries
+            WHERE status IN ({placeholders}) AND blockchain_tx IS NOT NULL
+            UNION ALL
+            SELECT id, plate_number, confidence, exit_tx, exit_block_number, exit_status,
+                   'exit',
+                   (julianday('now') - julianday(exit_time)) * 86400
+            FROM vehicle_entries
+            WHERE exit_status IN ({placeholders}) AND exit_tx IS NOT NULL
+        )
+        ORDER BY id, action
+        LIMIT ?
+        ''', (*statuses, *statuses, limit))
+        return [dict(row) for row in cursor.fetchall()]
+
+    def update_blockchain_statuses(self, updates, action='entry'):
+        """Apply (entry_id, status, blockchain_tx, block_number) updates in one transaction"""
+        if action == 'exit':
+            status_column, tx_column, block_column = 'exit_status', 'exit_tx', 'exit_block_number'
+        else:
+            status_column, tx_column, block_column = 'status', 'blockchain_tx', 'block_number'
+        self._write(f'''
+        UPDATE vehicle_entries
+        SET {status_column} = ?,
+            {tx_column} = COALESCE(?, {tx_column}),
+            {block_column} = COALESCE(?, {block_column})
+        WHERE id = ?
+        ''', [(status, blockchain_tx, block_number, entry_id)
+              for entry_id, status, blockchain_tx, block_number in updates], many=True).result()
+
+    def get_status_counts(self):
+        """Number of entry and exit writes and age of the oldest per blockchain status"""
+        cursor = self._connection().execute('''
+        SELECT status, COUNT(*), MAX(age_seconds) FROM (
+            SELECT status, (julianday('now') - julianday(entry_time)) * 86400 AS age_seconds
+            FROM vehicle_entries
+            UNION ALL
+            SELECT exit_status, (julianday('now') - julianday(exit_time)) * 86400
+            FROM vehicle_entries
+            WHERE exit_status IS NOT NULL
+        )
+        GROUP BY status
+        ''')
+        return {
+            status: {'count': count, 'oldest_age_seconds': oldest}
+            for status, count, oldest in cursor.fetchall()
+        }
@@ -0,0 +1,230 @@
+import argparse
+import csv
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+# Exportable tables: vehicle_entries rows or indexed chain events, with
+# the Arrow type of each column so every Parquet chunk shares one schema
+SOURCES = {
+    'entries': {
+        'table': 'vehicle_entries',
+        'columns': ['id', 'plate_number', 'entry_time', 'confidence',
+                    'blockchain_tx', 'block_number', 'status', 'exit_time'],
+        'types': ['int64', 'string', 'string', 'double',
+                  'string', 'int64', 'string', 'string'],
+        'time_column': 'entry_time',
+    },
+    'events': {
+        'table': 'chain_events',
+        'columns': ['id', 'event', 'plate_number', 'owner', 'event_timestamp',
+                    'block_number', 'transaction_hash', 'log_index'],
+        'types': ['int64', 'string', 'string', 'string', 'int64',
+                  'int64', 'string', 'int64'],
+        'time_column': 'event_timestamp',
+    },
+}
+
+FORMATS = ('jsonl', 'csv', 'parquet')
+
+
+def _time_bound(source, value):
+    """Date filter value in the storage format of the source's time column"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if source == 'events':
+        return int(value.timestamp()) if isinstance(value, datetime) else int(value)
+    return value.strftime('%Y-%m-%d %H:%M:%S') if isinstance(value, datetime) else value
+
+
+def iter_chunks(db_path, source='entries', plate_number=None, start_date=None,
+                end_date=None, after_id=0, chunk_size=10000):
+    """
+    Yield rows in id order, one chunk at a time
+
+    Keyset pagination (id > last id) keeps each query an index range scan
+    however deep into the table the export is.
+    """
+    spec = SOURCES[source]
+    clauses = ['id > ?']
+    params = []
+    if plate_number is not None:
+        clauses.append('plate_number = ?')
+        params.append(plate_number)
+    if start_date is not None:
+        clauses.append(f"{spec['time_column']} >= ?")
+        params.append(_time_bound(source, start_date))
+    if end_date is not None:
+        clauses.append(f"{spec['time_column']} <= ?")
+        params.append(_time_bound(source, end_date))
+
+    query = f'''
+    SELECT {', '.join(spec['columns'])}
+    FROM {spec['table']}
+    WHERE {' AND '.join(clauses)}
+    ORDER BY id
+    LIMIT ?
+    '''
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        last_id = after_id
+        while True:
+            rows = conn.execute(query, (last_id, *params, chunk_size)).fetchall()
+            if not rows:
+                return
+            yield [dict(row) for row in rows]
+            last_id = rows[-1]['id']
+    finally:
+        conn.close()
+
+
+class _TextWriter:
+    """JSONL / CSV writer that can truncate back to a checkpointed offset"""
+
+    def __init__(self, path, fmt, columns, offset=None):
+        self.fmt = fmt
+        resuming = offset is not None and os.path.exists(path)
+        self.file = open(path, 'r+' if resuming else 'w', newline='')
+        if resuming:
+            # Drop anything written after the last checkpoint
+            self.file.truncate(offset)
+            self.file.seek(offset)
+        if fmt == 'csv':
+            self.csv = csv.DictWriter(self.file, fieldnames=columns)
+            if not resuming:
+                self.csv.writeheader()
+
+    def write(self, rows):
+        if self.fmt == 'csv':
+            self.csv.writerows(rows)
+        else:
+            self.file.writelines(json.dumps(row) + '\n' for row in rows)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetWriter:
+    """Parquet writer, one row group per chunk"""
+
+    def __init__(self, path, columns, types):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self.pa = pa
+        # Explicit schema: a chunk where a nullable column is all NULL
+        # would otherwise infer a null type and break write_table
+        self.schema = pa.schema([(name, pa.type_for_alias(type_name))
+                                 for name, type_name in zip(columns, types)])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, rows):
+        self.writer.write_table(self.pa.Table.from_pylist(rows, schema=self.schema))
+        return None
+
+    def close(self):
+        self.writer.close()
+
+
+def _load_checkpoint(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def _save_checkpoint(path, checkpoint):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def export_rows(db_path, output, fmt=None, source='entries', plate_number=None,
+                start_date=None, end_date=None, chunk_size=10000, resume=True):
+    """
+    Stream rows to JSONL, CSV or Parquet with constant memory
+
+    After each chunk a checkpoint (<output>.checkpoint) records the last
+    exported id; a rerun with the same arguments resumes from it. Text
+    formats are truncated back to the checkpointed offset, Parquet resumes
+    into a new part file next to the original.
+
+    :return: {'output', 'rows', 'last_id'}
+    """
+    fmt = fmt or os.path.splitext(output)[1].lstrip('.') or 'jsonl'
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    checkpoint_path = output + '.checkpoint'
+    filters = {
+        'source': source,
+        'plate_number': plate_number,
+        'start_date': str(start_date) if start_date is not None else None,
+        'end_date': str(end_date) if end_date is not None else None,
+    }
+    checkpoint = _load_checkpoint(checkpoint_path) if resume else None
+    if checkpoint is not None and checkpoint['filters'] != filters:
+        raise ValueError(f"Checkpoint {checkpoint_path} was written with different filters")
+    if checkpoint is None:
+        checkpoint = {'filters': filters, 'last_id': 0, 'rows': 0, 'offset': None, 'part': 0}
+
+    columns = SOURCES[source]['columns']
+    types = SOURCES[source]['types']
+    if fmt == 'parquet':
+        path = output
+        if checkpoint['last_id']:
+            checkpoint['part'] += 1
+            stem, ext = os.path.splitext(output)
+            path = f"{stem}.part{checkpoint['part']}{ext}"
+        writer = _ParquetWriter(path, columns, types)
+    else:
+        writer = _TextWriter(output, fmt, columns, checkpoint['offset'])
+
+    try:
+        for rows in iter_chunks(db_path, source, plate_number, start_date, end_date,
+                                after_id=checkpoint['last_id'], chunk_size=chunk_size):
+            checkpoint['offset'] = writer.write(rows)
+            checkpoint['last_id'] = rows[-1]['id']
+            checkpoint['rows'] += len(rows)
+            _save_checkpoint(checkpoint_path, checkpoint)
+    finally:
+        writer.close()
+
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+    return {'output': output, 'rows': checkpoint['rows'], 'last_id': checkpoint['last_id']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stream vehicle entries or chain events to a file")
+    parser.add_argument('output', help="Output file (.jsonl, .csv or .parquet)")
+    parser.add_argument('--db', default='vehicle_logs.db')
+    parser.add_argument('--source', choices=sorted(SOURCES), default='entries')
+    parser.add_argument('--format', choices=FORMATS, default=None)
+    parser.add_argument('--plate', default=None)
+    parser.add_argument('--start', default=None, help="ISO start date")
+    parser.add_argument('--end', default=None, help="ISO end date")
+    parser.add_argument('--chunk-size', type=int, default=10000)
+    parser.add_argument('--restart', action='store_true', help="Ignore an existing checkpoint")
+    args = parser.parse_args()
+
+    result = export_rows(
+        args.db, args.output, args.format, args.source,
+        plate_number=args.plate,
+        start_date=args.start,
+        end_date=args.end,
+        chunk_size=args.chunk_size,
+        resume=not args.restart
+    )
+    print(f"✅ Exported {result['rows']} rows to {result['output']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import threading
+import time
+from collections import Counter
+
+
+class OccupancyIndex:
+    def __init__(self, default_lot='default', capacities=None):
+        """
+        In-memory cache of vehicles currently inside, with per-lot counters
+
+        Lookups, entries and exits are O(1) dict operations under one lock.
+        The database stays the source of truth and decides every entry and
+        exit (DatabaseManager.open_entry/close_entry); this index mirrors
+        the results, and load() rebuilds it from entries without an exit.
+
+        :param capacities: Optional {lot: spaces} for available()
+        """
+        self.default_lot = default_lot
+        self.capacities = dict(capacities or {})
+
+        self._sessions = {}
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, plate_number):
+        return plate_number in self._sessions
+
+    def is_inside(self, plate_number):
+        return plate_number in self._sessions
+
+    def get(self, plate_number):
+        """Active session of a plate, or None"""
+        return self._sessions.get(plate_number)
+
+    def enter(self, plate_number, entry_id=None, confidence=None, lot=None, entered_at=None):
+        """
+        Record the open session of a plate, replacing a stale one
+
+        :return: The session
+        """
+        lot = lot or self.default_lot
+        session = {
+            'plate_number': plate_number,
+            'entry_id': entry_id,
+            'confidence': confidence,
+            'lot': lot,
+            'entered_at': entered_at if entered_at is not None else time.time()
+        }
+        with self._lock:
+            previous = self._sessions.get(plate_number)
+            if previous is not None:
+                self._counts[previous['lot']] -= 1
+            self._sessions[plate_number] = session
+            self._counts[lot] += 1
+        return session
+
+    def enter_row(self, row):
+        """Record the session of a vehicle_entries row without an exit"""
+        return self.enter(row['plate_number'], row['id'], row.get('confidence'),
+                          row.get('lot'), row.get('entry_time'))
+
+    def exit(self, plate_number):
+        """
+        Close the session of a plate
+
+        :return: The closed session, or None if the plate was not inside
+        """
+        with self._lock:
+            session = self._sessions.pop(plate_number, None)
+            if session is not None:
+                self._counts[session['lot']] -= 1
+            return session
+
+    def count(self, lot=None):
+        """Vehicles inside one lot, or in all lots"""
+        if lot is None:
+            return len(self._sessions)
+        return self._counts[lot]
+
+    def counts(self):
+        with self._lock:
+            return {lot: count for lot, count in self._counts.items() if count}
+
+    def available(self, lot=None):
+        """Free spaces in a lot with a configured capacity, else None"""
+        lot = lot or self.default_lot
+        if lot not in self.capacities:
+            return None
+        return self.capacities[lot] - self._counts[lot]
+
+    def load(self, active_entries):
+        """
+        Rebuild from database rows without an exit (DatabaseManager.get_active_entries)
+
+        A plate with several open rows keeps the most recent one.
+        """
+        sessions = {}
+        for row in active_entries:
+            sessions[row['plate_number']] = {
+                'plate_number': row['plate_number'],
+                'entry_id': row['id'],
+                'confidence': row.get('confidence'),
+                'lot': row.get('lot') or self.default_lot,
+                'entered_at': row.get('entry_time')
+            }
+        with self._lock:
+            self._sessions = sessions
+            self._counts = Counter(session['lot'] for session in sessions.values())
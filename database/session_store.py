@@ -0,0 +1,104 @@
+import threading
+from datetime import datetime
+
+import numpy as np
+
+
+class SessionStore:
+    def __init__(self, capacity=1000):
+        """
+        Fixed-size ring buffer of recent parking sessions for the dashboard
+
+        Sessions live in preallocated numpy columns, so memory stays flat
+        however long the process runs. When the buffer is full the oldest
+        session is overwritten; it is already stored in vehicle_entries
+        (log_entry/log_exit), which remains the full history.
+
+        :param capacity: Sessions kept in memory
+        """
+        self.capacity = capacity
+
+        self._plates = np.empty(capacity, dtype=object)
+        self._entry_ids = np.full(capacity, -1, dtype=np.int64)
+        self._entered = np.full(capacity, np.datetime64('NaT'), dtype='datetime64[s]')
+        self._exited = np.full(capacity, np.datetime64('NaT'), dtype='datetime64[s]')
+
+        self._added = 0
+        self._open = {}
+        self._lock = threading.Lock()
+
+        # Dashboard frame, rebuilt only after a change
+        self._version = 0
+        self._frame = None
+        self._frame_version = -1
+
+    def __len__(self):
+        return min(self._added, self.capacity)
+
+    def open(self, plate_number, entry_id=None, entered_at=None):
+        """
+        Record an entry
+
+        :return: Ring slot of the session
+        """
+        entered_at = entered_at or datetime.now()
+        with self._lock:
+            slot = self._added % self.capacity
+            if self._added >= self.capacity:
+                evicted = self._plates[slot]
+                if self._open.get(evicted) == slot:
+                    del self._open[evicted]
+
+            self._plates[slot] = plate_number
+            self._entry_ids[slot] = entry_id if entry_id is not None else -1
+            self._entered[slot] = np.datetime64(entered_at, 's')
+            self._exited[slot] = np.datetime64('NaT')
+
+            self._open[plate_number] = slot
+            self._added += 1
+            self._version += 1
+            return slot
+
+    def close(self, plate_number, exited_at=None):
+        """
+        Record the exit of a plate's open session
+
+        :return: False if the plate has no open session in the buffer
+        """
+        exited_at = exited_at or datetime.now()
+        with self._lock:
+            slot = self._open.pop(plate_number, None)
+            if slot is None:
+                return False
+            self._exited[slot] = np.datetime64(exited_at, 's')
+            self._version += 1
+            return True
+
+    def _order(self):
+        """Slots oldest first"""
+        if self._added <= self.capacity:
+            return np.arange(self._added)
+        return np.arange(self._added, self._added + self.capacity) % self.capacity
+
+    def dataframe(self):
+        """
+        Sessions as a DataFrame (plate, entry_id, timestamp, exit_timestamp, status)
+
+        The frame is cached and only rebuilt, column-wise, after a change.
+        """
+        import pandas as pd
+
+        with self._lock:
+            if self._frame_version != self._version:
+                order = self._order()
+                exited = self._exited[order]
+                entry_ids = self._entry_ids[order]
+                self._frame = pd.DataFrame({
+                    'plate': self._plates[order],
+                    'entry_id': pd.Series(entry_ids, dtype='Int64').mask(entry_ids < 0),
+                    'timestamp': self._entered[order],
+                    'exit_timestamp': exited,
+                    'status': np.where(np.isnat(exited), 'INSIDE', 'OUTSIDE')
+                })
+                self._frame_version = self._version
+            return self._frame
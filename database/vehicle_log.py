@@ -1,13 +1,32 @@
-from .database_manager import DatabaseManager
+from .occupancy import OccupancyIndex
+from .storage import create_database_manager
 import logging
+import time
 
 class VehicleLogger:
     def __init__(self, config=None):
         """
         Initialize the vehicle logger
         config: Optional configuration dictionary
+            (db_path for the local SQLite file,
+             database_url, pool_size, max_overflow for a shared SQLAlchemy store,
+             capacities as {lot: spaces} for the occupancy index,
+             occupancy_refresh_seconds for how stale the occupancy cache may get)
         """
-        self.db_manager = DatabaseManager()
+        config = config or {}
+        self.db_manager = create_database_manager(
+            config.get('database_url'),
+            config.get('db_path', 'vehicle_logs.db'),
+            **{key: config[key] for key in ('pool_size', 'max_overflow') if key in config}
+        )
+        
+        # Cache of vehicles currently inside; the database decides entries and
+        # exits, and other processes' changes show up within the refresh interval
+        self.occupancy = OccupancyIndex(capacities=config.get('capacities'))
+        self.occupancy_refresh_seconds = config.get('occupancy_refresh_seconds', 5.0)
+        self.occupancy.load(self.db_manager.get_active_entries())
+        self._occupancy_loaded_at = time.monotonic()
+        
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
         
@@ -21,22 +40,103 @@ class VehicleLogger:
             ch.setFormatter(formatter)
             self.logger.addHandler(ch)
     
-    def log_vehicle_entry(self, plate_number, confidence=None):
+    def _sync_occupancy(self):
+        """
+        Reload the occupancy cache once it is older than the refresh interval
+        """
+        if time.monotonic() - self._occupancy_loaded_at < self.occupancy_refresh_seconds:
+            return
+        self._occupancy_loaded_at = time.monotonic()
+        try:
+            self.occupancy.load(self.db_manager.get_active_entries())
+        except Exception as e:
+            self.logger.error(f"Error refreshing occupancy: {str(e)}")
+    
+    def _refresh_plate(self, plate_number):
+        """
+        Replace a plate's cached state with the database's after a conflicting write
+        """
+        try:
+            row = self.db_manager.get_active_entry(plate_number)
+        except Exception as e:
+            self.logger.error(f"Error refreshing occupancy: {str(e)}")
+            return
+        if row is None:
+            self.occupancy.exit(plate_number)
+        else:
+            self.occupancy.enter_row(row)
+    
+    def is_inside(self, plate_number):
+        """
+        Whether a vehicle has an entry without an exit, from the occupancy cache
+        """
+        self._sync_occupancy()
+        return self.occupancy.is_inside(plate_number)
+    
+    def get_occupancy(self):
+        """
+        Vehicles inside in total and per lot, with free spaces of the default lot
+        """
+        self._sync_occupancy()
+        return {
+            'inside': self.occupancy.count(),
+            'lots': self.occupancy.counts(),
+            'available': self.occupancy.available()
+        }
+    
+    def log_vehicle_entry(self, plate_number, confidence=None, lot=None):
         """
         Log a vehicle entry to both database and log file
+        Returns the entry id, or False on failure or if the vehicle is already inside
+        
+        The database only inserts the entry if the plate has no open one, so
+        a stale cache here (another process or node logged the entry) ends in
+        False and a refreshed cache rather than a second entry.
         """
+        lot = lot or self.occupancy.default_lot
         try:
-            # Log to database
-            self.db_manager.log_entry(plate_number, confidence)
-            
-            # Log to console/file
-            self.logger.info(f"Vehicle Entry - Plate: {plate_number} Confidence: {confidence:.2f}")
-            
-            return True
-            
+            entry_id = self.db_manager.open_entry(plate_number, confidence, lot)
         except Exception as e:
             self.logger.error(f"Error logging vehicle entry: {str(e)}")
             return False
+        
+        if entry_id is None:
+            self._refresh_plate(plate_number)
+            return False
+        
+        self.occupancy.enter(plate_number, entry_id, confidence, lot)
+        
+        # Log to console/file
+        self.logger.info(f"Vehicle Entry - Plate: {plate_number} Confidence: {confidence}")
+        
+        # Row id (truthy) so callers can attach the chain transaction later
+        return entry_id
+    
+    def log_vehicle_exit(self, plate_number):
+        """
+        Close a vehicle's open entry
+        Returns the closed session, or None on failure or if the vehicle was not inside
+        
+        The cache is only updated after the database closed the entry.
+        """
+        try:
+            row = self.db_manager.close_entry(plate_number)
+        except Exception as e:
+            self.logger.error(f"Error logging vehicle exit: {str(e)}")
+            return None
+        
+        self.occupancy.exit(plate_number)
+        if row is None:
+            return None
+        
+        self.logger.info(f"Vehicle Exit - Plate: {plate_number}")
+        return {
+            'plate_number': plate_number,
+            'entry_id': row['id'],
+            'confidence': row.get('confidence'),
+            'lot': row.get('lot') or self.occupancy.default_lot,
+            'entered_at': row.get('entry_time')
+        }
     
     def get_recent_entries(self, limit=5):
         """
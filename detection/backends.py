@@ -0,0 +1,199 @@
+import glob
+import hashlib
+import importlib.util
+import os
+import shutil
+import cv2
+import numpy as np
+import yaml
+
+# Supported inference backends for the plate detector
+BACKENDS = ('torch', 'onnx', 'openvino', 'auto')
+
+# Detector precisions; int8 needs an exported backend
+PRECISIONS = ('fp32', 'int8')
+
+
+def weights_hash(weights_path, chunk_size=1 << 20):
+    """
+    SHA-256 of a weights file, used to key cached exports
+    """
+    digest = hashlib.sha256()
+    with open(weights_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def backend_available(backend):
+    """
+    Check whether the runtime for a backend is installed
+    """
+    if backend == 'torch':
+        return True
+    if backend == 'onnx':
+        return importlib.util.find_spec('onnxruntime') is not None
+    if backend == 'openvino':
+        return importlib.util.find_spec('openvino') is not None
+    return False
+
+
+def resolve_backend(backend):
+    """
+    Resolve 'auto' to the fastest available CPU backend
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend: {backend}")
+
+    if backend == 'auto':
+        for candidate in ('openvino', 'onnx'):
+            if backend_available(candidate):
+                return candidate
+        return 'torch'
+
+    if not backend_available(backend):
+        raise ImportError(f"Runtime for '{backend}' backend is not installed")
+
+    return backend
+
+
+def _cache_dir(weights_path):
+    """
+    Export cache directory next to the weights, keyed by weights hash
+    """
+    weights_dir = os.path.dirname(os.path.abspath(weights_path))
+    stem = os.path.splitext(os.path.basename(weights_path))[0]
+    return os.path.join(
+        weights_dir,
+        f".{stem}_exports",
+        weights_hash(weights_path)[:16]
+    )
+
+
+def _calibration_yaml(image_dir, cache_dir):
+    """
+    Dataset yaml pointing ultralytics INT8 calibration at image_dir
+    """
+    image_dir = os.path.abspath(image_dir)
+    yaml_path = os.path.join(cache_dir, 'calibration.yaml')
+    with open(yaml_path, 'w') as f:
+        yaml.dump({
+            'path': os.path.dirname(image_dir),
+            'train': image_dir,
+            'val': image_dir,
+            'names': {0: 'license_plate'}
+        }, f)
+    return yaml_path
+
+
+class _ImageCalibrationReader:
+    """
+    Feeds letterboxed calibration images to onnxruntime static quantization
+    """
+    def __init__(self, image_dir, input_name, imgsz=640, limit=300):
+        paths = []
+        for pattern in ('*.jpg', '*.jpeg', '*.png', '*.JPG'):
+            paths.extend(glob.glob(os.path.join(image_dir, pattern)))
+        self.paths = iter(sorted(set(paths))[:limit])
+        self.input_name = input_name
+        self.imgsz = imgsz
+
+    def _preprocess(self, image):
+        h, w = image.shape[:2]
+        scale = self.imgsz / float(max(h, w))
+        resized = cv2.resize(image, (int(w * scale), int(h * scale)))
+        canvas = np.full((self.imgsz, self.imgsz, 3), 114, dtype=np.uint8)
+        canvas[:resized.shape[0], :resized.shape[1]] = resized
+        blob = canvas[:, :, ::-1].transpose(2, 0, 1).astype(np.float32) / 255.0
+        return blob[np.newaxis]
+
+    def get_next(self):
+        for path in self.paths:
+            image = cv2.imread(path)
+            if image is not None:
+                return {self.input_name: self._preprocess(image)}
+        return None
+
+
+def _quantize_onnx(fp32_path, int8_path, calibration_data):
+    """
+    Static INT8 quantization of an ONNX export with onnxruntime
+    """
+    import onnxruntime
+    from onnxruntime.quantization import QuantType, quantize_static
+
+    input_name = onnxruntime.InferenceSession(
+        fp32_path, providers=['CPUExecutionProvider']
+    ).get_inputs()[0].name
+
+    quantize_static(
+        fp32_path,
+        int8_path,
+        _ImageCalibrationReader(calibration_data, input_name),
+        weight_type=QuantType.QInt8,
+        activation_type=QuantType.QUInt8
+    )
+
+
+def export_path(weights_path, backend, precision='fp32', calibration_data=None):
+    """
+    Export weights for a backend once, cached next to the weights by hash
+
+    INT8 variants are only built when calibration_data (an image
+    directory) is given; at runtime a missing INT8 export is an error.
+
+    :return: Path to the exported model file or directory
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision: {precision}")
+
+    cache_dir = _cache_dir(weights_path)
+    stem = os.path.splitext(os.path.basename(weights_path))[0]
+    tag = '_int8' if precision == 'int8' else ''
+    suffix = '.onnx' if backend == 'onnx' else '_openvino_model'
+    cached = os.path.join(cache_dir, f"{stem}{tag}{suffix}")
+    if os.path.exists(cached):
+        return cached
+
+    if precision == 'int8' and calibration_data is None:
+        raise FileNotFoundError(
+            f"No INT8 {backend} export for {weights_path}. Run quantize.py first."
+        )
+
+    os.makedirs(cache_dir, exist_ok=True)
+
+    if precision == 'int8' and backend == 'onnx':
+        fp32_path = export_path(weights_path, 'onnx')
+        _quantize_onnx(fp32_path, cached, calibration_data)
+        return cached
+
+    export_args = {}
+    if precision == 'int8':
+        export_args.update(int8=True, data=_calibration_yaml(calibration_data, cache_dir))
+
+    # Dynamic shapes keep detect_plates_batch working on exported models
+    from ultralytics import YOLO
+    exported = YOLO(weights_path).export(format=backend, dynamic=True, **export_args)
+
+    shutil.move(str(exported), cached)
+    return cached
+
+
+def load_yolo_model(weights_path, backend='torch', precision='fp32', calibration_data=None):
+    """
+    Load a YOLO model on the requested inference backend
+
+    The returned object has the same call and Results interface as
+    YOLO(weights_path), so detect_plates works unchanged.
+    """
+    # Imported here so importing this module stays cheap
+    from ultralytics import YOLO
+
+    backend = resolve_backend(backend)
+    if backend == 'torch':
+        if precision != 'fp32':
+            raise ValueError("INT8 detector requires the 'onnx' or 'openvino' backend")
+        return YOLO(weights_path)
+
+    path = export_path(weights_path, backend, precision, calibration_data)
+    return YOLO(path, task='detect')
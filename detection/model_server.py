@@ -0,0 +1,256 @@
+import argparse
+import logging
+import os
+import secrets
+import stat
+import sys
+import tempfile
+import threading
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Unix socket the shared model server listens on, in a directory only its user can open
+DEFAULT_ADDRESS = os.path.join(tempfile.gettempdir(), f'plate_model_server-{os.getuid()}', 'server.sock')
+
+# Shared secret next to the socket; connections without it are refused before unpickling
+AUTHKEY_FILE = 'authkey'
+
+logger = logging.getLogger(__name__)
+
+
+def _private_dir(path):
+    """
+    Create a directory with mode 0700, refusing one another user could reach
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid() or info.st_mode & 0o077:
+        raise PermissionError(f"Model server directory {path} must be private to this user")
+    return path
+
+
+def get_authkey(address=DEFAULT_ADDRESS, create=False):
+    """
+    Authentication key of the model server at address
+
+    :param create: Generate a new key (server start-up)
+    """
+    path = os.path.join(os.path.dirname(address), AUTHKEY_FILE)
+    if create:
+        _private_dir(os.path.dirname(address))
+        tmp_path = path + '.tmp'
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(secrets.token_bytes(32))
+        os.replace(tmp_path, path)
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+class ModelServer:
+    def __init__(self, address=DEFAULT_ADDRESS, yolo_model_path='best.pt',
+                 backend='torch', precision='fp32', easyocr=True):
+        """
+        Single process owning YOLO, PaddleOCR and EasyOCR for every client
+
+        Frames from all connections go through the detector's batching
+        queue, so concurrent UI, API and script requests share YOLO passes.
+        """
+        from detection.yolo_detector import NumberPlateDetector
+
+        self.address = address
+        self.detector = NumberPlateDetector(
+            yolo_model_path,
+            backend=backend,
+            precision=precision
+        )
+
+        self.reader = None
+        if easyocr:
+            import easyocr as easyocr_module
+            self.reader = easyocr_module.Reader(['en'])
+
+    def _handle(self, request):
+        """
+        Dispatch one request to the loaded models
+        """
+        op = request['op']
+
+        if op == 'detect':
+            futures = [self.detector.submit_frame(f) for f in request['frames']]
+            return [future.result() for future in futures]
+
+        if op == 'detect_roi':
+            return self.detector.detect_plates_roi(request['frame'], request['roi'])
+
+        if op == 'ocr':
+            return self.detector.process_plates_batch(request['crops'])
+
+        if op == 'detect_ocr':
+            futures = [self.detector.submit_frame(f) for f in request['frames']]
+            plates_per_frame = [future.result() for future in futures]
+            crops = [
+                frame[y1:y2, x1:x2]
+                for frame, plates in zip(request['frames'], plates_per_frame)
+                for x1, y1, x2, y2 in plates
+            ]
+            infos = iter(self.detector.process_plates_batch(crops))
+            return [[(box, next(infos)) for box in plates] for plates in plates_per_frame]
+
+        if op == 'readtext':
+            if self.reader is None:
+                raise RuntimeError("EasyOCR is not loaded on this server")
+            return self.reader.readtext(request['image'])
+
+        if op == 'ping':
+            return 'pong'
+
+        raise ValueError(f"Unknown model server op: {op}")
+
+    def _serve_connection(self, conn):
+        """
+        Answer requests on one client connection until it closes
+        """
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except EOFError:
+                    return
+                try:
+                    conn.send({'ok': True, 'result': self._handle(request)})
+                except Exception as e:
+                    logger.error(f"Model server request failed: {e}")
+                    conn.send({'ok': False, 'error': str(e)})
+
+    def serve_forever(self):
+        """
+        Accept authenticated clients on the Unix socket, one thread per connection
+        """
+        authkey = get_authkey(self.address, create=True)
+        if os.path.exists(self.address):
+            os.remove(self.address)
+
+        with Listener(self.address, family='AF_UNIX', authkey=authkey) as listener:
+            os.chmod(self.address, 0o600)
+            logger.info(f"Model server listening on {self.address}")
+            while True:
+                try:
+                    conn = listener.accept()
+                except (AuthenticationError, EOFError, OSError) as e:
+                    logger.warning(f"Model server rejected a connection: {e}")
+                    continue
+                threading.Thread(
+                    target=self._serve_connection,
+                    args=(conn,),
+                    daemon=True
+                ).start()
+
+
+class ModelClient:
+    def __init__(self, address=DEFAULT_ADDRESS):
+        """
+        Drop-in replacement for NumberPlateDetector backed by the model server
+        """
+        self.address = address
+        self._conn = Client(address, family='AF_UNIX', authkey=get_authkey(address))
+        self._lock = threading.Lock()
+
+    def _call(self, op, **payload):
+        payload['op'] = op
+        with self._lock:
+            self._conn.send(payload)
+            response = self._conn.recv()
+        if not response['ok']:
+            raise RuntimeError(response['error'])
+        return response['result']
+
+    def ping(self):
+        return self._call('ping') == 'pong'
+
+    def detect_plates(self, frame):
+        return self._call('detect', frames=[frame])[0]
+
+    def detect_plates_batch(self, frames):
+        return self._call('detect', frames=list(frames))
+
+    def detect_plates_roi(self, frame, roi):
+        return self._call('detect_roi', frame=frame, roi=roi)
+
+    def process_plate(self, plate_img):
+        return self._call('ocr', crops=[plate_img])[0]
+
+    def process_plates_batch(self, plate_imgs):
+        return self._call('ocr', crops=list(plate_imgs))
+
+    def detect_and_read(self, frames):
+        """
+        Detection and OCR in one round trip, [(box, plate_info), ...] per frame
+        """
+        return self._call('detect_ocr', frames=list(frames))
+
+    def reader(self):
+        """
+        EasyOCR-compatible reader served by the model server
+        """
+        return RemoteReader(self)
+
+    def close(self):
+        self._conn.close()
+
+
+class RemoteReader:
+    def __init__(self, client):
+        """
+        Proxy for easyocr.Reader.readtext on the model server
+        """
+        self.client = client
+
+    def readtext(self, image):
+        return self.client._call('readtext', image=image)
+
+
+def connect_or_load(address=DEFAULT_ADDRESS, yolo_model_path='best.pt', **kwargs):
+    """
+    Use the shared model server if it is running, otherwise load locally
+    """
+    if os.path.exists(address):
+        try:
+            client = ModelClient(address)
+            if client.ping():
+                return client
+        except Exception as e:
+            logger.warning(f"Model server unavailable, loading models locally: {e}")
+
+    from detection.yolo_detector import NumberPlateDetector
+    return NumberPlateDetector(yolo_model_path, **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared plate detection/OCR model server")
+    parser.add_argument('--address', default=DEFAULT_ADDRESS)
+    parser.add_argument('--weights', default='best.pt')
+    parser.add_argument('--backend', default='torch')
+    parser.add_argument('--precision', default='fp32')
+    parser.add_argument('--no-easyocr', action='store_true')
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    server = ModelServer(
+        args.address,
+        args.weights,
+        backend=args.backend,
+        precision=args.precision,
+        easyocr=not args.no_easyocr
+    )
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
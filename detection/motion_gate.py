@@ -0,0 +1,146 @@
+import cv2
+import numpy as np
+
+
+class MotionGate:
+    def __init__(self, roi=None, method='diff', downscale_width=160,
+                 pixel_threshold=25, min_changed_ratio=0.01, cooldown_frames=5,
+                 lane=None):
+        """
+        Cheap motion gate so YOLO and OCR only run when the lane changes
+
+        :param roi: Optional (x, y, w, h) region of the full frame to watch
+        :param lane: Optional CameraROI; only motion inside its polygons counts
+        :param method: 'diff' for frame differencing, 'mog2' for background subtraction
+        :param downscale_width: Width the grayscale frame is resized to
+        :param pixel_threshold: Per-pixel intensity change counted as motion
+        :param min_changed_ratio: Fraction of changed pixels that triggers the gate
+        :param cooldown_frames: Frames kept open after motion stops
+        """
+        if method not in ('diff', 'mog2'):
+            raise ValueError(f"Unknown motion gate method: {method}")
+
+        self.roi = roi
+        self.lane = lane
+        self.method = method
+        self.downscale_width = downscale_width
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_ratio = min_changed_ratio
+        self.cooldown_frames = cooldown_frames
+
+        self._previous = None
+        self._cooldown = 0
+        self._mask = None
+        self._mask_key = None
+        self._subtractor = None
+        if method == 'mog2':
+            self._subtractor = cv2.createBackgroundSubtractorMOG2(detectShadows=False)
+
+        # Counters
+        self.skipped_frames = 0
+        self.processed_frames = 0
+
+    def _prepare(self, frame):
+        """
+        Crop to ROI, convert to grayscale and downscale
+        """
+        if self.lane is not None and self.lane.polygons:
+            self._mask = self._lane_mask(frame.shape)
+            x1, y1, x2, y2 = self.lane.bounds(frame.shape)
+            frame = frame[y1:y2, x1:x2]
+        elif self.roi is not None:
+            x, y, w, h = self.roi
+            frame = frame[y:y + h, x:x + w]
+
+        if len(frame.shape) == 3:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        else:
+            gray = frame
+
+        h, w = gray.shape[:2]
+        if w > self.downscale_width:
+            new_h = max(1, int(h * self.downscale_width / float(w)))
+            gray = cv2.resize(gray, (self.downscale_width, new_h),
+                              interpolation=cv2.INTER_AREA)
+
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def _lane_mask(self, frame_shape):
+        """
+        Lane polygons as a boolean mask of the prepared frame, cached per frame size
+        """
+        key = frame_shape[:2]
+        if self._mask_key != key:
+            mask = np.zeros(key, dtype=np.uint8)
+            cv2.fillPoly(mask, self.lane.polygons, 255)
+            x1, y1, x2, y2 = self.lane.bounds(frame_shape)
+            mask = mask[y1:y2, x1:x2]
+
+            h, w = mask.shape
+            if w > self.downscale_width:
+                new_h = max(1, int(h * self.downscale_width / float(w)))
+                mask = cv2.resize(mask, (self.downscale_width, new_h),
+                                  interpolation=cv2.INTER_NEAREST)
+            self._mask = mask > 0
+            self._mask_key = key
+        return self._mask
+
+    def _changed_ratio(self, gray):
+        """
+        Fraction of pixels that changed since the previous frame
+        """
+        if self.method == 'mog2':
+            changed = self._subtractor.apply(gray) > 0
+        else:
+            if self._previous is None or self._previous.shape != gray.shape:
+                self._previous = gray
+                return 1.0
+
+            diff = cv2.absdiff(self._previous, gray)
+            self._previous = gray
+            changed = diff > self.pixel_threshold
+
+        # Motion outside the lane polygons does not count
+        if self._mask is not None and self._mask.shape == changed.shape:
+            lane_pixels = np.count_nonzero(self._mask)
+            if not lane_pixels:
+                return 0.0
+            return np.count_nonzero(changed & self._mask) / float(lane_pixels)
+        return np.count_nonzero(changed) / float(changed.size)
+
+    def should_process(self, frame):
+        """
+        Return True if the frame should go through full detection
+        """
+        if self._changed_ratio(self._prepare(frame)) >= self.min_changed_ratio:
+            self._cooldown = self.cooldown_frames
+        elif self._cooldown > 0:
+            self._cooldown -= 1
+        else:
+            self.skipped_frames += 1
+            return False
+
+        self.processed_frames += 1
+        return True
+
+    def get_stats(self):
+        """
+        Skipped and processed frame counters
+        """
+        total = self.skipped_frames + self.processed_frames
+        return {
+            'skipped_frames': self.skipped_frames,
+            'processed_frames': self.processed_frames,
+            'skip_ratio': self.skipped_frames / total if total else 0.0
+        }
+
+    def reset(self):
+        """
+        Clear reference frame and counters
+        """
+        self._previous = None
+        self._cooldown = 0
+        self.skipped_frames = 0
+        self.processed_frames = 0
+        if self.method == 'mog2':
+            self._subtractor = cv2.createBackgroundSubtractorMOG2(detectShadows=False)
@@ -0,0 +1,169 @@
+from collections import defaultdict
+
+
+def box_iou(box_a, box_b):
+    """
+    Intersection over union of two (x1, y1, x2, y2) boxes
+    """
+    ix1 = max(box_a[0], box_b[0])
+    iy1 = max(box_a[1], box_b[1])
+    ix2 = min(box_a[2], box_b[2])
+    iy2 = min(box_a[3], box_b[3])
+
+    inter = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+    if inter == 0:
+        return 0.0
+
+    area_a = (box_a[2] - box_a[0]) * (box_a[3] - box_a[1])
+    area_b = (box_b[2] - box_b[0]) * (box_b[3] - box_b[1])
+    return inter / float(area_a + area_b - inter)
+
+
+class PlateTrack:
+    def __init__(self, track_id, box):
+        """
+        State for one tracked plate
+        """
+        self.track_id = track_id
+        self.box = box
+        self.first_box = box
+        self.hits = 1
+        self.missed = 0
+        self.readings = []
+        self.ocr_attempts = 0
+
+    def add_reading(self, plate_info):
+        """
+        Record one OCR reading for this track
+        """
+        self.ocr_attempts += 1
+        if plate_info and plate_info.get('text'):
+            self.readings.append((plate_info['text'], float(plate_info.get('confidence', 0.0))))
+
+    def fused_plate(self):
+        """
+        Fuse all readings into one plate string
+
+        Readings of the most supported length are voted per character,
+        weighted by OCR confidence.
+        """
+        if not self.readings:
+            return None
+
+        length_scores = defaultdict(float)
+        for text, confidence in self.readings:
+            length_scores[len(text)] += confidence
+        length = max(length_scores, key=length_scores.get)
+
+        candidates = [(t, c) for t, c in self.readings if len(t) == length]
+        chars = []
+        for pos in range(length):
+            votes = defaultdict(float)
+            for text, confidence in candidates:
+                votes[text[pos]] += confidence
+            chars.append(max(votes, key=votes.get))
+
+        text = ''.join(chars)
+        agreeing = [c for t, c in candidates if t == text]
+        confidence = max(agreeing) if agreeing else max(c for _, c in candidates)
+
+        return {
+            'text': text,
+            'confidence': confidence,
+            'votes': len(agreeing)
+        }
+
+
+class PlateTracker:
+    def __init__(self, iou_threshold=0.3, max_missed=15, max_ocr_attempts=5,
+                 confident_threshold=0.9, min_agreeing_reads=2):
+        """
+        IoU tracker so OCR runs a few times per vehicle instead of every frame
+
+        :param iou_threshold: Minimum IoU to match a detection to a track
+        :param max_missed: Frames a track survives without a matching detection
+        :param max_ocr_attempts: OCR calls allowed per track
+        :param confident_threshold: Single-read confidence that settles a track
+        :param min_agreeing_reads: Identical fused reads that settle a track
+        """
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.max_ocr_attempts = max_ocr_attempts
+        self.confident_threshold = confident_threshold
+        self.min_agreeing_reads = min_agreeing_reads
+
+        self.tracks = {}
+        self._next_id = 1
+
+    def update(self, boxes):
+        """
+        Match this frame's boxes to existing tracks
+
+        :param boxes: List of (x1, y1, x2, y2) from detect_plates
+        :return: Tracks seen in this frame
+        """
+        # Greedy matching on IoU, best pairs first
+        pairs = []
+        for track_id, track in self.tracks.items():
+            for idx, box in enumerate(boxes):
+                iou = box_iou(track.box, box)
+                if iou >= self.iou_threshold:
+                    pairs.append((iou, track_id, idx))
+        pairs.sort(reverse=True)
+
+        matched_tracks = set()
+        matched_boxes = set()
+        active = []
+        for _, track_id, idx in pairs:
+            if track_id in matched_tracks or idx in matched_boxes:
+                continue
+            track = self.tracks[track_id]
+            track.box = boxes[idx]
+            track.hits += 1
+            track.missed = 0
+            matched_tracks.add(track_id)
+            matched_boxes.add(idx)
+            active.append(track)
+
+        # Age out unmatched tracks
+        for track_id in list(self.tracks):
+            if track_id not in matched_tracks:
+                self.tracks[track_id].missed += 1
+                if self.tracks[track_id].missed > self.max_missed:
+                    del self.tracks[track_id]
+
+        # New tracks for unmatched detections
+        for idx, box in enumerate(boxes):
+            if idx not in matched_boxes:
+                track = PlateTrack(self._next_id, box)
+                self.tracks[track.track_id] = track
+                self._next_id += 1
+                active.append(track)
+
+        return active
+
+    def is_confident(self, track):
+        """
+        Whether a track's reading is settled
+        """
+        fused = track.fused_plate()
+        if fused is None:
+            return False
+        return (fused['confidence'] >= self.confident_threshold
+                or fused['votes'] >= self.min_agreeing_reads)
+
+    def needs_ocr(self, track):
+        """
+        Whether OCR should run on this track in the current frame
+        """
+        if track.ocr_attempts >= self.max_ocr_attempts:
+            return False
+        return not self.is_confident(track)
+
+    def is_settled(self, track):
+        """
+        Whether the track has a final plate, confident or out of attempts
+        """
+        if track.fused_plate() is None:
+            return False
+        return self.is_confident(track) or track.ocr_attempts >= self.max_ocr_attempts
@@ -0,0 +1,100 @@
+import cv2
+import numpy as np
+
+
+def nms(boxes, scores, iou_threshold=0.5):
+    """
+    Non-maximum suppression on (x1, y1, x2, y2) boxes
+
+    :return: Indices of kept boxes, highest score first
+    """
+    if not boxes:
+        return []
+
+    boxes = np.asarray(boxes, dtype=np.float32)
+    scores = np.asarray(scores, dtype=np.float32)
+    areas = (boxes[:, 2] - boxes[:, 0]) * (boxes[:, 3] - boxes[:, 1])
+    order = scores.argsort()[::-1]
+
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(int(i))
+        xx1 = np.maximum(boxes[i, 0], boxes[order[1:], 0])
+        yy1 = np.maximum(boxes[i, 1], boxes[order[1:], 1])
+        xx2 = np.minimum(boxes[i, 2], boxes[order[1:], 2])
+        yy2 = np.minimum(boxes[i, 3], boxes[order[1:], 3])
+        inter = np.maximum(0, xx2 - xx1) * np.maximum(0, yy2 - yy1)
+        iou = inter / (areas[i] + areas[order[1:]] - inter)
+        order = order[1:][iou < iou_threshold]
+
+    return keep
+
+
+class CameraROI:
+    def __init__(self, polygons=None, tiled=False, tile_size=640,
+                 tile_overlap=0.2, nms_iou=0.5):
+        """
+        Per-camera lane region and tiling settings
+
+        :param polygons: List of [(x, y), ...] lane polygons in full-frame pixels;
+                         None watches the whole frame
+        :param tiled: Run YOLO on overlapping tiles at native resolution
+        :param tile_size: Tile edge in pixels (YOLO input size)
+        :param tile_overlap: Fraction of tile_size shared by neighbouring tiles
+        :param nms_iou: IoU used to merge duplicate boxes across tiles
+        """
+        self.polygons = [np.asarray(p, dtype=np.int32) for p in (polygons or [])]
+        self.tiled = tiled
+        self.tile_size = tile_size
+        self.tile_overlap = tile_overlap
+        self.nms_iou = nms_iou
+
+    def bounds(self, frame_shape):
+        """
+        Bounding rectangle of all polygons, clipped to the frame
+        """
+        h, w = frame_shape[:2]
+        if not self.polygons:
+            return 0, 0, w, h
+
+        points = np.concatenate(self.polygons)
+        x1, y1 = points.min(axis=0)
+        x2, y2 = points.max(axis=0)
+        return max(0, int(x1)), max(0, int(y1)), min(w, int(x2)), min(h, int(y2))
+
+    def contains(self, box):
+        """
+        Whether a box centre lies inside any lane polygon
+        """
+        if not self.polygons:
+            return True
+
+        cx = (box[0] + box[2]) / 2.0
+        cy = (box[1] + box[3]) / 2.0
+        return any(cv2.pointPolygonTest(p, (cx, cy), False) >= 0 for p in self.polygons)
+
+    def tiles(self, x1, y1, x2, y2):
+        """
+        Overlapping tile rectangles covering the given region
+        """
+        if not self.tiled:
+            return [(x1, y1, x2, y2)]
+
+        stride = max(1, int(self.tile_size * (1 - self.tile_overlap)))
+        tiles = []
+        for ty in self._starts(y1, y2, stride):
+            for tx in self._starts(x1, x2, stride):
+                tiles.append((tx, ty, min(tx + self.tile_size, x2), min(ty + self.tile_size, y2)))
+        return tiles
+
+    def _starts(self, start, end, stride):
+        """
+        Tile origins along one axis, last tile flush with the edge
+        """
+        if end - start <= self.tile_size:
+            return [start]
+
+        starts = list(range(start, end - self.tile_size, stride))
+        starts.append(end - self.tile_size)
+        return starts
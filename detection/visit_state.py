@@ -0,0 +1,160 @@
+import threading
+import time
+
+ENTRY = 'entry'
+EXIT = 'exit'
+
+
+def movement_direction(start_box, end_box, axis='y', entry_sign=1, min_shift=20):
+    """
+    Direction of travel between two (x1, y1, x2, y2) boxes of one track
+
+    :param axis: 'x' or 'y', the image axis the lane runs along
+    :param entry_sign: +1 if entering vehicles move towards larger coordinates, -1 otherwise
+    :param min_shift: Centre displacement in pixels below which the direction is unknown
+    :return: ENTRY, EXIT or None
+    """
+    i = 0 if axis == 'x' else 1
+    shift = ((end_box[i] + end_box[i + 2]) - (start_box[i] + start_box[i + 2])) / 2.0
+    if abs(shift) < min_shift:
+        return None
+    return ENTRY if shift * entry_sign > 0 else EXIT
+
+
+class _PlateState:
+    __slots__ = ('first_seen', 'last_seen', 'handled', 'pending', 'last_event', 'last_event_at')
+
+    def __init__(self, now):
+        self.first_seen = now
+        self.last_seen = now
+        self.handled = False
+        self.pending = None
+        self.last_event = None
+        self.last_event_at = None
+
+
+class VisitStateMachine:
+    def __init__(self, dwell_seconds=0.5, resight_window=3.0, cooldown_seconds=10.0):
+        """
+        Per-plate debouncing of gate sightings into entry/exit events
+
+        Sightings of a plate less than resight_window apart belong to one
+        pass through the gate, and each pass emits at most one event: an
+        entry if the vehicle is outside, an exit if it is inside. A pass
+        must last dwell_seconds before it counts, and no event follows the
+        previous one of the same plate within cooldown_seconds. When the
+        caller knows the direction of travel, a pass against the expected
+        direction (an "exit" of a vehicle that is outside) emits nothing.
+
+        An emitted event stays pending until the caller reports the outcome
+        of its write: confirm() closes the pass and starts the cooldown,
+        reject() leaves the pass open so the next sighting retries.
+
+        :param dwell_seconds: Time a plate must stay in view before a pass counts
+        :param resight_window: Gap after which a sighting starts a new pass
+        :param cooldown_seconds: Minimum time between two events of one plate
+        """
+        self.dwell_seconds = dwell_seconds
+        self.resight_window = resight_window
+        self.cooldown_seconds = cooldown_seconds
+
+        self._plates = {}
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+
+        # Counters
+        self.sightings = 0
+        self.events = 0
+        self.suppressed = 0
+        self.rejected = 0
+
+    def observe(self, plate_number, inside, direction=None, now=None):
+        """
+        Record one sighting of a plate
+
+        :param inside: Whether the vehicle is currently inside
+        :param direction: Optional ENTRY/EXIT from movement_direction
+        :return: ENTRY, EXIT or None; an event must be followed by confirm() or reject()
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self.sightings += 1
+            self._prune(now)
+
+            state = self._plates.get(plate_number)
+            if state is None:
+                state = self._plates[plate_number] = _PlateState(now)
+            elif now - state.last_seen > self.resight_window:
+                # New pass through the gate
+                state.first_seen = now
+                state.handled = False
+                state.pending = None
+            state.last_seen = now
+
+            if state.handled or state.pending is not None:
+                return None
+            if now - state.first_seen < self.dwell_seconds:
+                return None
+
+            event = EXIT if inside else ENTRY
+            if (direction is not None and direction != event) or (
+                    state.last_event_at is not None
+                    and now - state.last_event_at < self.cooldown_seconds):
+                state.handled = True
+                self.suppressed += 1
+                return None
+
+            state.pending = event
+            return event
+
+    def confirm(self, plate_number, now=None):
+        """
+        The write for the pending event succeeded: close the pass and start the cooldown
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            state = self._plates.get(plate_number)
+            if state is None or state.pending is None:
+                return
+            state.handled = True
+            state.last_event = state.pending
+            state.last_event_at = now
+            state.pending = None
+            self.events += 1
+
+    def reject(self, plate_number):
+        """
+        The write for the pending event failed: keep the pass open for a retry
+        """
+        with self._lock:
+            state = self._plates.get(plate_number)
+            if state is None or state.pending is None:
+                return
+            state.pending = None
+            self.rejected += 1
+
+    def _prune(self, now):
+        """Forget plates with no pass or cooldown still open"""
+        horizon = max(self.resight_window, self.cooldown_seconds)
+        if now - self._last_prune < horizon:
+            return
+        self._last_prune = now
+        for plate_number in [plate for plate, state in self._plates.items()
+                             if now - state.last_seen > horizon]:
+            del self._plates[plate_number]
+
+    def reset(self, plate_number=None):
+        with self._lock:
+            if plate_number is None:
+                self._plates.clear()
+            else:
+                self._plates.pop(plate_number, None)
+
+    def stats(self):
+        return {
+            'tracked_plates': len(self._plates),
+            'sightings': self.sightings,
+            'events': self.events,
+            'suppressed': self.suppressed,
+            'rejected': self.rejected
+        }
@@ -1,21 +1,59 @@
 import cv2
 import numpy as np
-from ultralytics import YOLO
-from paddleocr import PaddleOCR
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from ocr.recognition import recognize_plates
+from ocr.rec_quantization import INT8_REC_MODEL_DIR
+from detection.backends import PRECISIONS, load_yolo_model
+from detection.roi import nms
 
 class NumberPlateDetector:
-    def __init__(self, yolo_model_path='best.pt'):
+    def __init__(self, yolo_model_path='best.pt', max_batch_size=8, max_batch_wait=0.02,
+                 backend='torch', precision='fp32'):
         """
         Initialize detector with YOLO and PaddleOCR
+
+        :param max_batch_size: Maximum frames sent through YOLO in one forward pass
+        :param max_batch_wait: Seconds submit_frame waits to fill a batch before flushing
+        :param backend: 'torch', 'onnx', 'openvino' or 'auto' (fastest available)
+        :param precision: 'fp32' or 'int8' (variants built by quantize.py)
         """
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unknown precision: {precision}")
+        self.precision = precision
+        
         # YOLO for plate detection
-        self.yolo_model = YOLO(yolo_model_path)
+        self.yolo_model = load_yolo_model(yolo_model_path, backend, precision)
+        
+        # Batching configuration
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_batch_wait = max_batch_wait
+        self._batch_queue = queue.Queue()
+        self._batch_thread = None
+        self._batch_lock = threading.Lock()
         
         # PaddleOCR for plate reading
+        from paddleocr import PaddleOCR
+        ocr_args = {}
+        if precision == 'int8':
+            if not os.path.isdir(INT8_REC_MODEL_DIR):
+                raise FileNotFoundError(
+                    f"No INT8 recognizer at {INT8_REC_MODEL_DIR}. Run quantize.py first."
+                )
+            ocr_args.update(
+                rec_model_dir=INT8_REC_MODEL_DIR,
+                enable_mkldnn=True,
+                precision='int8'
+            )
+        
         self.ocr = PaddleOCR(
             use_angle_cls=True,  # Enable angle classification
             lang='en',           # Language
-            show_log=False       # Disable verbose logging
+            show_log=False,      # Disable verbose logging
+            **ocr_args
         )
     
     def detect_plates(self, frame):
@@ -25,13 +63,120 @@ class NumberPlateDetector:
         results = self.yolo_model(frame)
         plates = []
         for result in results:
-            for box in result.boxes:
-                x1, y1, x2, y2 = box.xyxy[0]
-                confidence = box.conf[0]
-                class_id = int(box.cls[0])
-                
-                # Confidence and class filtering
-                if class_id == 0 and confidence > 0.5:
+            plates.extend(self._boxes_from_result(result))
+        
+        return plates
+    
+    def detect_plates_batch(self, frames):
+        """
+        Detect plates on several frames, one YOLO forward pass per batch
+        
+        :param frames: List of BGR frames
+        :return: List of plate box lists, one per input frame
+        """
+        plates_per_frame = []
+        for start in range(0, len(frames), self.max_batch_size):
+            chunk = list(frames[start:start + self.max_batch_size])
+            results = self.yolo_model(chunk)
+            for result in results:
+                plates_per_frame.append(self._boxes_from_result(result))
+        
+        return plates_per_frame
+    
+    def submit_frame(self, frame):
+        """
+        Queue a frame for batched detection
+        
+        Frames submitted from several cameras or request handlers are
+        grouped until max_batch_size is reached or max_batch_wait expires.
+        
+        :return: Future resolving to the plate boxes for this frame
+        """
+        future = Future()
+        self._ensure_batch_worker()
+        self._batch_queue.put((frame, future))
+        return future
+    
+    def _ensure_batch_worker(self):
+        """
+        Start the batching thread on first use
+        """
+        with self._batch_lock:
+            if self._batch_thread is None or not self._batch_thread.is_alive():
+                self._batch_thread = threading.Thread(
+                    target=self._batch_worker,
+                    daemon=True
+                )
+                self._batch_thread.start()
+    
+    def _batch_worker(self):
+        """
+        Collect queued frames into batches and resolve their futures
+        """
+        while True:
+            pending = [self._batch_queue.get()]
+            deadline = time.monotonic() + self.max_batch_wait
+            
+            while len(pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    pending.append(self._batch_queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            frames = [frame for frame, _ in pending]
+            try:
+                plates_per_frame = self.detect_plates_batch(frames)
+                for (_, future), plates in zip(pending, plates_per_frame):
+                    future.set_result(plates)
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+    
+    def detect_plates_roi(self, frame, roi):
+        """
+        Detect plates only inside a camera's lane region
+        
+        The region's bounding rectangle is cropped from the full frame and,
+        in tiled mode, split into overlapping tiles that go through YOLO as
+        one batch. Boxes are mapped back to full-frame coordinates, merged
+        with NMS and kept only if their centre lies in a lane polygon.
+        
+        :param roi: CameraROI for this camera
+        """
+        x1, y1, x2, y2 = roi.bounds(frame.shape)
+        tiles = roi.tiles(x1, y1, x2, y2)
+        
+        boxes = []
+        scores = []
+        for start in range(0, len(tiles), self.max_batch_size):
+            chunk = tiles[start:start + self.max_batch_size]
+            results = self.yolo_model([frame[ty1:ty2, tx1:tx2] for tx1, ty1, tx2, ty2 in chunk])
+            for (tx1, ty1, _, _), result in zip(chunk, results):
+                for bx1, by1, bx2, by2, confidence in self._boxes_from_result(result, with_scores=True):
+                    boxes.append((bx1 + tx1, by1 + ty1, bx2 + tx1, by2 + ty1))
+                    scores.append(confidence)
+        
+        keep = nms(boxes, scores, roi.nms_iou) if len(tiles) > 1 else range(len(boxes))
+        return [boxes[i] for i in keep if roi.contains(boxes[i])]
+    
+    def _boxes_from_result(self, result, with_scores=False):
+        """
+        Extract plate boxes from a single YOLO result
+        """
+        plates = []
+        for box in result.boxes:
+            x1, y1, x2, y2 = box.xyxy[0]
+            confidence = box.conf[0]
+            class_id = int(box.cls[0])
+            
+            # Confidence and class filtering
+            if class_id == 0 and confidence > 0.5:
+                if with_scores:
+                    plates.append((int(x1), int(y1), int(x2), int(y2), float(confidence)))
+                else:
                     plates.append((int(x1), int(y1), int(x2), int(y2)))
         
         return plates
@@ -40,26 +185,38 @@ class NumberPlateDetector:
         """
         Process plate image with PaddleOCR
         """
+        return self.process_plates_batch([plate_img])[0]
+    
+    def process_plates_batch(self, plate_imgs):
+        """
+        Recognize several YOLO-cropped plates in one batched OCR call
+        
+        :param plate_imgs: Plate crops from one or more frames
+        :return: List of plate info dicts or None, one per crop
+        """
         try:
-            # Perform OCR on plate image
-            results = self.ocr.ocr(plate_img, cls=True)
-            
-            if results and results[0]:
-                text = results[0][0][1][0]  # Detected text
-                confidence = results[0][0][1][1]  # Confidence score
-                
-                # Clean and validate plate number
-                cleaned_text = self._clean_plate_text(text)
-                
-                return {
-                    'text': cleaned_text,
-                    'confidence': confidence
-                }
-            
-            return None
+            recognized = recognize_plates(self.ocr, plate_imgs)
         except Exception as e:
             print(f"Plate processing error: {e}")
-            return None
+            return [None] * len(plate_imgs)
+        
+        plate_infos = []
+        for result in recognized:
+            if result is None:
+                plate_infos.append(None)
+                continue
+            
+            text, confidence = result
+            
+            # Clean and validate plate number
+            cleaned_text = self._clean_plate_text(text)
+            
+            plate_infos.append({
+                'text': cleaned_text,
+                'confidence': confidence
+            })
+        
+        return plate_infos
     
     def _clean_plate_text(self, text):
         """
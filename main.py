@@ -44,6 +44,15 @@ def run_api_server():
     except Exception as e:
         logger.error(f"API server failed: {e}")
 
+def run_model_server():
+    """Start the shared detection/OCR model server"""
+    try:
+        from detection.model_server import ModelServer
+        logger.info("Starting model server...")
+        ModelServer().serve_forever()
+    except Exception as e:
+        logger.error(f"Model server failed: {e}")
+
 def main():
     """Main entry point for the vehicle detection system"""
     try:
@@ -57,6 +66,12 @@ def main():
         # Run detection system
         run_detection_system()
         
+        # Optional: Run the shared model server so UI, API and scripts
+        # reuse one copy of the models
+        # from multiprocessing import Process
+        # model_process = Process(target=run_model_server)
+        # model_process.start()
+        
         # Optional: Run API server in a separate thread or process
         # Uncomment if you want to run API server alongside UI
         # from multiprocessing import Process
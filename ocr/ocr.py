@@ -1,13 +1,15 @@
 import cv2
 import numpy as np
 import re
-import easyocr
 from collections import deque
 
 class OCRStabilizer:
-    def __init__(self, lang=['en']):
-        # Initialize EasyOCR
-        self.reader = easyocr.Reader(lang)
+    def __init__(self, lang=['en'], reader=None):
+        # Initialize EasyOCR, or reuse a shared reader (e.g. the model server's)
+        if reader is None:
+            import easyocr
+            reader = easyocr.Reader(lang)
+        self.reader = reader
         
         # History for stabilizing detections
         self.history = deque(maxlen=5)
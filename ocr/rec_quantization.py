@@ -0,0 +1,100 @@
+import glob
+import os
+import cv2
+import numpy as np
+
+from ocr.recognition import REC_IMAGE_HEIGHT
+
+# Default locations of the FP32 PaddleOCR recognizer and its INT8 variant
+FP32_REC_MODEL_DIR = os.path.expanduser(
+    os.path.join('~', '.paddleocr', 'whl', 'rec', 'en', 'en_PP-OCRv4_rec_infer')
+)
+INT8_REC_MODEL_DIR = os.path.join('models', 'rec_int8')
+
+# Recognizer input width used for calibration batches
+REC_IMAGE_WIDTH = 320
+
+
+def iter_plate_crops(image_dir, label_dir, limit=500):
+    """
+    Yield plate crops using YOLO labels (class cx cy w h, normalized)
+    """
+    count = 0
+    for image_path in sorted(glob.glob(os.path.join(image_dir, '*'))):
+        stem = os.path.splitext(os.path.basename(image_path))[0]
+        label_path = os.path.join(label_dir, f"{stem}.txt")
+        if not os.path.exists(label_path):
+            continue
+
+        image = cv2.imread(image_path)
+        if image is None:
+            continue
+        h, w = image.shape[:2]
+
+        with open(label_path, 'r') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) != 5:
+                    continue
+                cx, cy, bw, bh = (float(v) for v in parts[1:])
+                x1 = max(0, int((cx - bw / 2) * w))
+                y1 = max(0, int((cy - bh / 2) * h))
+                x2 = min(w, int((cx + bw / 2) * w))
+                y2 = min(h, int((cy + bh / 2) * h))
+                if x2 > x1 and y2 > y1:
+                    yield image[y1:y2, x1:x2]
+                    count += 1
+                    if count >= limit:
+                        return
+
+
+def preprocess_rec_input(plate_img):
+    """
+    Normalize a crop the way the PaddleOCR recognizer expects (3, 48, 320)
+    """
+    h, w = plate_img.shape[:2]
+    new_w = min(REC_IMAGE_WIDTH, max(1, int(np.ceil(REC_IMAGE_HEIGHT * w / float(h)))))
+    resized = cv2.resize(plate_img, (new_w, REC_IMAGE_HEIGHT)).astype(np.float32)
+    resized = (resized.transpose(2, 0, 1) / 255.0 - 0.5) / 0.5
+
+    padded = np.zeros((3, REC_IMAGE_HEIGHT, REC_IMAGE_WIDTH), dtype=np.float32)
+    padded[:, :, :new_w] = resized
+    return padded
+
+
+def quantize_recognizer(calibration_images, calibration_labels,
+                        fp32_model_dir=FP32_REC_MODEL_DIR,
+                        int8_model_dir=INT8_REC_MODEL_DIR,
+                        batch_nums=50):
+    """
+    Post-training static INT8 quantization of the PaddleOCR recognizer
+
+    Calibration uses plate crops cut from the labelled training images.
+    Requires paddleslim.
+
+    :return: Path to the INT8 inference model directory
+    """
+    import paddle
+    from paddleslim.quant import quant_post_static
+
+    paddle.enable_static()
+
+    def sample_generator():
+        for crop in iter_plate_crops(calibration_images, calibration_labels):
+            yield (preprocess_rec_input(crop),)
+
+    quant_post_static(
+        executor=paddle.static.Executor(paddle.CPUPlace()),
+        model_dir=fp32_model_dir,
+        quantize_model_path=int8_model_dir,
+        sample_generator=sample_generator,
+        model_filename='inference.pdmodel',
+        params_filename='inference.pdiparams',
+        save_model_filename='inference.pdmodel',
+        save_params_filename='inference.pdiparams',
+        batch_size=16,
+        batch_nums=batch_nums,
+        algo='KL'
+    )
+
+    return int8_model_dir
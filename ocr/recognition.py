@@ -0,0 +1,65 @@
+import cv2
+import numpy as np
+
+# PaddleOCR recognizer input height (rec_image_shape 3,48,320)
+REC_IMAGE_HEIGHT = 48
+
+# Crops taller than this ratio (h / w) are treated as rotated
+ROTATION_ASPECT_RATIO = 1.5
+
+
+def resize_to_rec_height(plate_img, rec_height=REC_IMAGE_HEIGHT):
+    """
+    Resize a plate crop to the recognizer input height, keeping aspect ratio
+    """
+    h, w = plate_img.shape[:2]
+    if h == rec_height:
+        return plate_img
+    new_w = max(1, int(round(w * rec_height / float(h))))
+    return cv2.resize(plate_img, (new_w, rec_height))
+
+
+def recognize_plates(ocr, plate_imgs, rec_height=REC_IMAGE_HEIGHT,
+                     rotation_ratio=ROTATION_ASPECT_RATIO):
+    """
+    Run PaddleOCR recognition only on pre-localized plate crops
+
+    Text detection is skipped because YOLO already found the plate. All
+    crops go through one batched recognizer call; angle classification
+    only runs on crops whose aspect ratio suggests they are rotated.
+
+    :param ocr: PaddleOCR instance
+    :param plate_imgs: List of BGR plate crops
+    :return: List of (text, confidence) tuples or None, one per crop
+    """
+    results = [None] * len(plate_imgs)
+
+    valid_idx = []
+    crops = []
+    rotated = []
+    for idx, plate_img in enumerate(plate_imgs):
+        if plate_img is None or plate_img.size == 0:
+            continue
+        h, w = plate_img.shape[:2]
+        if h / float(w) >= rotation_ratio:
+            plate_img = np.rot90(plate_img)
+            rotated.append(len(crops))
+        valid_idx.append(idx)
+        crops.append(resize_to_rec_height(plate_img, rec_height))
+
+    if not crops:
+        return results
+
+    # Angle classification only for crops that looked rotated
+    if rotated and getattr(ocr, 'text_classifier', None) is not None:
+        fixed, _, _ = ocr.text_classifier([crops[i] for i in rotated])
+        for i, crop in zip(rotated, fixed):
+            crops[i] = crop
+
+    rec_res, _ = ocr.text_recognizer(crops)
+
+    for idx, (text, confidence) in zip(valid_idx, rec_res):
+        if text:
+            results[idx] = (text, confidence)
+
+    return results
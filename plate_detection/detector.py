@@ -1,6 +1,7 @@
 import cv2
 import numpy as np
 import re
+from ocr.recognition import recognize_plates
 
 class PlateDetector:
     def __init__(self, model_path='best.pt'):
@@ -52,27 +53,36 @@ class PlateDetector:
         """
         Process and extract text from plate image
         """
+        return self.process_plates_batch([plate_img])[0]
+    
+    def process_plates_batch(self, plate_imgs):
+        """
+        Extract text from several pre-localized plate crops at once
+        """
         try:
-            # Perform OCR on plate image
-            results = self.ocr.ocr(plate_img, cls=True)
-            
-            # Extract and clean text
-            if results and results[0]:
-                text = results[0][0][1][0]  # Detected text
-                confidence = results[0][0][1][1]  # Confidence score
-                
-                # Clean plate number
-                cleaned_text = self._clean_plate_text(text)
-                
-                return {
-                    'text': cleaned_text,
-                    'confidence': confidence
-                }
-            
-            return None
+            # Recognition only, text detection already done upstream
+            recognized = recognize_plates(self.ocr, plate_imgs)
         except Exception as e:
             print(f"Plate processing error: {e}")
-            return None
+            return [None] * len(plate_imgs)
+        
+        plate_infos = []
+        for result in recognized:
+            if result is None:
+                plate_infos.append(None)
+                continue
+            
+            text, confidence = result
+            
+            # Clean plate number
+            cleaned_text = self._clean_plate_text(text)
+            
+            plate_infos.append({
+                'text': cleaned_text,
+                'confidence': confidence
+            })
+        
+        return plate_infos
     
     def _clean_plate_text(self, text):
         """
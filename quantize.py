@@ -0,0 +1,148 @@
+import argparse
+import cv2
+import glob
+import json
+import os
+import re
+import time
+import yaml
+from datetime import datetime
+
+from detection.backends import backend_available, export_path, load_yolo_model
+from detection.yolo_detector import NumberPlateDetector
+from ocr.rec_quantization import FP32_REC_MODEL_DIR, INT8_REC_MODEL_DIR, quantize_recognizer
+
+CALIBRATION_IMAGES = os.path.join('dataset', 'train', 'images')
+CALIBRATION_LABELS = os.path.join('dataset', 'train', 'labels')
+VALID_DIR = os.path.join('dataset', 'valid')
+REALISTIC_DIR = 'test_samples_realistic'
+
+
+def latest_weights():
+    """Most recent best.pt produced by train.py"""
+    candidates = glob.glob(os.path.join('runs', 'detect', 'train*', 'weights', 'best.pt'))
+    if not candidates:
+        return 'best.pt'
+    return max(candidates, key=os.path.getmtime)
+
+
+def build_int8_variants(weights, backend, rec_model_dir):
+    """Produce the INT8 detector and recognizer, calibrated on dataset/train"""
+    print(f"🔧 Quantizing detector {weights} ({backend})...")
+    detector_path = export_path(weights, backend, 'int8', CALIBRATION_IMAGES)
+    print(f"✅ INT8 detector: {detector_path}")
+
+    print(f"🔧 Quantizing recognizer {rec_model_dir}...")
+    rec_path = quantize_recognizer(CALIBRATION_IMAGES, CALIBRATION_LABELS, rec_model_dir)
+    print(f"✅ INT8 recognizer: {rec_path}")
+
+
+def valid_yaml():
+    """Dataset yaml for validating on dataset/valid"""
+    path = os.path.abspath('dataset_valid.yaml')
+    with open(path, 'w') as f:
+        yaml.dump({
+            'path': os.path.abspath(VALID_DIR),
+            'train': 'images',
+            'val': 'images',
+            'names': {0: 'license_plate'}
+        }, f)
+    return path
+
+
+def detector_metrics(weights, backend, precision):
+    """mAP on dataset/valid and mean latency per image"""
+    model = load_yolo_model(weights, backend, precision)
+    metrics = model.val(data=valid_yaml(), verbose=False)
+    return {
+        'map50': float(metrics.box.map50),
+        'map50_95': float(metrics.box.map),
+        'latency_ms': float(metrics.speed.get('inference', 0.0))
+    }
+
+
+def plate_accuracy(weights, backend, precision):
+    """Plate-string accuracy on test_samples_realistic (plate text in filename)"""
+    detector = NumberPlateDetector(weights, backend=backend, precision=precision)
+
+    total = correct = 0
+    ocr_ms = []
+    for path in sorted(glob.glob(os.path.join(REALISTIC_DIR, '*.jpg'))):
+        match = re.search(r'realistic_([A-Z0-9]+)\.jpg$', path)
+        frame = cv2.imread(path)
+        if not match or frame is None:
+            continue
+        total += 1
+
+        plates = detector.detect_plates(frame)
+        start = time.perf_counter()
+        infos = detector.process_plates_batch([frame[y1:y2, x1:x2] for x1, y1, x2, y2 in plates])
+        ocr_ms.append((time.perf_counter() - start) * 1000)
+
+        texts = {re.sub(r'\s', '', info['text']) for info in infos if info and info['text']}
+        if match.group(1) in texts:
+            correct += 1
+
+    return {
+        'plate_accuracy': correct / total if total else 0.0,
+        'samples': total,
+        'ocr_latency_ms': sum(ocr_ms) / len(ocr_ms) if ocr_ms else 0.0
+    }
+
+
+def write_report(weights, backend, output):
+    """Compare FP32 and INT8 accuracy and latency"""
+    report = {
+        'generated': datetime.now().isoformat(),
+        'weights': weights,
+        'backend': backend,
+        'variants': {}
+    }
+
+    for precision in ('fp32', 'int8'):
+        print(f"📊 Evaluating {precision}...")
+        result = detector_metrics(weights, backend, precision)
+        result.update(plate_accuracy(weights, backend, precision))
+        report['variants'][precision] = result
+
+    fp32, int8 = report['variants']['fp32'], report['variants']['int8']
+    report['delta'] = {
+        'map50': int8['map50'] - fp32['map50'],
+        'plate_accuracy': int8['plate_accuracy'] - fp32['plate_accuracy'],
+        'detector_speedup': fp32['latency_ms'] / int8['latency_ms'] if int8['latency_ms'] else None
+    }
+
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=4)
+
+    print(f"{'variant':<8} {'mAP50':>8} {'mAP50-95':>9} {'plate acc':>10} {'det ms':>8} {'ocr ms':>8}")
+    for precision, r in report['variants'].items():
+        print(f"{precision:<8} {r['map50']:>8.3f} {r['map50_95']:>9.3f} "
+              f"{r['plate_accuracy']:>10.2%} {r['latency_ms']:>8.1f} {r['ocr_latency_ms']:>8.1f}")
+    print(f"✅ Report saved to {output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build INT8 detector/recognizer and compare against FP32")
+    parser.add_argument('--weights', default=latest_weights())
+    parser.add_argument('--backend', default='openvino', choices=['onnx', 'openvino'])
+    parser.add_argument('--rec-model-dir', default=FP32_REC_MODEL_DIR)
+    parser.add_argument('--report', default='quantization_report.json')
+    parser.add_argument('--skip-build', action='store_true')
+    args = parser.parse_args()
+
+    if not backend_available(args.backend):
+        print(f"❌ {args.backend} runtime is not installed")
+        return
+
+    if not args.skip_build:
+        build_int8_variants(args.weights, args.backend, args.rec_model_dir)
+    elif not os.path.isdir(INT8_REC_MODEL_DIR):
+        print(f"❌ No INT8 recognizer at {INT8_REC_MODEL_DIR}")
+        return
+
+    write_report(args.weights, args.backend, args.report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,60 +1,26 @@
-import sqlite3
-from datetime import datetime
+import os
+
+from database.storage import DATABASE_URL_ENV, create_database_manager
 
 class ParkingDatabase:
-    def __init__(self):
-        self.conn = sqlite3.connect('parking.db')
-        self.create_tables()
+    def __init__(self, db_path='parking.db', url=None):
+        """
+        parking_records store, shared through $VEHICLE_DB_URL when it is set
 
-    def create_tables(self):
-        cursor = self.conn.cursor()
-        cursor.execute('''
-        CREATE TABLE IF NOT EXISTS parking_records (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            plate_number TEXT NOT NULL,
-            entry_time DATETIME NOT NULL,
-            exit_time DATETIME,
-            status TEXT DEFAULT 'inside'
-        )
-        ''')
-        self.conn.commit()
+        Without a URL the records stay in the SQLite file at db_path.
+        """
+        url = url or os.environ.get(DATABASE_URL_ENV) or f"sqlite:///{db_path}"
+        self.store = create_database_manager(url)
 
     def record_entry(self, plate_number, timestamp):
-        cursor = self.conn.cursor()
-        
-        # Check if vehicle is already inside
-        cursor.execute('''
-        SELECT id FROM parking_records 
-        WHERE plate_number = ? AND status = 'inside'
-        ''', (plate_number,))
-        
-        if not cursor.fetchone():
-            # Record new entry
-            cursor.execute('''
-            INSERT INTO parking_records (plate_number, entry_time, status)
-            VALUES (?, ?, 'inside')
-            ''', (plate_number, timestamp))
-            self.conn.commit()
+        # Skipped if the vehicle is already inside
+        return self.store.record_parking_entry(plate_number, timestamp)
 
     def record_exit(self, plate_number, timestamp):
-        cursor = self.conn.cursor()
-        cursor.execute('''
-        UPDATE parking_records 
-        SET exit_time = ?, status = 'exited'
-        WHERE plate_number = ? AND status = 'inside'
-        ''', (timestamp, plate_number))
-        self.conn.commit()
+        return self.store.record_parking_exit(plate_number, timestamp)
 
     def get_vehicle_status(self, plate_number):
-        cursor = self.conn.cursor()
-        cursor.execute('''
-        SELECT entry_time, status 
-        FROM parking_records 
-        WHERE plate_number = ? 
-        ORDER BY entry_time DESC 
-        LIMIT 1
-        ''', (plate_number,))
-        return cursor.fetchone()
+        return self.store.get_parking_status(plate_number)
 
-    def __del__(self):
-        self.conn.close() 
\ No newline at end of file
+    def close(self):
+        self.store.close()
@@ -0,0 +1,95 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Entry-point modules and how long importing each may take
+IMPORT_BUDGETS = {
+    'api.main': 3.0,
+    'ui.app': 3.0,
+    'detection.yolo_detector': 1.5,
+    'blockchain.blockchain_manager': 0.5,
+    'ocr.ocr': 1.0,
+}
+
+# Modules that must stay unloaded until a model or connection is needed
+DEFERRED_MODULES = ['ultralytics', 'paddleocr', 'easyocr', 'web3', 'torch']
+
+# Import attempts of deferred modules are recorded whether or not they are
+# installed, so an eager import is caught on machines without the extras
+MEASURE = """
+import json, sys, time
+deferred = {deferred!r}
+attempted = set()
+
+class Watch:
+    def find_spec(self, name, path=None, target=None):
+        if name.split('.')[0] in deferred:
+            attempted.add(name.split('.')[0])
+        return None
+
+sys.meta_path.insert(0, Watch())
+start = time.perf_counter()
+try:
+    import {module}
+except ModuleNotFoundError as e:
+    if (e.name or '').split('.')[0] not in deferred:
+        raise
+elapsed = time.perf_counter() - start
+print(json.dumps({{
+    'elapsed': elapsed,
+    'loaded': [m for m in deferred if m in attempted]
+}}))
+"""
+
+
+def measure_import(module):
+    """
+    Import a module in a fresh interpreter and time it
+
+    It runs in a scratch directory, so the local databases entry points
+    open at import time are not the repo's own.
+    """
+    code = MEASURE.format(module=module, deferred=DEFERRED_MODULES)
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [ROOT, env.get('PYTHONPATH')]))
+    with tempfile.TemporaryDirectory() as cwd:
+        output = subprocess.check_output([sys.executable, '-c', code], text=True,
+                                         stderr=subprocess.PIPE, cwd=cwd, env=env)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if entry-point import time exceeds its budget")
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiply all budgets (slow CI machines)")
+    args = parser.parse_args()
+
+    print("⏱️ Import-Time Budget Check:")
+    failed = False
+    for module, budget in IMPORT_BUDGETS.items():
+        budget *= args.scale
+        try:
+            result = measure_import(module)
+        except subprocess.CalledProcessError:
+            print(f"❌ {module} - Import failed")
+            failed = True
+            continue
+
+        if result['loaded']:
+            print(f"❌ {module} - Eagerly imports {', '.join(result['loaded'])}")
+            failed = True
+        elif result['elapsed'] > budget:
+            print(f"❌ {module} - {result['elapsed']:.2f}s (budget {budget:.2f}s)")
+            failed = True
+        else:
+            print(f"✅ {module} - {result['elapsed']:.2f}s (budget {budget:.2f}s)")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
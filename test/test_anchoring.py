@@ -0,0 +1,50 @@
+import pytest
+
+from blockchain.blockchain_manager import anchor_options
+
+
+class FakeManager:
+    def __init__(self, results):
+        self.results = list(results)
+        self.calls = 0
+
+    def anchor_merkle_root(self, root, event_count):
+        self.calls += 1
+        return self.results.pop(0)
+
+
+def test_anchor_options_from_environment():
+    options = anchor_options('gate.db', {
+        'VEHICLE_ANCHOR_MODE': 'true',
+        'VEHICLE_ANCHOR_BATCH_EVENTS': '50',
+        'VEHICLE_ANCHOR_BATCH_SECONDS': '2.5'
+    })
+    assert options == {
+        'anchor_mode': True,
+        'anchor_db_path': 'gate.db',
+        'anchor_batch_events': 50,
+        'anchor_batch_seconds': 2.5
+    }
+    assert anchor_options(environ={}) == {'anchor_mode': False}
+
+
+def test_already_anchored_root_marks_batch_once(tmp_path):
+    pytest.importorskip('eth_utils')
+    from blockchain.anchoring import MerkleAnchor
+
+    manager = FakeManager([
+        None,
+        {'transaction_hash': None, 'block_number': None, 'already_anchored': True},
+    ])
+    anchor = MerkleAnchor(manager, str(tmp_path / 'anchor.db'), batch_seconds=3600)
+    try:
+        event = anchor.record_event('KL07AB1234', 'entry', 0.95)
+
+        # First attempt fails, the retry finds the root already on-chain
+        assert anchor.anchor_pending() == 0
+        assert anchor.anchor_pending() == 1
+        assert anchor.anchor_pending() == 0
+        assert manager.calls == 2
+        assert anchor.get_proof(event['event_id'])['batch_status'] == 'anchored'
+    finally:
+        anchor.stop()
@@ -0,0 +1,13 @@
+import pytest
+
+web3 = pytest.importorskip('web3')
+
+from blockchain.connection import make_provider
+
+
+@pytest.mark.parametrize('uri', ['ws://127.0.0.1:8546', 'http://127.0.0.1:8545'])
+def test_make_provider_builds_a_sync_provider(uri):
+    provider = make_provider(uri)
+
+    assert isinstance(provider, web3.providers.BaseProvider)
+    assert provider.endpoint_uri == uri
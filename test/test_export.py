@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from database.database_manager import DatabaseManager
+from database.export import export_rows
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / 'vehicle_logs.db')
+    db_manager = DatabaseManager(path)
+    for i in range(25):
+        entry_id = db_manager.log_entry(f"KL07AB{i:04d}", 0.9)
+        # Chain columns stay NULL in the first chunks and are set later on
+        if i >= 20:
+            db_manager.update_blockchain_status(entry_id, 'confirmed', f"0x{i:064x}", 100 + i)
+    db_manager.close()
+    return path
+
+
+def test_jsonl_export_streams_every_row(db_path, tmp_path):
+    output = str(tmp_path / 'entries.jsonl')
+    result = export_rows(db_path, output, chunk_size=10)
+
+    with open(output) as f:
+        rows = [json.loads(line) for line in f]
+    assert result['rows'] == 25
+    assert [row['id'] for row in rows] == list(range(1, 26))
+    assert rows[-1]['block_number'] == 124
+
+
+def test_parquet_export_keeps_one_schema_across_null_chunks(db_path, tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    output = str(tmp_path / 'entries.parquet')
+
+    result = export_rows(db_path, output, chunk_size=10)
+
+    table = pq.read_table(output)
+    assert result['rows'] == table.num_rows == 25
+    assert str(table.schema.field('block_number').type) == 'int64'
+    assert table.column('blockchain_tx').null_count == 20
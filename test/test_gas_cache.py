@@ -0,0 +1,61 @@
+from blockchain.gas_cache import GasCache
+
+
+class FakeFunction:
+    def __init__(self, fn_name, args, gas):
+        self.fn_name = fn_name
+        self.args = args
+        self.gas = gas
+        self.estimates = 0
+
+    def estimate_gas(self):
+        self.estimates += 1
+        return self.gas
+
+
+def batch(count):
+    plates = [f"KL07AB{i:04d}" for i in range(count)]
+    return FakeFunction('logVehicleEntriesBatch', (plates, [90] * count), 50000 * count)
+
+
+def test_batches_of_different_sizes_are_estimated_separately():
+    cache = GasCache(margin=1.25)
+    small, large = batch(7), batch(12)
+
+    assert cache.gas_for(small) == int(350000 * 1.25)
+    assert cache.gas_for(large) == int(600000 * 1.25)
+    assert large.estimates == 1
+
+
+def test_same_call_shape_reuses_the_estimate():
+    cache = GasCache()
+    first, second = batch(5), batch(5)
+
+    assert cache.gas_for(first) == cache.gas_for(second)
+    assert second.estimates == 0
+
+
+def test_reverted_receipt_evicts_the_entry():
+    cache = GasCache()
+    function = batch(3)
+    cache.gas_for(function)
+
+    # Tracked as HexBytes-like bytes, settled with the 0x string stored in the DB
+    cache.track(b'\x01' * 32, function)
+    cache.settle('0x' + '01' * 32, status=0)
+
+    replacement = batch(3)
+    cache.gas_for(replacement)
+    assert replacement.estimates == 1
+
+
+def test_successful_receipt_keeps_the_entry():
+    cache = GasCache()
+    function = batch(3)
+    cache.gas_for(function)
+    cache.track(b'\x02' * 32, function)
+    cache.settle(b'\x02' * 32, status=1)
+
+    again = batch(3)
+    cache.gas_for(again)
+    assert again.estimates == 0
@@ -0,0 +1,43 @@
+import os
+import re
+import subprocess
+
+import pytest
+
+from startup_check import IMPORT_BUDGETS, measure_import
+
+# Slow CI machines can stretch every budget
+SCALE = float(os.environ.get('IMPORT_BUDGET_SCALE', '1.0'))
+
+REPO_PACKAGES = {'api', 'blockchain', 'database', 'detection', 'ocr', 'src', 'ui'}
+MISSING_MODULE = re.compile(r"No module named '([\w.]+)'")
+
+
+def _measure(module):
+    """Import time of a module, skipping when a third-party dependency is missing"""
+    try:
+        return measure_import(module)
+    except subprocess.CalledProcessError as e:
+        missing = MISSING_MODULE.search(e.stderr or '')
+        if missing and missing.group(1).split('.')[0] not in REPO_PACKAGES:
+            pytest.skip(f"{missing.group(1)} is not installed")
+        raise
+
+
+@pytest.mark.parametrize('module', sorted(IMPORT_BUDGETS))
+def test_entry_point_defers_heavy_modules(module):
+    result = _measure(module)
+    assert result['loaded'] == [], f"{module} eagerly imports {result['loaded']}"
+
+
+@pytest.mark.parametrize('module', sorted(IMPORT_BUDGETS))
+def test_entry_point_import_time(module):
+    budget = IMPORT_BUDGETS[module] * SCALE
+    result = _measure(module)
+    assert result['elapsed'] <= budget, f"{module} took {result['elapsed']:.2f}s (budget {budget:.2f}s)"
+
+
+
+def test_eager_import_is_reported_without_the_extra_installed():
+    # Caught the same way whether or not ultralytics is installed
+    assert measure_import('ultralytics')['loaded'] == ['ultralytics']
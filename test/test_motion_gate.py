@@ -0,0 +1,34 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('cv2')
+
+from detection.motion_gate import MotionGate
+from detection.roi import CameraROI
+
+# Lane on the left half of a 640x480 frame
+LANE = CameraROI(polygons=[[(0, 0), (320, 0), (320, 480), (0, 480)]])
+
+
+def frame_with_block(x):
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    if x is not None:
+        frame[200:280, x:x + 80] = 255
+    return frame
+
+
+@pytest.mark.parametrize('method', ['diff', 'mog2'])
+def test_motion_outside_the_lane_is_ignored(method):
+    gate = MotionGate(method=method, cooldown_frames=0, lane=LANE)
+    for _ in range(30):
+        gate.should_process(frame_with_block(None))
+
+    assert not gate.should_process(frame_with_block(500))
+    assert gate.should_process(frame_with_block(100))
+
+
+def test_lane_without_polygons_watches_the_whole_frame():
+    gate = MotionGate(cooldown_frames=0, lane=CameraROI())
+    gate.should_process(frame_with_block(None))
+
+    assert gate.should_process(frame_with_block(500))
@@ -0,0 +1,83 @@
+import pytest
+
+from blockchain.blockchain_manager import BlockchainManager
+from blockchain.gas_cache import GasCache
+from blockchain.nonce_manager import NonceManager
+
+
+class FakeEth:
+    def __init__(self, pending):
+        self.pending = pending
+        self.down = False
+
+    def get_transaction_count(self, account, block_identifier):
+        if self.down:
+            raise ConnectionError('node unreachable')
+        return self.pending
+
+
+class FakeWeb3:
+    def __init__(self, pending):
+        self.eth = FakeEth(pending)
+
+
+class FakeFunction:
+    fn_name = 'logVehicleEntry'
+    args = ('KL07AB1234', 90)
+
+    def __init__(self, eth):
+        self.eth = eth
+        self.nonces = []
+
+    def estimate_gas(self):
+        return 100000
+
+    def transact(self, tx):
+        if self.eth.down:
+            raise ConnectionError('node unreachable')
+        self.nonces.append(tx['nonce'])
+        self.eth.pending += 1
+        return f"0x{tx['nonce']:064x}"
+
+
+def manager(w3):
+    blockchain = BlockchainManager.__new__(BlockchainManager)
+    blockchain.w3 = w3
+    blockchain.nonce_manager = NonceManager(w3, '0xabc')
+    blockchain.gas_cache = GasCache()
+
+    def reconnect():
+        if w3.eth.down:
+            raise ConnectionError('node unreachable')
+    blockchain.reconnect = reconnect
+    return blockchain
+
+
+def test_released_nonce_is_reused_or_refetched():
+    w3 = FakeWeb3(pending=5)
+    nonces = NonceManager(w3, '0xabc')
+
+    first = nonces.allocate()
+    nonces.release(first)
+    assert nonces.allocate() == 5
+
+    nonces.allocate()
+    nonces.release(5)
+    # 6 is still out, so the counter comes from the node
+    w3.eth.pending = 7
+    assert nonces.allocate() == 7
+
+
+def test_failed_send_while_the_node_is_down_leaves_no_nonce_gap():
+    w3 = FakeWeb3(pending=5)
+    blockchain = manager(w3)
+    function = FakeFunction(w3.eth)
+    blockchain._send_transaction(function)
+
+    w3.eth.down = True
+    with pytest.raises(ConnectionError):
+        blockchain._send_transaction(function)
+
+    w3.eth.down = False
+    blockchain._send_transaction(function)
+    assert function.nonces == [5, 6]
@@ -0,0 +1,118 @@
+import threading
+import time
+
+from blockchain.outbox import ChainOutbox
+from blockchain.write_queue import BlockchainWriteQueue
+
+
+class Receipt:
+    status = 1
+    blockNumber = 1
+
+
+class FakeManager:
+    anchor = None
+
+    def __init__(self):
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def supports_batch(self):
+        return False
+
+    def send_vehicle_entry(self, plate_number, confidence):
+        with self._lock:
+            self.sent.append(plate_number)
+            return f"0x{len(self.sent):064x}"
+
+    def get_receipt(self, tx_hash):
+        return Receipt()
+
+
+def test_live_lease_is_not_claimed(tmp_path):
+    db_path = str(tmp_path / 'outbox.db')
+    first, second = ChainOutbox(db_path), ChainOutbox(db_path)
+    first.append('entry', 'KL07AB1234', 0.9)
+
+    assert second.claim() == []
+    assert first.claim() == []
+
+
+def test_expired_lease_is_claimed_once(tmp_path):
+    db_path = str(tmp_path / 'outbox.db')
+    first = ChainOutbox(db_path, lease_seconds=0.05)
+    second, third = ChainOutbox(db_path), ChainOutbox(db_path)
+    outbox_id = first.append('entry', 'KL07AB1234', 0.9)
+    time.sleep(0.1)
+
+    claimed = second.claim()
+    assert [row['id'] for row in claimed] == [outbox_id]
+    assert third.claim() == []
+
+
+def test_rows_of_an_exited_process_are_claimed_immediately(tmp_path):
+    db_path = str(tmp_path / 'outbox.db')
+    outbox = ChainOutbox(db_path)
+    outbox_id = outbox.append('entry', 'KL07AB1234', 0.9)
+    host = outbox.owner.split(':')[0]
+    outbox._conn.execute('UPDATE chain_outbox SET owner = ?, lease_until = ?',
+                         (f"{host}:999999999:dead", time.time() + 3600))
+    outbox._conn.commit()
+
+    assert [row['id'] for row in ChainOutbox(db_path).claim()] == [outbox_id]
+
+
+def test_queues_sharing_a_journal_send_each_write_once(tmp_path):
+    db_path = str(tmp_path / 'outbox.db')
+    manager = FakeManager()
+
+    # Rows journaled by a process that died before sending
+    orphaned = ChainOutbox(db_path, lease_seconds=0.01)
+    for plate in ('KL07AB0001', 'KL07AB0002'):
+        orphaned.append('entry', plate, 0.9)
+    time.sleep(0.05)
+
+    queues = [
+        BlockchainWriteQueue(manager, outbox=ChainOutbox(db_path), batch_window=0.01,
+                             poll_interval=0.01)
+        for _ in range(3)
+    ]
+    handle = queues[1].submit_entry('KL07AB0003', 0.9)
+    handle.wait(2)
+    deadline = time.monotonic() + 2
+    while len(manager.sent) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    for write_queue in queues:
+        write_queue.stop()
+
+    assert sorted(manager.sent) == ['KL07AB0001', 'KL07AB0002', 'KL07AB0003']
+    assert queues[0].outbox.metrics()['queued'] == 0
+
+
+class BrokenBatchManager(FakeManager):
+    def supports_batch(self):
+        return True
+
+    def send_vehicle_entries_batch(self, plate_numbers, confidences):
+        with self._lock:
+            self.sent.extend(plate_numbers)
+            return f"0x{len(self.sent):064x}"
+
+    def parse_batch_results(self, receipt, action, plate_numbers):
+        raise ValueError('undecodable batch log')
+
+
+def test_settle_failure_fails_the_job_instead_of_retrying_it(tmp_path):
+    outbox = ChainOutbox(str(tmp_path / 'outbox.db'))
+    write_queue = BlockchainWriteQueue(BrokenBatchManager(), outbox=outbox, batch_window=0.05,
+                                       poll_interval=0.01)
+    try:
+        handles = [write_queue.submit_entry(plate, 0.9) for plate in ('KL07AB0001', 'KL07AB0002')]
+        results = [handle.wait(2) for handle in handles]
+
+        assert [result['status'] for result in results] == ['failed', 'failed']
+        assert write_queue.pending_count() == 0
+        assert outbox.metrics()['sent'] == 0
+    finally:
+        write_queue.stop()
@@ -0,0 +1,87 @@
+import pytest
+
+from blockchain.reconciler import TransactionReconciler
+from database.database_manager import DatabaseManager
+
+
+class Receipt:
+    status = 1
+    blockNumber = 5
+
+
+class FakeEth:
+    block_number = 10
+
+
+class FakeW3:
+    eth = FakeEth()
+
+
+class FakeManager:
+    w3 = FakeW3()
+
+    def __init__(self, mined):
+        self.mined = mined
+
+    def get_receipt(self, tx_hash):
+        return Receipt() if tx_hash in self.mined else None
+
+    def is_transaction_known(self, tx_hash):
+        return False
+
+
+class FakeWriteQueue:
+    def __init__(self):
+        self.submitted = []
+
+    def submit_entry(self, plate_number, confidence=0.9, entry_id=None):
+        self.submitted.append(('entry', plate_number, entry_id))
+
+    def submit_exit(self, plate_number, entry_id=None):
+        self.submitted.append(('exit', plate_number, entry_id))
+
+
+@pytest.fixture(params=['sqlite', 'sqlalchemy'])
+def db_manager(request, tmp_path):
+    if request.param == 'sqlite':
+        manager = DatabaseManager(str(tmp_path / 'vehicle_logs.db'))
+    else:
+        pytest.importorskip('sqlalchemy')
+        from database.storage import SQLAlchemyDatabaseManager
+        manager = SQLAlchemyDatabaseManager(f"sqlite:///{tmp_path / 'shared.db'}",
+                                            local_path=str(tmp_path / 'local.db'))
+    yield manager
+    manager.close()
+
+
+def test_exit_writes_are_tracked_apart_from_the_entry(db_manager):
+    entry_id = db_manager.open_entry('KL07AB1234', 0.9)
+    db_manager.update_blockchain_status(entry_id, 'submitted', '0xentry')
+    db_manager.close_entry('KL07AB1234')
+    db_manager.update_blockchain_status(entry_id, 'submitted', '0xexit', action='exit')
+
+    rows = db_manager.get_unsettled_entries()
+    assert [(row['action'], row['blockchain_tx'], row['status']) for row in rows] == [
+        ('entry', '0xentry', 'submitted'),
+        ('exit', '0xexit', 'submitted'),
+    ]
+    assert db_manager.get_status_counts()['submitted']['count'] == 2
+
+
+def test_dropped_exit_is_resubmitted_as_an_exit(db_manager):
+    entry_id = db_manager.open_entry('KL07AB1234', 0.9)
+    db_manager.update_blockchain_status(entry_id, 'submitted', '0xentry')
+    db_manager.close_entry('KL07AB1234')
+    db_manager.update_blockchain_status(entry_id, 'submitted', '0xexit', action='exit')
+
+    write_queue = FakeWriteQueue()
+    reconciler = TransactionReconciler(FakeManager(mined={'0xentry'}), db_manager,
+                                       write_queue=write_queue, drop_after=0)
+
+    assert reconciler.reconcile_once() == 2
+    assert write_queue.submitted == [('exit', 'KL07AB1234', entry_id)]
+    assert db_manager.get_unsettled_entries() == []
+
+    [dropped] = db_manager.get_unsettled_entries(statuses=('dropped',))
+    assert (dropped['action'], dropped['blockchain_tx']) == ('exit', '0xexit')
+    assert db_manager.get_status_counts()['confirmed']['count'] == 1
@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+pytest.importorskip('numpy')
+pytest.importorskip('pandas')
+
+from database.session_store import SessionStore
+
+START = datetime(2024, 1, 1, 8, 0, 0)
+
+
+def fill(store, count):
+    for i in range(count):
+        store.open(f"KL07AB{i:04d}", entry_id=i + 1, entered_at=START + timedelta(minutes=i))
+
+
+def test_full_buffer_evicts_the_oldest_sessions():
+    store = SessionStore(capacity=3)
+    fill(store, 5)
+
+    assert len(store) == 3
+    frame = store.dataframe()
+    assert list(frame['plate']) == ['KL07AB0002', 'KL07AB0003', 'KL07AB0004']
+    assert list(frame['entry_id']) == [3, 4, 5]
+    assert list(frame['timestamp']) == [START + timedelta(minutes=i) for i in (2, 3, 4)]
+
+
+def test_evicted_open_session_cannot_be_closed():
+    store = SessionStore(capacity=3)
+    fill(store, 4)
+
+    assert 'KL07AB0000' not in store._open
+    assert store.close('KL07AB0000') is False
+    assert store.close('KL07AB0003') is True
+    assert store.close('KL07AB0003') is False
+
+
+def test_reopened_plate_survives_eviction_of_its_old_session():
+    store = SessionStore(capacity=3)
+    store.open('KL07AB0000', entered_at=START)
+    store.close('KL07AB0000', exited_at=START)
+    store.open('KL07AB0000', entered_at=START + timedelta(minutes=1))
+    fill(store, 2)
+
+    # The plate's first slot was overwritten, its open session was not
+    assert store.close('KL07AB0000') is True
+
+
+def test_dataframe_is_cached_until_a_change():
+    store = SessionStore(capacity=3)
+    store.open('KL07AB0000', entered_at=START)
+    store.open('KL07AB0001', entry_id=7, entered_at=START)
+
+    frame = store.dataframe()
+    assert store.dataframe() is frame
+    assert list(frame['status']) == ['INSIDE', 'INSIDE']
+    assert frame['entry_id'].isna().tolist() == [True, False]
+
+    store.close('KL07AB0000', exited_at=START + timedelta(hours=1))
+    rebuilt = store.dataframe()
+    assert rebuilt is not frame
+    assert list(rebuilt['status']) == ['OUTSIDE', 'INSIDE']
+    assert rebuilt['exit_timestamp'][0] == START + timedelta(hours=1)
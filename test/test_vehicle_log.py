@@ -0,0 +1,110 @@
+import sqlite3
+
+import pytest
+
+from database.vehicle_log import VehicleLogger
+
+
+@pytest.fixture(params=['sqlite', 'sqlalchemy'])
+def config(request, tmp_path):
+    config = {'db_path': str(tmp_path / 'vehicle_logs.db'), 'capacities': {'north': 10}}
+    if request.param == 'sqlalchemy':
+        pytest.importorskip('sqlalchemy')
+        config['database_url'] = f"sqlite:///{tmp_path / 'shared.db'}"
+    return config
+
+
+def close(*loggers):
+    for logger in loggers:
+        logger.db_manager.close()
+
+
+def test_stale_cache_cannot_log_a_second_entry(config):
+    kiosk, api = VehicleLogger(config), VehicleLogger(config)
+    try:
+        entry_id = kiosk.log_vehicle_entry('KL07AB1234', 0.9)
+        assert entry_id
+
+        # The API's cache predates the kiosk's entry
+        assert not api.is_inside('KL07AB1234')
+        assert api.log_vehicle_entry('KL07AB1234', 0.9) is False
+        assert api.is_inside('KL07AB1234')
+
+        session = api.log_vehicle_exit('KL07AB1234')
+        assert session['entry_id'] == entry_id
+        assert kiosk.log_vehicle_exit('KL07AB1234') is None
+        assert not kiosk.is_inside('KL07AB1234')
+        assert api.db_manager.get_active_entries() == []
+    finally:
+        close(kiosk, api)
+
+
+def test_lot_survives_a_restart(config):
+    logger = VehicleLogger(config)
+    logger.log_vehicle_entry('KL07AB1234', 0.9, lot='north')
+    logger.log_vehicle_entry('KA01CD5678', 0.9)
+    close(logger)
+
+    restarted = VehicleLogger(config)
+    try:
+        occupancy = restarted.get_occupancy()
+        assert occupancy['lots'] == {'north': 1, 'default': 1}
+        assert restarted.occupancy.available('north') == 9
+    finally:
+        close(restarted)
+
+
+def test_cache_picks_up_other_processes_after_refresh(config):
+    config = dict(config, occupancy_refresh_seconds=0)
+    kiosk, api = VehicleLogger(config), VehicleLogger(config)
+    try:
+        kiosk.log_vehicle_entry('KL07AB1234', 0.9)
+        assert api.is_inside('KL07AB1234')
+    finally:
+        close(kiosk, api)
+
+
+def test_failed_exit_keeps_the_session(config, monkeypatch):
+    logger = VehicleLogger(config)
+    try:
+        logger.log_vehicle_entry('KL07AB1234', 0.9)
+
+        def fail(plate_number):
+            raise sqlite3.OperationalError('database is locked')
+        monkeypatch.setattr(logger.db_manager, 'close_entry', fail)
+
+        assert logger.log_vehicle_exit('KL07AB1234') is None
+        assert logger.is_inside('KL07AB1234')
+        assert len(logger.db_manager.get_active_entries()) == 1
+    finally:
+        close(logger)
+
+
+def test_upgrading_a_baseline_database_leaves_nobody_inside(config):
+    # vehicle_entries as created before exits and lots were recorded
+    url = config.get('database_url')
+    path = url[len('sqlite:///'):] if url else config['db_path']
+    conn = sqlite3.connect(path)
+    conn.execute('''
+    CREATE TABLE vehicle_entries (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        plate_number TEXT NOT NULL,
+        entry_time TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        confidence REAL,
+        blockchain_tx TEXT,
+        block_number INTEGER,
+        status TEXT DEFAULT 'pending'
+    )
+    ''')
+    conn.executemany('INSERT INTO vehicle_entries (plate_number, confidence) VALUES (?, 0.9)',
+                     [('KL07AB0001',), ('KL07AB0002',), ('KL07AB0001',), ('KL07AB0003',)])
+    conn.commit()
+    conn.close()
+
+    logger = VehicleLogger(config)
+    try:
+        assert logger.get_occupancy()['inside'] == 0
+        assert not logger.is_inside('KL07AB0001')
+        assert logger.log_vehicle_entry('KL07AB0001', 0.9)
+    finally:
+        close(logger)
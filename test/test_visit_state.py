@@ -0,0 +1,63 @@
+from detection.visit_state import ENTRY, EXIT, VisitStateMachine, movement_direction
+
+
+def test_pass_must_dwell_before_it_counts():
+    gate = VisitStateMachine(dwell_seconds=0.5, resight_window=3.0, cooldown_seconds=10.0)
+
+    assert gate.observe('KL07AB1234', inside=False, now=0.0) is None
+    assert gate.observe('KL07AB1234', inside=False, now=0.3) is None
+    assert gate.observe('KL07AB1234', inside=False, now=0.6) == ENTRY
+
+
+def test_one_event_per_pass_and_a_new_pass_after_the_resight_window():
+    gate = VisitStateMachine(dwell_seconds=0.0, resight_window=3.0, cooldown_seconds=0.0)
+
+    assert gate.observe('KL07AB1234', inside=False, now=0.0) == ENTRY
+    gate.confirm('KL07AB1234', now=0.0)
+    # Same pass: sightings less than resight_window apart
+    assert gate.observe('KL07AB1234', inside=True, now=2.0) is None
+    assert gate.observe('KL07AB1234', inside=True, now=4.5) is None
+    # Gap longer than resight_window starts a new pass
+    assert gate.observe('KL07AB1234', inside=True, now=8.0) == EXIT
+
+
+def test_cooldown_suppresses_the_next_pass():
+    gate = VisitStateMachine(dwell_seconds=0.0, resight_window=1.0, cooldown_seconds=10.0)
+
+    assert gate.observe('KL07AB1234', inside=False, now=0.0) == ENTRY
+    gate.confirm('KL07AB1234', now=0.0)
+
+    assert gate.observe('KL07AB1234', inside=True, now=5.0) is None
+    assert gate.stats()['suppressed'] == 1
+    assert gate.observe('KL07AB1234', inside=True, now=12.0) == EXIT
+
+
+def test_pass_against_the_lane_direction_emits_nothing():
+    gate = VisitStateMachine(dwell_seconds=0.0, resight_window=3.0, cooldown_seconds=0.0)
+
+    assert gate.observe('KL07AB1234', inside=False, direction=EXIT, now=0.0) is None
+    assert gate.observe('KL07AB5678', inside=False, direction=ENTRY, now=0.0) == ENTRY
+
+
+def test_movement_direction():
+    start = (100, 100, 200, 150)
+
+    assert movement_direction(start, (100, 160, 200, 210)) == ENTRY
+    assert movement_direction(start, (100, 40, 200, 90)) == EXIT
+    assert movement_direction(start, (100, 105, 200, 155)) is None
+    assert movement_direction(start, (160, 100, 260, 150), axis='x', entry_sign=-1) == EXIT
+
+
+def test_rejected_write_is_retried_within_the_pass():
+    gate = VisitStateMachine(dwell_seconds=0.0, resight_window=3.0, cooldown_seconds=10.0)
+
+    assert gate.observe('KL07AB1234', inside=False, now=0.0) == ENTRY
+    # While the write is pending, later sightings do not emit a duplicate
+    assert gate.observe('KL07AB1234', inside=False, now=0.1) is None
+    gate.reject('KL07AB1234')
+
+    assert gate.observe('KL07AB1234', inside=False, now=0.2) == ENTRY
+    gate.confirm('KL07AB1234', now=0.2)
+    assert gate.observe('KL07AB1234', inside=True, now=0.3) is None
+    assert gate.stats()['events'] == 1
+    assert gate.stats()['rejected'] == 1
@@ -5,18 +5,26 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import streamlit as st
 import cv2
 import numpy as np
-from detection.yolo_detector import NumberPlateDetector
-from blockchain.blockchain_manager import BlockchainManager
+from detection.model_server import connect_or_load
+from detection.motion_gate import MotionGate
+from detection.plate_tracker import PlateTracker
+from detection.visit_state import ENTRY, EXIT, VisitStateMachine, movement_direction
+from detection.roi import CameraROI
+from database.session_store import SessionStore
 from database.vehicle_log import VehicleLogger
+from blockchain.outbox import ChainOutbox
+from blockchain.reconciler import TransactionReconciler
+from blockchain.write_queue import BlockchainWriteQueue
 import time
 import threading
-import pandas as pd
-from datetime import datetime
 
 # Fallback blockchain manager
 try:
-    from blockchain.blockchain_manager import BlockchainManager
+    from blockchain.blockchain_manager import BlockchainManager, anchor_options
 except ImportError:
+    def anchor_options(anchor_db_path=None):
+        return {}
+    
     class BlockchainManager:
         def log_vehicle_entry(self, plate_number, confidence=0.9):
             return "MOCK_TRANSACTION"
@@ -25,15 +33,35 @@ except ImportError:
             return True
 
 class ParkingManagementSystem:
-    def __init__(self):
+    def __init__(self, camera_roi=None, motion_method='diff'):
         """
         Advanced Parking Management System with Elite Dashboard
+        
+        :param camera_roi: Optional CameraROI limiting detection to the lane
+        :param motion_method: MotionGate method, 'diff' or 'mog2'
         """
-        # Use YOLO detector with best.pt model
-        self.plate_detector = NumberPlateDetector('best.pt')
-        self.blockchain_manager = BlockchainManager()
+        # Detector and blockchain connection are created on first use
+        self._plate_detector = None
+        self._blockchain_manager = None
+        # Separate locks, so a chain connection backing off never stalls detection
+        self._detector_lock = threading.Lock()
+        self._blockchain_lock = threading.Lock()
         self.vehicle_logger = VehicleLogger()
         
+        # Chain writes run in the background so frames never wait on a block
+        self.write_queue = BlockchainWriteQueue(
+            lambda: self.blockchain_manager,
+            self.vehicle_logger.db_manager,
+            outbox=ChainOutbox(self.vehicle_logger.db_manager.db_path)
+        )
+        
+        # Moves vehicle_entries rows out of 'submitted' as their transactions settle
+        self.reconciler = TransactionReconciler(
+            lambda: self.blockchain_manager,
+            self.vehicle_logger.db_manager,
+            self.write_queue
+        )
+        
         # Camera state management
         self.camera_active = False
         self.camera = None
@@ -46,8 +74,24 @@ class ParkingManagementSystem:
         self.frame_skip = 3
         self.frame_count = 0
         
-        # Dashboard tracking
-        self.vehicle_log = []
+        # Stable track IDs so each vehicle is OCR'd only a few times
+        self.plate_tracker = PlateTracker()
+        
+        # One entry and one exit per visit, however often a plate is sighted
+        self.visit_states = VisitStateMachine(dwell_seconds=0.5, resight_window=3.0,
+                                              cooldown_seconds=10.0)
+        # Lane axis for direction of travel, e.g. ('y', 1) when entering vehicles
+        # move down the frame; None toggles on each pass
+        self.lane_direction = None
+        
+        # Lane region / tiling for high-resolution cameras
+        self.camera_roi = camera_roi or CameraROI()
+        
+        # Skip YOLO/OCR while the lane is static; motion outside it is ignored
+        self.motion_gate = MotionGate(method=motion_method, lane=self.camera_roi)
+        
+        # Dashboard tracking; the full history stays in vehicle_entries
+        self.sessions = SessionStore(capacity=1000)
         
         # Indian state plate prefixes with regex patterns for more robust matching
         self.INDIAN_PLATE_PATTERNS = [
@@ -63,6 +107,42 @@ class ParkingManagementSystem:
             r'^RJ\d{2}[A-Z]{1,2}\d{4}$'   # Rajasthan
         ]
     
+    @property
+    def plate_detector(self):
+        """
+        YOLO detector with best.pt model, via the model server if running
+        """
+        with self._detector_lock:
+            if self._plate_detector is None:
+                self._plate_detector = connect_or_load(yolo_model_path='best.pt')
+            return self._plate_detector
+    
+    @property
+    def blockchain_manager(self):
+        """
+        Blockchain manager, connected on first use
+        """
+        with self._blockchain_lock:
+            if self._blockchain_manager is None:
+                self._blockchain_manager = BlockchainManager(
+                    **anchor_options(self.vehicle_logger.db_manager.db_path)
+                )
+            return self._blockchain_manager
+    
+    def warm_up(self):
+        """
+        Load the detector and connect to the chain in the background
+        """
+        def load():
+            for name in ('plate_detector', 'blockchain_manager'):
+                try:
+                    getattr(self, name)
+                except Exception as e:
+                    print(f"Warm-up failed for {name}: {e}")
+        
+        threading.Thread(target=load, daemon=True).start()
+        self.reconciler.start()
+    
     def _start_camera(self):
         """
         Elite Camera Initialization
@@ -106,6 +186,12 @@ class ParkingManagementSystem:
         """
         Advanced Frame Processing
         """
+        try:
+            detector = self.plate_detector
+        except Exception as e:
+            st.error(f"Detector Loading Failed: {e}")
+            return
+        
         while self.camera_active and self.camera.isOpened():
             try:
                 ret, frame = self.camera.read()
@@ -113,30 +199,62 @@ class ParkingManagementSystem:
                     st.error("Frame Capture Failed")
                     break
                 
-                # Detect plates
-                plates = self.plate_detector.detect_plates(frame)
+                # Idle lane: show the frame without running detection
+                if not self.motion_gate.should_process(frame):
+                    frame_placeholder.image(frame, channels="BGR")
+                    time.sleep(0.05)
+                    continue
+                
+                # Detect plates in the lane region
+                plates = detector.detect_plates_roi(frame, self.camera_roi)
+                
+                # Track plates so OCR runs per vehicle, not per frame
+                tracks = self.plate_tracker.update(plates)
+                ocr_tracks = [t for t in tracks if self.plate_tracker.needs_ocr(t)]
                 
-                for x1, y1, x2, y2 in plates:
-                    # Extract plate region
-                    plate_img = frame[y1:y2, x1:x2]
+                # Recognize plate regions of unsettled tracks in one batched OCR call
+                plate_imgs = [frame[t.box[1]:t.box[3], t.box[0]:t.box[2]] for t in ocr_tracks]
+                plate_infos = detector.process_plates_batch(plate_imgs)
+                for track, plate_info in zip(ocr_tracks, plate_infos):
+                    track.add_reading(plate_info)
+                
+                for track in tracks:
+                    plate_info = track.fused_plate()
+                    if not plate_info:
+                        continue
+                    
+                    plate_number = plate_info['text']
                     
-                    plate_info = self.plate_detector.process_plate(plate_img)
+                    # Entry/Exit Logic, debounced per plate across tracks
+                    direction = None
+                    if self.lane_direction is not None:
+                        axis, entry_sign = self.lane_direction
+                        direction = movement_direction(track.first_box, track.box,
+                                                       axis, entry_sign)
+                    if self.plate_tracker.is_settled(track) and (
+                            self.lane_direction is None or direction is not None):
+                        event = self.visit_states.observe(
+                            plate_number,
+                            self.vehicle_logger.is_inside(plate_number),
+                            direction
+                        )
+                        if event is not None:
+                            if event == ENTRY:
+                                logged = self._handle_vehicle_entry(plate_info, frame)
+                            else:
+                                logged = self._handle_vehicle_exit(plate_info)
+                            if logged:
+                                self.visit_states.confirm(plate_number)
+                            else:
+                                self.visit_states.reject(plate_number)
                     
-                    if plate_info and plate_info['text']:
-                        plate_number = plate_info['text']
-                        
-                        # Entry/Exit Logic
-                        if plate_number not in [v['plate'] for v in self.vehicle_log]:
-                            self._handle_vehicle_entry(plate_info, frame)
-                        else:
-                            self._handle_vehicle_exit(plate_info)
-                        
-                        # Visualization
-                        cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                        cv2.putText(frame, plate_number, 
-                                    (x1, y1-10), 
-                                    cv2.FONT_HERSHEY_SIMPLEX, 
-                                    0.6, (0, 255, 0), 1)
+                    # Visualization
+                    x1, y1, x2, y2 = track.box
+                    cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
+                    cv2.putText(frame, plate_number, 
+                                (x1, y1-10), 
+                                cv2.FONT_HERSHEY_SIMPLEX, 
+                                0.6, (0, 255, 0), 1)
                 
                 frame_placeholder.image(frame, channels="BGR")
                 time.sleep(0.05)
@@ -148,58 +266,65 @@ class ParkingManagementSystem:
     def _handle_vehicle_entry(self, plate_info, frame):
         """
         Sophisticated Vehicle Entry Handler
+
+        :return: True if the vehicle is now logged inside
         """
         plate_number = plate_info['text']
+        entry_id = None
         
         try:
-            # Blockchain Transaction
-            blockchain_tx = self.blockchain_manager.log_vehicle_entry(
+            confidence = plate_info.get('confidence', 0.9)
+            entry_id = self.vehicle_logger.log_vehicle_entry(plate_number, confidence)
+            if not entry_id:
+                # Another gate logged this arrival first, nothing to report
+                return self.vehicle_logger.is_inside(plate_number)
+            
+            # Blockchain Transaction, confirmed in the background
+            self.write_queue.submit_entry(
                 plate_number, 
-                plate_info.get('confidence', 0.9)
+                confidence,
+                entry_id=entry_id
             )
             
             # Log Entry
-            entry_record = {
-                'plate': plate_number,
-                'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                'status': 'INSIDE',
-                'blockchain_tx': blockchain_tx.get('transaction_hash', 'N/A') if blockchain_tx else 'N/A'
-            }
-            
-            self.vehicle_log.append(entry_record)
+            self.sessions.open(plate_number, entry_id)
             
             # Optional: Save plate image
             cv2.imwrite(f"detected_plates/{plate_number}_entry.jpg", frame)
             
             st.toast(f"🚗 {plate_number} Entered Parking", icon="🟢")
+            return True
         
         except Exception as e:
             st.error(f"Entry Logging Failed: {e}")
+            return bool(entry_id)
     
     def _handle_vehicle_exit(self, plate_info):
         """
         Sophisticated Vehicle Exit Handler
+
+        :return: True if the exit was logged
         """
         plate_number = plate_info['text']
+        session = None
         
         try:
-            # Find and update entry record
-            for record in self.vehicle_log:
-                if record['plate'] == plate_number and record['status'] == 'INSIDE':
-                    # Blockchain Exit Transaction
-                    blockchain_tx = self.blockchain_manager.log_vehicle_exit(plate_number)
-                    
-                    record.update({
-                        'exit_timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                        'status': 'OUTSIDE',
-                        'exit_blockchain_tx': blockchain_tx.get('transaction_hash', 'N/A') if blockchain_tx else 'N/A'
-                    })
-                    
-                    st.toast(f"🚪 {plate_number} Exited Parking", icon="🔴")
-                    break
+            # Close the open session
+            session = self.vehicle_logger.log_vehicle_exit(plate_number)
+            if session is None:
+                return False
+            
+            # Blockchain Exit Transaction, confirmed in the background
+            self.write_queue.submit_exit(plate_number, entry_id=session['entry_id'])
+            
+            self.sessions.close(plate_number)
+            
+            st.toast(f"🚪 {plate_number} Exited Parking", icon="🔴")
+            return True
         
         except Exception as e:
             st.error(f"Exit Logging Failed: {e}")
+            return session is not None
     
     def _stop_camera(self):
         """
@@ -279,9 +404,9 @@ class ParkingManagementSystem:
         with col2:
             st.subheader("📊 Vehicle Dashboard")
             
-            # Convert vehicle log to DataFrame
-            if self.vehicle_log:
-                df = pd.DataFrame(self.vehicle_log)
+            # Recent sessions, cached until the next entry or exit
+            if len(self.sessions):
+                df = self.sessions.dataframe()
                 st.dataframe(
                     df[['plate', 'timestamp', 'status']],
                     column_config={
@@ -299,8 +424,13 @@ class ParkingManagementSystem:
                 st.info("No vehicles detected yet")
 
 def main():
-    app = ParkingManagementSystem()
-    app.run()
+    # Streamlit reruns main() on every interaction; keep one system (and one
+    # write queue, reconciler and session store) per browser session
+    if 'parking_system' not in st.session_state:
+        app = ParkingManagementSystem()
+        app.warm_up()
+        st.session_state.parking_system = app
+    st.session_state.parking_system.run()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -1,7 +1,7 @@
 import sqlite3
 from tabulate import tabulate
 
-def view_database():
+def view_database(page_size=1000):
     # Connect to database
     conn = sqlite3.connect('vehicle_logs.db')
     cursor = conn.cursor()
@@ -13,14 +13,18 @@ def view_database():
     ORDER BY entry_time DESC
     ''')
     
-    entries = cursor.fetchall()
-    
-    # Print in table format
+    # Print in table format, one page at a time
     headers = ['ID', 'Plate Number', 'Entry Time', 'Confidence', 'Status']
-    print(tabulate(entries, headers=headers, tablefmt='grid'))
+    total = 0
+    while True:
+        entries = cursor.fetchmany(page_size)
+        if not entries:
+            break
+        print(tabulate(entries, headers=headers, tablefmt='grid'))
+        total += len(entries)
     
     # Print summary
-    print(f"\nTotal entries: {len(entries)}")
+    print(f"\nTotal entries: {total}")
     
     conn.close()
 